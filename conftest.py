@@ -8,9 +8,14 @@ also run it locally with utils/run_doc_execution.py.
 Execution is local and fast: this file defaults fused.run (and direct UDF calls)
 to engine="local" so UDFs run in-process with no auth, and auto-skips any block
 that needs external context (data files/URLs, cloud storage, a database, the
-network, or a live Fused catalog/account call) — see `_DATA_DEPENDENT`. Only
-self-contained, pure-compute blocks actually run, so the full suite finishes in
-a few seconds.
+network, or a live Fused catalog/account call) — see the rules in
+utils/doc_block_classifier.py. Only self-contained, pure-compute blocks actually
+run, so the full suite finishes in a few seconds. Pass `--explain-skips` to
+list every auto-skipped block with the rule and text that matched.
+
+With `--doc-fixtures`, blocks that only *read* data (servable rules) run too, as
+long as every URL they use has a tiny local stand-in listed in
+utils/fixtures/manifest.json — see utils/doc_fixtures.py.
 
 To exclude a single block explicitly, put '# doctest: skip' on its first line
 (also honored by Tier 1's syntax check). To run a block that reuses names from
@@ -18,11 +23,20 @@ the block above it, add `{/* pmd-metadata: continuation */}` directly above its
 fence (pytest-markdown-docs prepends the previous block's source).
 """
 
-import re
+import dataclasses
+import functools
+import json
 import socket
+import sys
+from pathlib import Path
 
 import pytest
 
+# Helper modules (fixture server, ...) live next to the Tier 1/2 scripts.
+sys.path.insert(0, str(Path(__file__).resolve().parent / "utils"))
+
+from doc_block_classifier import Classifier, leading_lines  # noqa: E402
+
 # A doc block that makes a network call should never hang the run forever.
 socket.setdefaulttimeout(30)
 
@@ -32,24 +46,109 @@ socket.setdefaulttimeout(30)
 # without that context, and running it would be slow and flaky. This keeps the
 # full suite fast (only pure-compute blocks run) and is applied centrally so no
 # doc file needs editing and any future block is covered automatically.
-_DATA_DEPENDENT = re.compile(
-    r"""(?x)
-      \bfused\.run\(\s*['"]        # run a catalog UDF by name (remote load)
-    | \bfused\.(load|submit|ingest|get|list|delete|upload|download)\b
-    | \bfused\.api\.               # account/server calls (whoami, log, ...)
-    | \brun_remote\b
-    | access_token|NotebookCredentials|fused\._auth|AUTHORIZATION  # live session/creds
-    | s3://|gs://|gcs://|az://|abfs://|ftp://|https?://
-    | read_parquet|read_csv|read_json|read_feather|read_excel|read_file
-    | (gpd|geopandas|pd|pandas|xr|xarray)\.(read_|open)
-    | rioxarray|rasterio\.open|open_dataset
-    | \bopen\(|/mnt/|/mount/|fsspec|s3fs|gcsfs|boto3
-    | requests\.(get|post|put|delete|head)|urlopen|urllib|httpx|aiohttp
-    | duckdb|\.sql\(|psycopg|sqlalchemy|snowflake|bigquery|\.connect\(
-    | micropip|pyodide|\bawait\b|\bjs\.
-    | \blogout\b|fused\.secrets|secrets\.set\b
-    """
-)
+#
+# The decision itself lives in utils/doc_block_classifier.py; results are
+# cached in pytest's cache dir keyed by block hash.
+_CLASSIFIER_CACHE_KEY = "doc-snippets/classification"
+
+
+def pytest_addoption(parser) -> None:
+    parser.addoption(
+        "--doc-fixtures",
+        action="store_true",
+        default=False,
+        help="Run data-reading doc blocks against the local sample files in "
+        "utils/fixtures/ instead of skipping them.",
+    )
+    parser.addoption(
+        "--explain-skips",
+        action="store_true",
+        default=False,
+        help="List every auto-skipped doc block with the rule that matched.",
+    )
+    parser.addoption(
+        "--doc-sandbox",
+        action="store_true",
+        default=False,
+        help="Execute blocks in a resource-limited subprocess (see "
+        "utils/doc_sandbox.py).",
+    )
+    parser.addoption(
+        "--doc-sandbox-scope",
+        default="session",
+        choices=("session", "file", "block"),
+        help="Reuse the sandbox worker for the whole session (default), per "
+        "doc file, or per block.",
+    )
+    parser.addoption(
+        "--doc-impacted",
+        default=None,
+        metavar="JSON",
+        help="Only run blocks that reference one of the changed fused symbols "
+        "listed in this JSON file, or that live in one of its changed doc files "
+        "(see utils/doc_symbol_index.py). Only direct changes to public symbols "
+        "are detected, not changes confined to private helpers or callees.",
+    )
+    parser.addoption("--doc-sandbox-memory", type=int, default=4096, metavar="MB")
+    parser.addoption("--doc-sandbox-cpu", type=int, default=60, metavar="SECONDS")
+    parser.addoption(
+        "--doc-sandbox-timeout", type=float, default=120.0, metavar="SECONDS"
+    )
+
+
+def _fixture_server(config):
+    """Start (once per session) the fixture server, or None if mode is off."""
+    if not config.getoption("--doc-fixtures"):
+        return None
+    server = getattr(config, "_doc_fixture_server", None)
+    if server is None:
+        from doc_fixtures import FixtureServer
+
+        server = FixtureServer().start()
+        config._doc_fixture_server = server
+    return server
+
+
+def _sandbox(config):
+    """Start (once per session) the sandbox pool, or None if mode is off."""
+    if not config.getoption("--doc-sandbox"):
+        return None
+    pool = getattr(config, "_doc_sandbox", None)
+    if pool is None:
+        from doc_sandbox import Limits, SandboxPool
+
+        limits = Limits(
+            memory_mb=config.getoption("--doc-sandbox-memory"),
+            cpu_seconds=config.getoption("--doc-sandbox-cpu"),
+            timeout=config.getoption("--doc-sandbox-timeout"),
+        )
+        pool = config._doc_sandbox = SandboxPool(
+            config.getoption("--doc-sandbox-scope"), limits
+        )
+    return pool
+
+
+def _run_in_sandbox(item, pool) -> None:
+    from doc_sandbox import SandboxError
+
+    # Same retry budget as the plugin's own runner (`retry:N` on the fence).
+    attempts = item.test_definition.max_retries + 1
+    for attempt in range(attempts):
+        result = pool.run(item.test_definition.source, str(item.path))
+        if result.ok:
+            if attempt:
+                item.user_properties.append(("retries", str(attempt)))
+            return
+    raise SandboxError(result.error)
+
+
+def pytest_unconfigure(config) -> None:
+    server = getattr(config, "_doc_fixture_server", None)
+    if server is not None:
+        server.stop()
+    pool = getattr(config, "_doc_sandbox", None)
+    if pool is not None:
+        pool.close()
 
 
 def pytest_markdown_docs_globals():
@@ -115,19 +214,115 @@ def pytest_markdown_docs_globals():
 
 
 def pytest_collection_modifyitems(items: list) -> None:
-    """Skip blocks whose first content line contains '# doctest: skip'.
+    """Skip, rewrite, sandbox and select the collected Tier 2 blocks.
 
-    pytest-markdown-docs' native skip mechanism uses 'notest' in the fence
-    info line. This hook makes '# doctest: skip' inside the block body work
-    for Tier 2 as well, keeping the convention consistent with Tier 1.
+    For each block, in order:
+
+    - Blocks whose first content line contains '# doctest: skip' are skipped.
+      pytest-markdown-docs' native mechanism uses 'notest' in the fence info
+      line; this keeps the convention consistent with Tier 1.
+    - With --doc-sandbox, blocks that use neither pytest fixtures nor a custom
+      `runner:` run in the sandbox worker pool instead of in-process.
+    - Blocks the classifier flags as data-dependent are rewritten to read the
+      local sample data under --doc-fixtures when every source is servable,
+      and otherwise skipped with the matched rule as the reason (listed in
+      the terminal summary).
+
+    Finally --doc-impacted deselects blocks that touch no changed symbol.
     """
     skip = pytest.mark.skip(reason="doctest: skip")
-    skip_data = pytest.mark.skip(reason="data-dependent (auto)")
+    if not items:
+        return
+    config = items[0].config
+    cache = getattr(config, "cache", None)  # None with -p no:cacheprovider
+    classifier = Classifier(cache.get(_CLASSIFIER_CACHE_KEY, None) if cache else None)
+    server = _fixture_server(config)
+    pool = _sandbox(config)
+    explained = config._doc_skip_explanations = []
     for item in items:
         code = getattr(item, "code", "") or ""
         lines = [ln for ln in code.splitlines() if ln.strip()]
         first = lines[0] if lines else ""
         if first.lstrip().startswith("#") and "doctest: skip" in first:
             item.add_marker(skip)
-        elif _DATA_DEPENDENT.search(code):
-            item.add_marker(skip_data)
+            continue
+        definition = getattr(item, "test_definition", None)
+        if (
+            pool is not None
+            and definition is not None
+            and not definition.runner_name
+            and not getattr(item, "fixturenames", None)
+        ):
+            # Blocks that request pytest fixtures need them in-process, and a
+            # custom `runner:` is a plugin object the worker cannot load.
+            item.runtest = functools.partial(_run_in_sandbox, item, pool)
+            item.repr_failure = functools.partial(_repr_sandbox_failure, item)
+        matches = classifier.classify(code)
+        if not matches:
+            continue
+        external = [m for m in matches if not m.servable]
+        rewritten = server.rewrite(code) if server and not external else None
+        if rewritten is not None:
+            _set_code(item, rewritten)
+            continue
+        reason = (external or matches)[0]
+        item.add_marker(
+            pytest.mark.skip(reason=f"data-dependent (auto): {reason.rule}")
+        )
+        line = leading_lines(code) + reason.line
+        explained.append((f"{item.path.name}:{line}", item.nodeid, reason))
+    if cache and classifier.dirty:
+        cache.set(_CLASSIFIER_CACHE_KEY, classifier.cache)
+    _select_impacted(config, items)
+
+
+def _select_impacted(config, items: list) -> None:
+    """Deselect blocks that touch none of the changed fused symbols.
+
+    Blocks in new or edited doc files are always kept. A symbol counts as
+    changed only if its own signature or source did (see doc_symbol_index).
+    """
+    path = config.getoption("--doc-impacted")
+    if not path:
+        return
+    from doc_symbol_index import ROOT, block_symbols, is_impacted
+
+    impacted = json.loads(Path(path).read_text())
+    changed, files = set(impacted["symbols"]), set(impacted["files"])
+    keep, drop = [], []
+    for item in items:
+        code = getattr(item, "code", "") or ""
+        rel = Path(item.path).resolve()
+        rel = rel.relative_to(ROOT).as_posix() if rel.is_relative_to(ROOT) else ""
+        selected = rel in files or is_impacted(block_symbols(code), changed)
+        (keep if selected else drop).append(item)
+    if drop:
+        config.hook.pytest_deselected(items=drop)
+        items[:] = keep
+
+
+def pytest_terminal_summary(terminalreporter, config) -> None:
+    explained = getattr(config, "_doc_skip_explanations", None)
+    if not explained or not config.getoption("--explain-skips"):
+        return
+    terminalreporter.section(f"auto-skipped doc blocks ({len(explained)})")
+    for where, nodeid, match in explained:
+        terminalreporter.write_line(
+            f"{nodeid}\n    {match.rule} at {where}: {match.text}"
+        )
+
+
+def _repr_sandbox_failure(item, excinfo, style=None):
+    from doc_sandbox import SandboxError
+
+    if excinfo.errisinstance(SandboxError):
+        return f"Error in code block (sandbox):\n{excinfo.value}"
+    return type(item).repr_failure(item, excinfo, style)
+
+
+def _set_code(item, code: str) -> None:
+    """Swap the source a markdown-docs item will execute."""
+    item.code = code
+    definition = getattr(item, "test_definition", None)
+    if definition is not None:
+        item.test_definition = dataclasses.replace(definition, source=code)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Time the llms.txt generator's page extraction on a saved corpus of docs HTML.
+
+Runs `extract_page` from generate_llms_txt_udf.py over every *.html file in
+the corpus once per parser (BeautifulSoup's html.parser and lxml), reports
+pages/s and MB/s for each, and checks that both parsers extract the same
+title, description and content.
+
+The corpus is any directory of rendered pages — `build/` after
+`npm run build`, or pages saved from a crawl. Without one, `--synthesize`
+writes Docusaurus-shaped pages (navbar, sidebar, TOC, footer, Prism-style
+highlighted code) from the docs/ sources so there is something to time.
+
+Usage:
+    python scripts/benchmark_extract_page.py [--corpus build] [--repeat 3]
+    python scripts/benchmark_extract_page.py --synthesize
+"""
+
+import argparse
+import html
+import re
+import sys
+import time
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+UDF_PATH = ROOT / "scripts" / "generate_llms_txt_udf.py"
+DOCS_DIR = ROOT / "docs"
+SYNTHETIC_CORPUS = ROOT / ".cache" / "doc-tools" / "html-corpus"
+PARSERS = ("html.parser", "lxml")
+
+
+def load_extract_page():
+    source = UDF_PATH.read_text()
+    namespace = {"fused": types.SimpleNamespace(udf=lambda fn: fn)}
+    exec(compile(source, str(UDF_PATH), "exec"), namespace)
+    return namespace["extract_page"]
+
+
+# ── Synthetic corpus ───────────────────────────────────────────────────────────
+
+
+def highlight(code: str) -> str:
+    """Prism-like markup: one span per line, one span per word token."""
+    lines = []
+    for line in code.split("\n"):
+        tokens = "".join(
+            (
+                f'<span class="token {"keyword" if tok.isalpha() else "plain"}">'
+                f"{html.escape(tok)}</span>"
+                if tok.strip()
+                else tok
+            )
+            for tok in re.findall(r"\w+|\s+|[^\w\s]+", line)
+        )
+        lines.append(f'<span class="token-line">{tokens}<br></span>')
+    return "".join(lines)
+
+
+def render_body(text: str) -> tuple[str, list[str]]:
+    """Very small Markdown -> HTML for headings, code fences and paragraphs."""
+    out, headings, paragraph = [], [], []
+
+    def flush():
+        if paragraph:
+            out.append(f"<p>{html.escape(' '.join(paragraph))}</p>")
+            paragraph.clear()
+
+    lines = iter(text.split("\n"))
+    for line in lines:
+        fence = re.match(r"\s*(`{3,})(\w*)", line)
+        heading = re.match(r"(#{1,6})\s+(.*)", line)
+        if fence:
+            flush()
+            code = []
+            for inner in lines:
+                if inner.strip().startswith(fence.group(1)):
+                    break
+                code.append(inner)
+            out.append(
+                f'<div class="language-{fence.group(2) or "text"} codeBlockContainer">'
+                f'<div class="codeBlockContent"><pre class="prism-code">'
+                f"<code>{highlight(chr(10).join(code))}</code></pre>"
+                f'<div class="buttonGroup"><button aria-label="Copy code">'
+                f'<span aria-hidden="true">Copy</span></button></div></div></div>'
+            )
+        elif heading:
+            flush()
+            level, title = len(heading.group(1)), html.escape(heading.group(2))
+            anchor = re.sub(r"\W+", "-", heading.group(2).lower()).strip("-")
+            headings.append(title)
+            out.append(
+                f'<h{level} class="anchor" id="{anchor}">{title}'
+                f'<a href="#{anchor}" class="hash-link" aria-label="Direct link">'
+                f"&#8203;</a></h{level}>"
+            )
+        elif line.strip():
+            paragraph.append(line.strip())
+        else:
+            flush()
+    flush()
+    return "".join(out), headings
+
+
+def synthesize(out_dir: Path) -> int:
+    sources = sorted(DOCS_DIR.rglob("*.mdx"))
+    sidebar = "".join(
+        f'<li class="menu__list-item"><a class="menu__link" href="/{p.stem}">'
+        f"{p.stem.replace('-', ' ').title()}</a></li>"
+        for p in sources
+    )
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for i, src in enumerate(sources):
+        text = src.read_text()
+        text = re.sub(r"\A---\n.*?\n---\n", "", text, flags=re.S)
+        body, headings = render_body(text)
+        title = html.escape(src.stem.replace("-", " ").title())
+        toc = "".join(
+            f'<li><a class="table-of-contents__link toc-highlight">{h}</a></li>'
+            for h in headings
+        )
+        page = (
+            f"<!doctype html><html lang='en'><head><meta charset='UTF-8'>"
+            f"<title>{title} | Fused</title>"
+            f"<style>{'.x{color:red}' * 200}</style>"
+            f"<script>window.__DATA__ = {{'page': {i}, 'pad': '{'x' * 4000}'}};</script>"
+            f"</head><body><div id='__docusaurus'>"
+            f"<nav class='navbar navbar--fixed-top'><a href='/'>Docs</a>"
+            f"<a href='/python-sdk'>Python SDK</a></nav>"
+            f"<div class='main-wrapper'><aside class='theme-doc-sidebar-container'>"
+            f"<nav class='menu'><ul class='theme-doc-sidebar-menu menu__list'>"
+            f"{sidebar}</ul></nav></aside>"
+            f"<main class='docMainContainer'><div class='container'><div class='row'>"
+            f"<div class='col docItemCol'>"
+            f"<nav aria-label='Breadcrumbs' class='theme-doc-breadcrumbs'>"
+            f"<ul class='breadcrumbs'><li>Home</li><li>{title}</li></ul></nav>"
+            f"<article><div class='theme-doc-markdown markdown'>"
+            f"<header><h1>{title}</h1></header>{body}</div></article>"
+            f"<nav class='pagination-nav'><a>Previous</a><a>Next</a></nav></div>"
+            f"<div class='col col--3'><div class='tableOfContents'>"
+            f"<ul class='table-of-contents'>{toc}</ul></div></div>"
+            f"</div></div></main></div>"
+            f"<footer class='footer'>© Fused</footer></div>"
+            f"<script src='/assets/js/main.js'></script></body></html>"
+        )
+        (
+            out_dir / f"{src.relative_to(DOCS_DIR).as_posix().replace('/', '__')}.html"
+        ).write_text(page)
+    return len(sources)
+
+
+# ── Benchmark ──────────────────────────────────────────────────────────────────
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--corpus",
+        type=Path,
+        default=None,
+        help="directory of *.html pages (default: build/, else the synthetic corpus)",
+    )
+    parser.add_argument(
+        "--synthesize",
+        action="store_true",
+        help=f"(re)write the synthetic corpus to {SYNTHETIC_CORPUS.relative_to(ROOT)}",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="best of N passes")
+    args = parser.parse_args()
+
+    if args.synthesize:
+        n = synthesize(args.corpus or SYNTHETIC_CORPUS)
+        print(f"Wrote {n} synthetic pages to {args.corpus or SYNTHETIC_CORPUS}")
+    corpus = args.corpus or next(
+        (d for d in (ROOT / "build", SYNTHETIC_CORPUS) if d.is_dir()), None
+    )
+    files = sorted(corpus.rglob("*.html")) if corpus else []
+    if not files:
+        print(
+            "No HTML corpus found: run `npm run build`, pass --corpus DIR, "
+            "or use --synthesize",
+            file=sys.stderr,
+        )
+        return 1
+
+    pages = [(str(f.relative_to(corpus)), f.read_text(errors="replace")) for f in files]
+    megabytes = sum(len(text.encode()) for _, text in pages) / 1e6
+    print(f"Corpus: {len(pages)} pages, {megabytes:.1f} MB from {corpus}\n")
+
+    extract_page = load_extract_page()
+    results: dict[str, list[dict]] = {}
+    timings: dict[str, float] = {}
+    for name in PARSERS:
+        best = float("inf")
+        for _ in range(max(1, args.repeat)):
+            started = time.perf_counter()
+            out = [extract_page(text, path, parser=name) for path, text in pages]
+            best = min(best, time.perf_counter() - started)
+        results[name], timings[name] = out, best
+        print(
+            f"{name:>12}: {best:6.2f}s  {len(pages) / best:7.1f} pages/s  "
+            f"{megabytes / best:6.1f} MB/s"
+        )
+
+    baseline, fast = PARSERS
+    print(f"\nSpeedup ({fast} vs {baseline}): {timings[baseline] / timings[fast]:.1f}x")
+
+    mismatches = [
+        (path, field)
+        for (path, _), a, b in zip(pages, results[baseline], results[fast])
+        for field in ("title", "description", "content")
+        if a[field] != b[field]
+    ]
+    if mismatches:
+        print(f"\n{len(mismatches)} field(s) differ between parsers:")
+        for path, field in mismatches[:10]:
+            print(f"  {path}: {field}")
+        return 1
+    print("Both parsers extract identical pages.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
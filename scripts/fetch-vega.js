@@ -0,0 +1,85 @@
+#!/usr/bin/env node
+// Vendors the Vega-Lite runtime that VegaLiteFigure (src/components/Plotting.jsx)
+// renders notebook charts with into static/vendor/vega/, so the site serves it
+// from its own origin instead of loading floating versions from a CDN.
+//
+// The packages are not site dependencies (they are only needed by converted
+// notebooks with Altair output), so they are fetched at exact versions with
+// `npm pack` and only their UMD bundles are kept. Each tarball must match the
+// sha512 `integrity` pinned below; the registry's own metadata is not trusted.
+// Pin a new version with `npm view <name>@<version> dist.integrity`. Already
+// vendored versions are not fetched again.
+//
+// Not part of `npm run build`, so the build never needs the registry: run
+// `npm run fetch-vega` once before building a site that has VegaLiteFigure
+// pages (utils/convert_ipynb_to_mdx.py warns when it writes one and the bundles
+// are missing). Exits non-zero if a bundle is missing and cannot be fetched.
+
+const crypto = require('crypto');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { execFileSync } = require('child_process');
+
+const ROOT = path.resolve(__dirname, '..');
+const OUT = path.join(ROOT, 'static', 'vendor', 'vega');
+
+// Keep in sync with VEGA_SCRIPTS in src/components/Plotting.jsx (load order).
+// `integrity` is the tarball's sha512 in npm's SRI form ("sha512-<base64>"); a
+// package without one is never vendored.
+const PACKAGES = [
+  { name: 'vega', version: '5.30.0', file: 'build/vega.min.js', integrity: null },
+  { name: 'vega-lite', version: '5.21.0', file: 'build/vega-lite.min.js', integrity: null },
+  { name: 'vega-embed', version: '6.26.0', file: 'build/vega-embed.min.js', integrity: null },
+];
+
+const target = (pkg) => path.join(OUT, `${pkg.name}@${pkg.version}.min.js`);
+
+function fetchPackage(pkg, tmp) {
+  if (!pkg.integrity) {
+    throw new Error(
+      `no integrity pinned; add \`npm view ${pkg.name}@${pkg.version} dist.integrity\``,
+    );
+  }
+  const tarball = execFileSync(
+    'npm',
+    ['pack', `${pkg.name}@${pkg.version}`, '--pack-destination', tmp, '--silent'],
+    { encoding: 'utf8' },
+  ).trim().split('\n').pop();
+  const data = fs.readFileSync(path.join(tmp, tarball));
+  const actual = `sha512-${crypto.createHash('sha512').update(data).digest('base64')}`;
+  if (actual !== pkg.integrity) {
+    throw new Error(`integrity mismatch: expected ${pkg.integrity}, got ${actual}`);
+  }
+  execFileSync('tar', ['-xzf', path.join(tmp, tarball), '-C', tmp, `package/${pkg.file}`]);
+  fs.copyFileSync(path.join(tmp, 'package', pkg.file), target(pkg));
+}
+
+function main() {
+  const missing = PACKAGES.filter((pkg) => !fs.existsSync(target(pkg)));
+  if (!missing.length) return 0;
+  fs.mkdirSync(OUT, { recursive: true });
+  const tmp = fs.mkdtempSync(path.join(os.tmpdir(), 'fetch-vega-'));
+  let failed = 0;
+  try {
+    for (const pkg of missing) {
+      try {
+        fetchPackage(pkg, tmp);
+        console.log(`Vendored ${pkg.name}@${pkg.version}`);
+      } catch (err) {
+        console.error(`Could not fetch ${pkg.name}@${pkg.version}: ${err.message}`);
+        failed++;
+      }
+    }
+  } finally {
+    fs.rmSync(tmp, { recursive: true, force: true });
+  }
+  // Bundles of versions no longer pinned.
+  const current = new Set(PACKAGES.map((pkg) => path.basename(target(pkg))));
+  for (const name of fs.readdirSync(OUT)) {
+    if (!current.has(name)) fs.rmSync(path.join(OUT, name));
+  }
+  return failed ? 1 : 0;
+}
+
+process.exit(main());
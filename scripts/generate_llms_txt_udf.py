@@ -6,7 +6,12 @@ def udf(
     site_title: str = "Fused Documentation",
     site_description: str = "Fused is an end-to-end cloud platform for data analytics, built around User Defined Functions (UDFs): Python functions that can be run via HTTPS requests from anywhere, without any install required.",
     max_pages: int = 0,  # 0 = no limit, useful for testing
+    max_sitemap_depth: int = 3,  # levels of nested sitemap indexes to follow
     output_path: str = "",  # e.g. "fd://my_org/llms.txt" — leave empty to return as string
+    concurrency: int = 16,  # pages fetched in parallel
+    requests_per_second: float = 20.0,  # per host, with bursts up to this many
+    cache_path: str = "",  # JSON-lines page cache, e.g. "/mount/llms_pages.jsonl"
+    compress: str = "",  # "gz", "br" or "gz,br": also write output_path + ".gz"/".br"
 ):
     """
     Generate an llms.txt file from any public docs site with a sitemap.
@@ -15,115 +20,206 @@ def udf(
     - "curated": one line per page — title, URL, short description
     - "full": full page content, lightly cleaned
 
-    Works with any static docs site (Docusaurus, MkDocs, Astro, etc.).
+    Works with any static docs site (Docusaurus, MkDocs, Astro, etc.). Sitemap
+    indexes are expanded level by level, fetching each level's sitemaps in
+    parallel, at most once each and no deeper than `max_sitemap_depth`.
+
+    Pages are fetched concurrently over one pooled (keep-alive) session, rate
+    limited per host with a token bucket, and parsed with lxml (BeautifulSoup
+    when lxml is missing or cannot parse a page).
+
+    With `cache_path`, extracted pages are kept between runs together with
+    their sitemap `<lastmod>`, ETag and Last-Modified. Pages whose lastmod is
+    unchanged are not requested at all; the others are requested with
+    If-None-Match / If-Modified-Since, so only changed pages are downloaded.
+
+    With `output_path`, the output is streamed: each section is written (and
+    fed to the `compress` sidecars) as soon as its page and all pages before
+    it are crawled, so memory stays flat however large the site is.
     """
+    import gzip
+    import io
+    import json
+    import os
+    import random
     import re
+    import threading
     import time
-    import requests
+    from collections.abc import Iterable, Iterator
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from contextlib import ExitStack
+    from urllib.parse import urldefrag, urlsplit
     from xml.etree import ElementTree
-    from bs4 import BeautifulSoup
+
+    import requests
 
     # ------------------------------------------------------------------ #
     # Helpers
     # ------------------------------------------------------------------ #
 
-    def fetch(url: str, retries: int = 3, timeout: int = 15) -> str | None:
-        headers = {"User-Agent": "llms-txt-generator/1.0 (sitemap crawler)"}
+    class TokenBucket:
+        """Allows `rate` requests per second on average, bursts of `capacity`."""
+
+        def __init__(self, rate: float, capacity: float):
+            self.rate = rate
+            self.capacity = capacity
+            self.tokens = capacity
+            self.updated = time.monotonic()
+            self.lock = threading.Lock()
+
+        def acquire(self) -> None:
+            while True:
+                with self.lock:
+                    now = time.monotonic()
+                    self.tokens = min(
+                        self.capacity, self.tokens + (now - self.updated) * self.rate
+                    )
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                time.sleep(wait)
+
+    buckets: dict[str, TokenBucket] = {}
+    buckets_lock = threading.Lock()
+
+    def bucket_for(url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        with buckets_lock:
+            if host not in buckets:
+                rate = max(requests_per_second, 0.1)
+                buckets[host] = TokenBucket(rate, capacity=max(1.0, rate))
+            return buckets[host]
+
+    # One session for the whole crawl: connections are kept alive and reused
+    # instead of a new TCP/TLS handshake per page.
+    session = requests.Session()
+    session.headers["User-Agent"] = "llms-txt-generator/1.0 (sitemap crawler)"
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=4, pool_maxsize=max(1, concurrency)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    def request(
+        url: str, headers: dict | None = None, retries: int = 3, timeout: int = 15
+    ) -> requests.Response | None:
         for attempt in range(retries):
+            bucket_for(url).acquire()
+            retry_after = None
             try:
-                r = requests.get(url, headers=headers, timeout=timeout)
+                r = session.get(url, headers=headers, timeout=timeout)
+                if r.status_code in (429, 503):
+                    retry_after = r.headers.get("Retry-After")
                 r.raise_for_status()
-                return r.text
-            except Exception as e:
-                if attempt == retries - 1:
+                return r
+            except requests.RequestException as e:
+                status = getattr(e.response, "status_code", None)
+                permanent = status is not None and 400 <= status < 500 and status != 429
+                if permanent or attempt == retries - 1:
                     print(f"  ✗ Failed {url}: {e}")
                     return None
-                time.sleep(1.5 ** attempt)
+            # Exponential backoff with full jitter, so parallel workers that
+            # failed together don't retry together.
+            delay = random.uniform(0, 0.5 * 2**attempt)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, min(float(retry_after), 30.0))
+            time.sleep(delay)
 
-    def parse_sitemap(xml_text: str) -> list[str]:
-        """Parse a sitemap or sitemap index and return all page URLs."""
-        try:
-            root = ElementTree.fromstring(xml_text)
-        except ElementTree.ParseError:
-            return []
-
-        ns = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-        urls = []
-
-        # Sitemap index — recurse into sub-sitemaps
-        for sitemap_tag in root.findall("sm:sitemap", ns):
-            loc = sitemap_tag.find("sm:loc", ns)
-            if loc is not None and loc.text:
-                sub_xml = fetch(loc.text.strip())
-                if sub_xml:
-                    urls.extend(parse_sitemap(sub_xml))
-
-        # Regular sitemap
-        for url_tag in root.findall("sm:url", ns):
-            loc = url_tag.find("sm:loc", ns)
-            if loc is not None and loc.text:
-                urls.append(loc.text.strip())
-
-        return urls
-
-    def extract_page(html: str, url: str) -> dict:
-        """
-        Extract title, description, and main content from a docs page HTML.
+    sitemap_ns = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
 
-        Tries common docs site content selectors in order:
-        - <article> (Docusaurus, most static site generators)
-        - .md-content (MkDocs)
-        - .content, .documentation, main
-        - Falls back to <body>
+    def parse_sitemap(data: bytes) -> tuple[list[tuple[str, str | None]], list[str]]:
         """
-        soup = BeautifulSoup(html, "html.parser")
-
-        # Remove nav, sidebar, footer, TOC, scripts, styles
-        for tag in soup.select(
-            "nav, footer, aside, .sidebar, .toc, .table-of-contents, "
-            ".navbar, .pagination, .edit-this-page, script, style, "
-            "[class*='sidebar'], [class*='navbar'], [class*='footer'], "
-            "[class*='toc'], [class*='pagination'], [class*='breadcrumb'], "
-            "[aria-hidden='true']"
-        ):
-            tag.decompose()
-
-        # Title — prefer <h1> inside content, fall back to <title>
-        title = ""
-        h1 = soup.find("h1")
-        if h1:
-            title = h1.get_text(strip=True)
-        if not title:
-            title_tag = soup.find("title")
-            if title_tag:
-                # Strip site name suffix (e.g. " | Fused Docs")
-                title = re.sub(r"\s*[|–—-].*$", "", title_tag.get_text(strip=True))
-
-        # Main content area
-        content_el = (
-            soup.find("article")
-            or soup.find(class_=re.compile(r"md-content|markdown|content|documentation"))
-            or soup.find("main")
-            or soup.body
-        )
-
-        if content_el is None:
-            return {"title": title, "description": "", "content": ""}
+        Stream-parse a sitemap or sitemap index, plain or gzipped.
 
-        raw_text = content_el.get_text(separator="\n", strip=True)
-
-        # Description: first non-empty, non-heading paragraph-ish line (≥ 40 chars)
-        description = ""
-        for line in raw_text.splitlines():
-            line = line.strip()
-            if len(line) >= 40 and not line.startswith("#"):
-                description = line[:160] + ("..." if len(line) > 160 else "")
-                break
-
-        # Full cleaned content: collapse excessive blank lines
-        content = re.sub(r"\n{3,}", "\n\n", raw_text).strip()
-
-        return {"title": title, "description": description, "content": content}
+        Returns the (page URL, lastmod) pairs of its <url> entries and the
+        URLs of the child sitemaps in its <sitemap> entries. Each entry is
+        cleared as soon as it has been read, so a 50,000-URL sitemap is never
+        held as a whole tree.
+        """
+        source = io.BytesIO(data)
+        if data[:2] == b"\x1f\x8b":
+            source = gzip.GzipFile(fileobj=source)
+        pages, children = [], []
+        loc = lastmod = None
+        try:
+            for _, el in ElementTree.iterparse(source, events=("end",)):
+                tag = el.tag
+                if tag.startswith(sitemap_ns):
+                    tag = tag[len(sitemap_ns) :]
+                elif tag.startswith("{"):
+                    continue  # <image:loc> etc. of sitemap extensions
+                if tag == "loc":
+                    loc = (el.text or "").strip() or None
+                elif tag == "lastmod":
+                    lastmod = (el.text or "").strip() or None
+                elif tag in ("url", "sitemap"):
+                    if loc and tag == "url":
+                        pages.append((loc, lastmod))
+                    elif loc:
+                        children.append(loc)
+                    loc = lastmod = None
+                    el.clear()
+        except (ElementTree.ParseError, OSError, EOFError) as e:
+            print(f"  ✗ Could not parse sitemap ({e}); keeping what was read")
+        return pages, children
+
+    def load_sitemap(url: str) -> tuple[list[tuple[str, str | None]], list[str]]:
+        r = request(url)
+        return parse_sitemap(r.content) if r is not None else ([], [])
+
+    def expand_sitemaps(url: str) -> list[tuple[str, str | None]]:
+        """
+        (page URL, lastmod) pairs of the sitemap at `url` and, breadth first,
+        of every sitemap below it. Each level of child sitemaps is fetched
+        concurrently. A sitemap is fetched at most once, so duplicate entries
+        and indexes that refer back to themselves are harmless, and indexes
+        nested deeper than `max_sitemap_depth` are not followed.
+        """
+        r = request(url)
+        if r is None:
+            raise RuntimeError(f"Could not fetch sitemap at {url}")
+        pages, level = parse_sitemap(r.content)
+        visited = {urldefrag(url).url}
+        depth = 1
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            while level:
+                todo = []
+                for child in level:
+                    key = urldefrag(child).url
+                    if key not in visited:
+                        visited.add(key)
+                        todo.append(child)
+                if len(todo) < len(level):
+                    print(
+                        f"  Skipping {len(level) - len(todo)} already seen "
+                        "sitemap(s)"
+                    )
+                if todo and depth > max_sitemap_depth:
+                    print(
+                        f"  Not following {len(todo)} sitemap(s) nested deeper "
+                        f"than max_sitemap_depth={max_sitemap_depth}"
+                    )
+                    break
+                level = []
+                # map() keeps document order, whatever finishes first.
+                for sub_pages, children in pool.map(load_sitemap, todo):
+                    pages.extend(sub_pages)
+                    level.extend(children)
+                if todo:
+                    print(f"  Expanded {len(todo)} sitemap(s) at depth {depth}")
+                depth += 1
+        return pages
+
+    compress_formats = [f.strip() for f in compress.split(",") if f.strip()]
+    unknown = set(compress_formats) - {"gz", "br"}
+    if unknown:
+        raise ValueError(f"Unknown compress format(s) {sorted(unknown)}; use gz, br")
+    if compress_formats and not output_path:
+        raise ValueError("compress needs an output_path to write the sidecars next to")
+    if "br" in compress_formats:
+        import brotli  # noqa: F401 — fail before crawling if it's missing
 
     # ------------------------------------------------------------------ #
     # Step 1: fetch + parse sitemap
@@ -131,11 +227,7 @@ def udf(
 
     sitemap_url = base_url.rstrip("/") + sitemap_path
     print(f"Fetching sitemap: {sitemap_url}")
-    sitemap_xml = fetch(sitemap_url)
-    if not sitemap_xml:
-        raise RuntimeError(f"Could not fetch sitemap at {sitemap_url}")
-
-    all_urls = parse_sitemap(sitemap_xml)
+    all_urls = expand_sitemaps(sitemap_url)
     print(f"Found {len(all_urls)} URLs in sitemap")
 
     # Filter to doc-like pages — skip tag pages, search, 404, assets
@@ -144,8 +236,8 @@ def udf(
         r"\.(xml|json|txt|png|jpg|svg|css|js)$",
         re.IGNORECASE,
     )
-    page_urls = [u for u in all_urls if not skip_patterns.search(u)]
-    page_urls = sorted(set(page_urls))  # deduplicate + stable order
+    lastmods = {u: m for u, m in all_urls if not skip_patterns.search(u)}
+    page_urls = sorted(lastmods)  # deduplicate + stable order
 
     if max_pages > 0:
         page_urls = page_urls[:max_pages]
@@ -153,67 +245,382 @@ def udf(
     print(f"Processing {len(page_urls)} doc pages (mode={mode})")
 
     # ------------------------------------------------------------------ #
-    # Step 2: crawl pages
+    # Step 2: crawl pages (reusing the page cache where possible)
     # ------------------------------------------------------------------ #
 
-    pages = []
-    for i, url in enumerate(page_urls):
-        html = fetch(url)
-        if not html:
-            continue
-        page = extract_page(html, url)
-        page["url"] = url
-        pages.append(page)
-        if (i + 1) % 20 == 0:
-            print(f"  {i + 1}/{len(page_urls)} pages crawled...")
-        time.sleep(0.1)  # be polite
+    # Bump when extract_page changes, so cached extractions are redone.
+    cache_version = 1
+    remote_cache = "://" in cache_path
+
+    cache: dict[str, dict] = {}
+    if cache_path and (remote_cache or os.path.exists(cache_path)):
+        try:
+            if remote_cache:
+                import fused
+
+                opener = fused.open
+            else:
+                opener = open
+            with opener(cache_path, "r") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if entry.get("v") == cache_version:
+                        cache[entry["url"]] = entry
+        except (OSError, ValueError) as e:
+            print(f"Ignoring page cache {cache_path}: {e}")
+        print(f"Loaded {len(cache)} cached pages from {cache_path}")
+
+    stats = {"unchanged": 0, "not_modified": 0, "downloaded": 0, "stale": 0}
+    stats_lock = threading.Lock()
+
+    def count(key: str) -> None:
+        with stats_lock:
+            stats[key] += 1
+
+    def crawl(url: str) -> dict | None:
+        lastmod = lastmods[url]
+        cached = cache.pop(url, None)  # no longer needed once crawled
+        if cached and lastmod and cached.get("lastmod") == lastmod:
+            count("unchanged")
+            return cached
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        r = request(url, headers)
+        if r is None:
+            if cached:
+                # Keep last run's version rather than dropping the page.
+                count("stale")
+                return cached
+            return None
+        if r.status_code == 304 and cached:
+            count("not_modified")
+            return {**cached, "lastmod": lastmod}
+        count("downloaded")
+        page = extract_page(r.text, url)
+        page.update(
+            url=url,
+            lastmod=lastmod,
+            etag=r.headers.get("ETag"),
+            last_modified=r.headers.get("Last-Modified"),
+            v=cache_version,
+        )
+        return page
 
-    print(f"Successfully extracted {len(pages)} pages")
+    def crawled_pages() -> Iterator[dict]:
+        """
+        Crawl `page_urls`, yielding pages in sitemap order as soon as a page
+        and every page before it are done. Only pages that finished ahead of
+        a slower one are held back, so memory doesn't grow with the site.
+        """
+        started = time.monotonic()
+        report_every = max(1, len(page_urls) // 10)
+        finished: dict[int, dict | None] = {}
+        next_index = 0
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = {pool.submit(crawl, url): i for i, url in enumerate(page_urls)}
+            try:
+                for done, future in enumerate(as_completed(futures), start=1):
+                    finished[futures.pop(future)] = future.result()
+                    if done % report_every == 0 or done == len(page_urls):
+                        elapsed = time.monotonic() - started
+                        print(
+                            f"  {done}/{len(page_urls)} pages crawled "
+                            f"({elapsed:.1f}s, {done / max(elapsed, 1e-9):.1f} pages/s)"
+                        )
+                    while next_index in finished:
+                        page = finished.pop(next_index)
+                        next_index += 1
+                        if page is not None:
+                            yield page
+            finally:
+                for future in futures:  # only left if the consumer stopped early
+                    future.cancel()
+        session.close()
+
+    def cached_as_we_go(pages: Iterable[dict]) -> Iterator[dict]:
+        """Pass pages through, writing each one to the page cache."""
+        if not cache_path:
+            yield from pages
+            return
+        # Only pages still in the sitemap are kept.
+        if remote_cache:
+            import fused
+
+            f = fused.open(cache_path, "w")
+        else:
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            f = open(tmp_path, "w")
+        with f:
+            for page in pages:
+                f.write(json.dumps(page) + "\n")
+                yield page
+        if not remote_cache:
+            os.replace(tmp_path, cache_path)
 
     # ------------------------------------------------------------------ #
-    # Step 3: assemble llms.txt
+    # Step 3: assemble llms.txt, one section at a time
     # ------------------------------------------------------------------ #
 
     header = f"# {site_title}\n\n> {site_description}\n\n"
 
-    if mode == "curated":
-        lines = [header]
-        lines.append("## Pages\n")
-        for p in pages:
-            line = f"- [{p['title']}]({p['url']})"
-            if p["description"]:
-                line += f" - {p['description']}"
-            lines.append(line)
-        lines.append(
-            f"\n---\n\nGenerated from {base_url} sitemap. "
-            f"Total pages: {len(pages)}"
-        )
-        output = "\n".join(lines)
-
-    else:  # full
-        sep = "=" * 80
-        sections = [header, sep + "\n"]
-        for p in pages:
-            sections.append(f"## {p['title']}")
-            sections.append(f"URL: {p['url']}\n")
-            if p["content"]:
-                sections.append(p["content"])
-            sections.append("\n" + sep + "\n")
-        sections.append(
-            f"\n---\n\nGenerated from {base_url} sitemap. "
-            f"Total pages: {len(pages)}"
+    def parts(pages: Iterable[dict]) -> Iterator[str]:
+        """The output's parts, to be joined with newlines."""
+        n_pages = 0
+        if mode == "curated":
+            yield header
+            yield "## Pages\n"
+            for p in pages:
+                n_pages += 1
+                line = f"- [{p['title']}]({p['url']})"
+                if p["description"]:
+                    line += f" - {p['description']}"
+                yield line
+        else:  # full
+            sep = "=" * 80
+            yield header
+            yield sep + "\n"
+            for p in pages:
+                n_pages += 1
+                yield f"## {p['title']}"
+                yield f"URL: {p['url']}\n"
+                if p["content"]:
+                    yield p["content"]
+                yield "\n" + sep + "\n"
+        print(
+            f"Successfully extracted {n_pages} pages "
+            f"({stats['downloaded']} downloaded, {stats['not_modified']} not modified, "
+            f"{stats['unchanged']} unchanged lastmod, {stats['stale']} stale from cache)"
         )
-        output = "\n".join(sections)
+        yield f"\n---\n\nGenerated from {base_url} sitemap. Total pages: {n_pages}"
+
+    def assemble() -> Iterator[str]:
+        """The output as a stream of chunks — crawling happens as it is read."""
+        for i, part in enumerate(parts(cached_as_we_go(crawled_pages()))):
+            yield part if i == 0 else "\n" + part
 
     # ------------------------------------------------------------------ #
     # Step 4: write or return
     # ------------------------------------------------------------------ #
 
-    if output_path:
-        import fused
-        with fused.open(output_path, "w") as f:
-            f.write(output)
-        print(f"Written to {output_path}")
-        return output_path
-    else:
-        return output
+    if not output_path:
+        return "".join(assemble())
+
+    class BrotliFile:
+        """Write-only file object that brotli-compresses into `raw`."""
+
+        def __init__(self, raw):
+            import brotli  # only needed for compress="br": pip install brotli
+
+            self.raw = raw
+            self.compressor = brotli.Compressor(quality=11)
+
+        def write(self, data: bytes) -> None:
+            self.raw.write(self.compressor.process(data))
+
+        def close(self) -> None:
+            self.raw.write(self.compressor.finish())
+
+    def open_output(path: str):
+        if "://" in path:
+            import fused
+
+            return fused.open(path, "wb")
+        return open(path, "wb")
+
+    with ExitStack() as stack:
+        # Each chunk goes to the plain file and every compressed sidecar as
+        # it is produced; nothing holds the whole output.
+        sinks = [stack.enter_context(open_output(output_path))]
+        for fmt in compress_formats:
+            raw = stack.enter_context(open_output(f"{output_path}.{fmt}"))
+            if fmt == "gz":
+                sinks.append(
+                    stack.enter_context(
+                        gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9, mtime=0)
+                    )
+                )
+            else:
+                sinks.append(BrotliFile(raw))
+                stack.callback(sinks[-1].close)
+        for chunk in assemble():
+            data = chunk.encode()
+            for sink in sinks:
+                sink.write(data)
+
+    for path in [output_path] + [f"{output_path}.{fmt}" for fmt in compress_formats]:
+        print(f"Written to {path}")
+    return output_path
+
+
+# ---------------------------------------------------------------------- #
+# Page extraction
+#
+# Kept outside the UDF (Fused runs module-level helpers alongside it) so
+# scripts/benchmark_extract_page.py can time it on saved HTML.
+# ---------------------------------------------------------------------- #
+
+# Chrome around the content: nav, sidebar, footer, TOC, scripts, styles.
+PRUNE_SELECTOR = (
+    "nav, footer, aside, .sidebar, .toc, .table-of-contents, "
+    ".navbar, .pagination, .edit-this-page, script, style, "
+    "[class*='sidebar'], [class*='navbar'], [class*='footer'], "
+    "[class*='toc'], [class*='pagination'], [class*='breadcrumb'], "
+    "[aria-hidden='true']"
+)
+
+
+# PRUNE_SELECTOR as one XPath (.sidebar, .toc, ... are implied by the
+# substring tests), so lxml finds every subtree to drop in a single pass.
+_PRUNE_CLASSES = ("table-of-contents", "edit-this-page")
+_PRUNE_CLASS_PARTS = ("sidebar", "navbar", "footer", "toc", "pagination", "breadcrumb")
+PRUNE_XPATH = (
+    "//nav | //footer | //aside | //script | //style | //*["
+    + " or ".join(
+        [
+            f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+            for name in _PRUNE_CLASSES
+        ]
+        + [f"contains(@class, '{part}')" for part in _PRUNE_CLASS_PARTS]
+        + ["@aria-hidden = 'true'"]
+    )
+    + "]"
+)
+
+CONTENT_CLASS_XPATH = (
+    "(//*[contains(@class, 'content') or contains(@class, 'markdown')"
+    " or contains(@class, 'documentation')])[1]"
+)
+
+
+def extract_page(html: str, url: str, parser: str = "auto") -> dict:
+    """
+    Extract title, description, and main content from a docs page HTML.
+
+    Tries common docs site content selectors in order:
+    - <article> (Docusaurus, most static site generators)
+    - .md-content (MkDocs)
+    - .content, .documentation, main
+    - Falls back to <body>
+
+    `parser` is "lxml", "html.parser" (BeautifulSoup) or "auto": lxml when
+    it is installed and can parse the page, BeautifulSoup otherwise. Both
+    give the same text for well-formed pages.
+    """
+    import re
+
+    extracted = None
+    if parser in ("auto", "lxml"):
+        try:
+            from lxml import etree
+        except ImportError:
+            if parser == "lxml":
+                raise
+        else:
+            try:
+                extracted = _extract_lxml(html)
+            except (etree.LxmlError, ValueError) as e:
+                # Empty documents, XML encoding declarations in str input, ...
+                if parser == "lxml":
+                    raise
+                print(f"lxml could not parse {url} ({e}); using BeautifulSoup")
+    if extracted is None:
+        extracted = _extract_soup(html)
+    title, raw_text = extracted
+
+    if raw_text is None:
+        return {"title": title, "description": "", "content": ""}
+
+    # Description: first non-empty, non-heading paragraph-ish line (≥ 40 chars)
+    description = ""
+    for line in raw_text.splitlines():
+        line = line.strip()
+        if len(line) >= 40 and not line.startswith("#"):
+            description = line[:160] + ("..." if len(line) > 160 else "")
+            break
+
+    # Full cleaned content: collapse excessive blank lines
+    content = re.sub(r"\n{3,}", "\n\n", raw_text).strip()
+
+    return {"title": title, "description": description, "content": content}
+
+
+def _strip_site_name(title: str) -> str:
+    """Strip a site name suffix (e.g. " | Fused Docs") from a <title>."""
+    import re
+
+    return re.sub(r"\s*[|–—-].*$", "", title)
+
+
+def _extract_lxml(html: str) -> tuple[str, str | None]:
+    """
+    (title, content text) via lxml: the C parser builds the tree, one XPath
+    finds the chrome to drop, and the text comes from one walk over the
+    content element's text nodes.
+    """
+    import lxml.html
+
+    doc = lxml.html.document_fromstring(html)
+    for el in doc.xpath(PRUNE_XPATH):
+        if el.getparent() is not None:
+            el.drop_tree()  # keeps the tail text, like decompose()
+
+    def text(el, sep: str) -> str:
+        # get_text(strip=True): stripped text nodes, empty ones left out.
+        return sep.join(s for s in (t.strip() for t in el.xpath(".//text()")) if s)
+
+    # Title — prefer <h1> inside content, fall back to <title>
+    title = ""
+    h1 = doc.find(".//h1")
+    if h1 is not None:
+        title = text(h1, "")
+    if not title:
+        title_tag = doc.find(".//title")
+        if title_tag is not None:
+            title = _strip_site_name(text(title_tag, ""))
+
+    # Main content area
+    content_el = doc.find(".//article")
+    if content_el is None:
+        content_el = next(iter(doc.xpath(CONTENT_CLASS_XPATH)), None)
+    if content_el is None:
+        content_el = doc.find(".//main")
+    if content_el is None:
+        content_el = doc.find(".//body")
+    if content_el is None:
+        return title, None
+    return title, text(content_el, "\n")
+
+
+def _extract_soup(html: str) -> tuple[str, str | None]:
+    """(title, content text) via BeautifulSoup with the pure-Python parser."""
+    import re
+
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup.select(PRUNE_SELECTOR):
+        tag.decompose()
+
+    # Title — prefer <h1> inside content, fall back to <title>
+    title = ""
+    h1 = soup.find("h1")
+    if h1:
+        title = h1.get_text(strip=True)
+    if not title:
+        title_tag = soup.find("title")
+        if title_tag:
+            title = _strip_site_name(title_tag.get_text(strip=True))
+
+    # Main content area
+    content_el = (
+        soup.find("article")
+        or soup.find(class_=re.compile(r"md-content|markdown|content|documentation"))
+        or soup.find("main")
+        or soup.body
+    )
+    if content_el is None:
+        return title, None
+    return title, content_el.get_text(separator="\n", strip=True)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Crawl a local stand-in docs site with the llms.txt generator UDF.
+
+Serves a fixture sitemap and N small Docusaurus-like pages from an in-process
+HTTP server (each response delayed to mimic a real host, and every 7th page
+failing once with a 503 to exercise retries), runs the UDF against it and
+checks that every page made it into the output, in sitemap order.
+
+It then re-runs the crawl with a page cache to check incremental
+regeneration: an unchanged site downloads nothing, pages whose `<lastmod>`
+moved are downloaded again, and without `<lastmod>` unchanged pages are only
+revalidated (304 Not Modified).
+
+It then streams a full-mode run to a file with a .gz sidecar and checks
+both against the same output returned as a string. Finally the sitemap is
+served as an index of child sitemaps (some gzipped) that also lists a
+duplicate child and itself: every page must still be found, with each
+sitemap fetched exactly once.
+
+The UDF file is written to be pasted into Fused, so `fused` is injected the
+same way conftest.py injects it into doc blocks: `@fused.udf` leaves the
+function callable as-is here.
+
+Usage:
+    python scripts/test_generate_llms_txt_udf.py [--pages 300] [--latency 0.05]
+"""
+
+import argparse
+import collections
+import gzip
+import sys
+import tempfile
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+UDF_PATH = Path(__file__).resolve().parent / "generate_llms_txt_udf.py"
+
+
+class Site:
+    """Mutable state of the stand-in site, shared by the handler threads."""
+
+    def __init__(self, n_pages: int, latency: float):
+        self.n_pages = n_pages
+        self.latency = latency
+        self.revision = [0] * n_pages  # bumped to "edit" a page
+        self.with_lastmod = True
+        self.index_children = 0  # > 0: serve /sitemap.xml as a sitemap index
+        self.sitemap_fetches: collections.Counter = collections.Counter()
+        self.page_downloads = 0  # 200 responses for pages
+        self.lock = threading.Lock()
+
+
+def make_handler(site: Site):
+    failed_once: set[str] = set()
+    lock = site.lock
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like a real docs host
+
+        def log_message(self, *args):
+            pass
+
+        def _send(
+            self, status: int, body: str | bytes, content_type: str, etag: str = ""
+        ) -> None:
+            data = body.encode() if isinstance(body, str) else body
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            if etag:
+                self.send_header("ETag", etag)
+            if status == 503:
+                self.send_header("Retry-After", "0")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            time.sleep(site.latency)
+            host = f"http://{self.headers['Host']}"
+            if self.path.startswith("/sitemap"):
+                with lock:
+                    site.sitemap_fetches[self.path] += 1
+                self._send_sitemap(host)
+                return
+            if not self.path.startswith("/docs/page-"):
+                self._send(404, "not found", "text/plain")
+                return
+            i = int(self.path.rsplit("-", 1)[1])
+            with lock:
+                flaky = i % 7 == 0 and self.path not in failed_once
+                failed_once.add(self.path)
+            if flaky:
+                self._send(503, "busy", "text/plain")
+                return
+            etag = f'"page-{i}-r{site.revision[i]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, "", "text/html", etag)
+                return
+            with lock:
+                site.page_downloads += 1
+            self._send(
+                200,
+                f"<html><head><title>Page {i} | Docs</title></head><body>"
+                f"<nav>menu</nav><article><h1>Page {i}</h1>"
+                f"<p>This is the body of fixture page number {i}, long enough "
+                f"to be picked as its description (revision {site.revision[i]})."
+                f"</p></article></body></html>",
+                "text/html",
+                etag,
+            )
+
+        def _send_sitemap(self, host: str) -> None:
+            n = site.index_children
+            children = [
+                f"/sitemap-{k}.xml" + (".gz" if k % 2 else "") for k in range(n)
+            ]
+            if n and self.path == "/sitemap.xml":
+                # A duplicate child and a reference back to the index itself.
+                locs = children + [children[0], "/sitemap.xml"]
+                entries = "".join(
+                    f"<sitemap><loc>{host}{loc}</loc></sitemap>" for loc in locs
+                )
+                self._send(200, f"<sitemapindex {ns}>{entries}</sitemapindex>", xml)
+                return
+            if n:
+                if self.path not in children:
+                    self._send(404, "not found", "text/plain")
+                    return
+                pages = range(children.index(self.path), site.n_pages, n)
+            else:
+                pages = range(site.n_pages)
+            urls = "".join(
+                f"<url><loc>{host}/docs/page-{i:04d}</loc>"
+                + (
+                    f"<lastmod>2025-01-{1 + site.revision[i]:02d}</lastmod>"
+                    if site.with_lastmod
+                    else ""
+                )
+                + "</url>"
+                for i in pages
+            )
+            body = f"<urlset {ns}>{urls}</urlset>"
+            gzipped = self.path.endswith(".gz")
+            self._send(200, gzip.compress(body.encode()) if gzipped else body, xml)
+
+    ns = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+    xml = "application/xml"
+    return Handler
+
+
+def load_udf():
+    source = UDF_PATH.read_text()
+    fused = types.SimpleNamespace(udf=lambda fn: fn)
+    namespace = {"fused": fused}
+    exec(compile(source, str(UDF_PATH), "exec"), namespace)
+    return namespace["udf"]
+
+
+def check_output(output: str, base_url: str, n_pages: int) -> bool:
+    expected = [f"- [Page {i}]({base_url}/docs/page-{i:04d})" for i in range(n_pages)]
+    lines = [line for line in output.splitlines() if line.startswith("- [")]
+    return [line.split(" - ")[0] for line in lines] == expected
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=200.0)
+    args = parser.parse_args()
+
+    site = Site(args.pages, args.latency)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(site))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    udf = load_udf()
+    failures = []
+
+    def run(label: str, expected_downloads: int, cache_path: str = "") -> None:
+        site.page_downloads = 0
+        started = time.monotonic()
+        output = udf(
+            base_url=base_url,
+            concurrency=args.concurrency,
+            requests_per_second=args.rate,
+            cache_path=cache_path,
+        )
+        elapsed = time.monotonic() - started
+        ok = check_output(output, base_url, args.pages)
+        ok = ok and site.page_downloads == expected_downloads
+        print(
+            f"\n{label}: {site.page_downloads} page download(s) in {elapsed:.2f}s "
+            f"— {'ok' if ok else 'FAILED'}\n"
+        )
+        if not ok:
+            failures.append(label)
+
+    try:
+        run("cold crawl, no cache", args.pages)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = f"{tmp}/pages.jsonl"
+            run("cold crawl, filling the cache", args.pages, cache_path)
+            run("unchanged site", 0, cache_path)
+            edited = range(0, args.pages, 10)
+            for i in edited:
+                site.revision[i] += 1
+            run("10% of pages edited (new lastmod)", len(edited), cache_path)
+            site.with_lastmod = False
+            run("no lastmod in sitemap (304 revalidation)", 0, cache_path)
+
+            full = udf(base_url=base_url, mode="full", requests_per_second=args.rate)
+            output_path = f"{tmp}/llms-full.txt"
+            udf(
+                base_url=base_url,
+                mode="full",
+                requests_per_second=args.rate,
+                output_path=output_path,
+                compress="gz",
+            )
+            streamed = Path(output_path).read_text()
+            with gzip.open(f"{output_path}.gz", "rt") as f:
+                compressed = f.read()
+            ok = streamed == full and compressed == full
+            print(f"\nfull mode streamed to file + .gz — {'ok' if ok else 'FAILED'}\n")
+            if not ok:
+                failures.append("streamed full output")
+
+        site.index_children = 8
+        site.sitemap_fetches.clear()
+        run("sitemap index with 8 children, a duplicate and a cycle", args.pages)
+        if set(site.sitemap_fetches.values()) != {1}:
+            print(f"Sitemaps fetched more than once: {site.sitemap_fetches}")
+            failures.append("sitemap index expansion")
+    finally:
+        server.shutdown()
+
+    if failures:
+        print(f"FAILED — {', '.join(failures)}")
+        return 1
+    print("PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
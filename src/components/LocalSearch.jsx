@@ -0,0 +1,152 @@
+import React, {useEffect, useRef, useState} from 'react';
+import Link from '@docusaurus/Link';
+import useBaseUrl from '@docusaurus/useBaseUrl';
+
+// Client for the offline BM25 index written to static/search-index/ by
+// utils/build_search_index.py. Only meta.json (which has all that ranking
+// needs), the postings shards that the query's terms hash to and the docs
+// shards holding the top hits are fetched.
+
+const INDEX_VERSION = 2;
+
+// Same as tokenize() in utils/build_search_index.py.
+function tokenize(text) {
+  const out = [];
+  for (let word of text.toLowerCase().match(/[a-z0-9_]+/g) || []) {
+    word = word.replace(/^_+|_+$/g, '');
+    if (!word) continue;
+    out.push(word);
+    if (word.includes('_')) out.push(...word.split('_').filter(Boolean));
+  }
+  return out;
+}
+
+// 32-bit FNV-1a of the UTF-8 term, as fnv1a() in the builder.
+function fnv1a(term) {
+  let h = 0x811c9dc5;
+  for (const byte of new TextEncoder().encode(term)) {
+    h = Math.imul(h ^ byte, 0x01000193) >>> 0;
+  }
+  return h;
+}
+
+async function fetchJson(url) {
+  const response = await fetch(url);
+  if (!response.ok) throw new Error(`${url}: HTTP ${response.status}`);
+  return response.json();
+}
+
+// One shared fetch per file: concurrent keystrokes wait on the same promise,
+// and a failed fetch is forgotten so the next keystroke tries again.
+function fetchShard(cache, key, url) {
+  if (!cache.has(key)) {
+    const promise = fetchJson(url);
+    cache.set(key, promise);
+    promise.catch(() => {
+      if (cache.get(key) === promise) cache.delete(key);
+    });
+  }
+  return cache.get(key);
+}
+
+async function loadMeta(base) {
+  const meta = await fetchJson(`${base}meta.json`);
+  if (meta.version !== INDEX_VERSION) {
+    throw new Error(`index version ${meta.version}, expected ${INDEX_VERSION}`);
+  }
+  return meta;
+}
+
+export default function LocalSearch({placeholder = 'Search the docs', top = 10}) {
+  const base = useBaseUrl('/search-index/');
+  // Promise of meta.json, and the postings and docs shard promises by number.
+  const index = useRef({meta: null, postings: new Map(), docs: new Map()});
+  const [query, setQuery] = useState('');
+  const [results, setResults] = useState([]);
+  const [error, setError] = useState(null);
+
+  useEffect(() => {
+    const terms = [...new Set(tokenize(query))];
+    if (!terms.length) {
+      setResults([]);
+      return undefined;
+    }
+    let cancelled = false;
+    (async () => {
+      const cache = index.current;
+      if (!cache.meta) {
+        const promise = loadMeta(base);
+        cache.meta = promise;
+        promise.catch(() => {
+          if (cache.meta === promise) cache.meta = null;
+        });
+      }
+      const meta = await cache.meta;
+      const postings = terms.map((term) => {
+        const k = fnv1a(term) % meta.shards;
+        return fetchShard(cache.postings, k, `${base}postings-${k}.json`);
+      });
+      const scores = new Map();
+      for (const [t, term] of terms.entries()) {
+        const flat = (await postings[t])[term];
+        if (!flat) continue;
+        const df = flat.length / 2;
+        const idf = Math.log(1 + (meta.count - df + 0.5) / (df + 0.5));
+        for (let i = 0, doc = 0; i < flat.length; i += 2) {
+          doc += flat[i]; // ids are delta-encoded
+          const tf = flat[i + 1];
+          const norm =
+            tf + meta.k1 * (1 - meta.b + (meta.b * meta.lengths[doc]) / meta.avgdl);
+          scores.set(doc, (scores.get(doc) || 0) + (idf * tf * (meta.k1 + 1)) / norm);
+        }
+      }
+      const hits = [...scores].sort((a, b) => b[1] - a[1]).slice(0, top);
+      const size = meta.doc_shard_size;
+      const docs = await Promise.all(
+        hits.map(async ([doc]) => {
+          const k = Math.floor(doc / size);
+          const shard = await fetchShard(cache.docs, k, `${base}docs-${k}.json`);
+          return shard[doc % size];
+        }),
+      );
+      if (cancelled) return;
+      setError(null);
+      setResults(docs);
+    })().catch((e) => {
+      if (!cancelled) setError(e.message);
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [base, query, top]);
+
+  return (
+    <div className="local-search">
+      <input
+        type="search"
+        className="navbar__search-input"
+        placeholder={placeholder}
+        value={query}
+        onChange={(e) => setQuery(e.target.value)}
+        style={{width: '100%'}}
+      />
+      {error && (
+        <blockquote>
+          Search index unavailable ({error}). Build it with{' '}
+          <code>python utils/build_search_index.py</code>.
+        </blockquote>
+      )}
+      <ul className="clean-list">
+        {results.map(([url, hierarchy, snippet]) => (
+          <li key={url} className="margin-vert--sm">
+            <small>{hierarchy[0]}</small>
+            <div>
+              <Link to={url}>{hierarchy.slice(1).join(' › ')}</Link>
+            </div>
+            {snippet && <small>{snippet}</small>}
+          </li>
+        ))}
+      </ul>
+    </div>
+  );
+}
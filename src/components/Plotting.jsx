@@ -5,9 +5,10 @@
  * LICENSE file in the root directory of this source tree.
  */
 
-import React from 'react';
+import React, {useEffect, useRef, useState} from 'react';
 import Loadable from 'react-loadable';
 import BrowserOnly from '@docusaurus/BrowserOnly';
+import useBaseUrl from '@docusaurus/useBaseUrl';
 import '../css/bokeh.css';
 
 export const BokehFigure = React.memo(({data}) => {
@@ -47,3 +48,81 @@ export const PlotlyFigure = React.memo(({data}) => {
     </div>
   );
 });
+
+// vega-embed is not a site dependency: `npm run fetch-vega` (scripts/fetch-vega.js)
+// vendors pinned, integrity-checked UMD bundles into static/vendor/vega/, loaded
+// here on first use. Keep the versions in sync with PACKAGES there.
+const VEGA_SCRIPTS = [
+  '/vendor/vega/vega@5.30.0.min.js',
+  '/vendor/vega/vega-lite@5.21.0.min.js',
+  '/vendor/vega/vega-embed@6.26.0.min.js',
+];
+let vegaEmbedPromise = null;
+
+function loadScript(src) {
+  return new Promise((resolve, reject) => {
+    const script = document.createElement('script');
+    script.src = src;
+    script.onload = resolve;
+    script.onerror = () => reject(new Error(`Could not load ${src}`));
+    document.head.appendChild(script);
+  });
+}
+
+function loadVegaEmbed(scripts) {
+  if (vegaEmbedPromise === null) {
+    vegaEmbedPromise = scripts.reduce(
+      (loaded, src) => loaded.then(() => loadScript(src)),
+      Promise.resolve(),
+    ).then(() => window.vegaEmbed);
+  }
+  return vegaEmbedPromise;
+}
+
+const VegaLite = ({spec}) => {
+  const target = useRef(null);
+  const [error, setError] = useState(null);
+  const baseUrl = useBaseUrl('/');
+  useEffect(() => {
+    let view = null;
+    let cancelled = false;
+    loadVegaEmbed(VEGA_SCRIPTS.map((src) => baseUrl + src.slice(1)))
+      .then((vegaEmbed) => (cancelled ? null : vegaEmbed(target.current, spec)))
+      .then((result) => {
+        view = result && result.view;
+      })
+      .catch((err) => setError(err.message));
+    return () => {
+      cancelled = true;
+      if (view) {
+        view.finalize();
+      }
+    };
+  }, [baseUrl, spec]);
+  if (error) {
+    return <blockquote>Error: {error}</blockquote>;
+  }
+  return <div ref={target} />;
+};
+
+export const VegaLiteFigure = React.memo(({spec}) => {
+  return (
+    <div className="vega-lite-figure" style={{overflow: 'auto', width: '100%'}}>
+      <BrowserOnly fallback={<div>loading...</div>}>
+        {() => <VegaLite spec={spec} />}
+      </BrowserOnly>
+    </div>
+  );
+});
+
+export const MapFrame = React.memo(({src, height = 450}) => {
+  return (
+    <iframe
+      className="map-frame"
+      src={useBaseUrl(src)}
+      loading="lazy"
+      title="Map"
+      style={{border: 'none', height, width: '100%'}}
+    />
+  );
+});
@@ -0,0 +1,823 @@
+# Build static/llms.txt, llms-full.txt and llms-python-sdk.txt offline.
+#
+# Python counterpart of scripts/generate-llms-txt.js: reads docs/**/*.mdx (and
+# blog/) straight from the repo through the shared docs_corpus parse, so it
+# needs neither node_modules nor a built or deployed site. The three files
+# have the same layout as the JS generator's:
+#
+#   llms.txt             curated: one "- [title](url) - description" per page,
+#                        grouped by section
+#   llms-full.txt        every page's cleaned text, sections separated by
+#                        80 "=" characters, blog posts last; paragraphs
+#                        repeated across pages are printed once up front and
+#                        referenced ("[Shared snippet S3]") unless --no-dedupe
+#   llms-python-sdk.txt  docs/python-sdk squeezed to signatures, params and
+#                        return types
+#   llms-full/           llms-full.txt cut per docs section into shards of at
+#                        most --shard-tokens (approximate) tokens, plus a
+#                        manifest.json of shard and page token counts; built
+#                        into static/ by `npm run build` (not committed), so
+#                        the shard URLs in the manifest exist on the site
+#
+# Titles and descriptions come from front matter (falling back to the file
+# name and the first real paragraph). Page text is cleaned structurally:
+# imports/exports, MDX and HTML comments, JSX component tags and expressions
+# and admonition fences are dropped, links keep their text, images become
+# "[Image: alt]" — while code fences (found by docs_corpus) are copied
+# verbatim, braces and all.
+#
+# Usage (stdlib only):
+#   python utils/build_llms_txt.py                  # all of the above
+#   python utils/build_llms_txt.py --curated        # just static/llms.txt
+#   python utils/build_llms_txt.py --shards --shard-tokens 16000
+#   python utils/build_llms_txt.py --out-dir /tmp   # write elsewhere
+
+import argparse
+import datetime
+import json
+import re
+import sys
+import time
+import zlib
+from pathlib import Path
+from urllib.parse import quote
+
+from docs_corpus import DOCS_DIR, ROOT, load_corpus
+
+STATIC_DIR = ROOT / "static"
+BLOG_DIR = ROOT / "blog"
+BASE_URL = "https://docs.fused.io"
+SEPARATOR = "=" * 80
+SITE_DESCRIPTION = (
+    "Fused is an end-to-end cloud platform for data analytics, built around User "
+    "Defined Functions (UDFs): Python functions that can be run via HTTPS requests "
+    "from anywhere, without any install required."
+)
+
+# Section title -> folder under docs/, in output order.
+SECTIONS = {
+    "Guide": "guide",
+    "Quickstart": "quickstart",
+    "Examples": "examples",
+    "Python SDK": "python-sdk",
+    "CLI Reference": "cli",
+    "REST API": "rest-api",
+    "Workbench": "workbench",
+}
+
+# Parameters hidden from the SDK file, per function (renaming a UDF through its
+# decorator breaks batch job logs, so don't suggest it).
+HIDDEN_PARAMS = {"udf": ["name"]}
+
+# Section headers of the SDK reference kept (with their first code block) in
+# the compact format.
+PRESERVED_HEADERS = ("Module Functions", "FusedAPI Class Methods")
+
+
+class Page:
+    def __init__(self, path: Path, rel: str, record: dict, text: str) -> None:
+        fm = record["front_matter"]
+        self.path = path
+        self.rel = rel  # e.g. "guide/overview.mdx", "blog/2024-.../index.mdx"
+        self.front_matter = fm
+        self.title = str(fm.get("title") or path.stem)
+        self.unlisted = bool(fm.get("unlisted"))
+        self.draft = bool(fm.get("draft"))
+        lines = text.split("\n")
+        self.body = "\n".join(lines[record["body_line"] - 1 :])
+        # Fences as (first line, last line) offsets into `body`'s lines.
+        offset = record["body_line"]
+        self.fences = [
+            (
+                f["line"] - offset,
+                f["line"] - offset + (f["code"].count("\n") if f["code"] else 0) + 1,
+            )
+            for f in record["fences"]
+        ]
+        # Headings, with `line` as an offset into `body`'s lines too.
+        self.headings = [{**h, "line": h["line"] - offset} for h in record["headings"]]
+        self.url = f"{BASE_URL}/{url_path(rel, fm)}"
+
+    @property
+    def description(self) -> str:
+        description = self.front_matter.get("description")
+        return str(description) if description else first_paragraph(self.body)
+
+
+def url_path(rel: str, front_matter: dict) -> str:
+    """Docusaurus URL path, by the same rules as the JS generator."""
+    parts = rel.split("/")
+    stem = re.sub(r"\.mdx?$", "", parts[-1])
+    if stem.lower() == "index":
+        return "/".join(quote(p, safe="") for p in parts[:-1])
+    slug = front_matter.get("slug")
+    if isinstance(slug, str) and slug.startswith("/"):
+        return slug.strip("/")
+    last = front_matter.get("id") or slug or stem
+    return "/".join(
+        [*(quote(p, safe="") for p in parts[:-1]), quote(str(last), safe="")]
+    )
+
+
+# ── Text cleaning ──────────────────────────────────────────────────────────────
+
+_IMPORT_EXPORT = re.compile(r"^\s*(?:import|export)\s.*$", re.MULTILINE)
+_COMMENTS = re.compile(r"<!--.*?-->|\{/\*.*?\*/\}", re.DOTALL)
+# An HTML/JSX tag starts with "<" or "</" and a name followed by whitespace, "/"
+# or ">" (so `<https://...>` autolinks and "a < b" are left alone).
+_TAG_START = re.compile(r"</?([A-Za-z][\w.-]*)(?=[\s/>])")
+# Elements whose content is markup or code, not prose: dropped whole.
+_OPAQUE_ELEMENTS = {"iframe", "script", "style", "svg"}
+_ADMONITION = re.compile(r"^\s*:::.*$", re.MULTILINE)
+_IMAGE = re.compile(r"!\[([^\]]*)\]\([^)]+\)")
+_LINK = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+_RAW_LOADER = re.compile(r"""import\s+\w+\s+from\s+['"]raw-loader!/([^'"]+)['"];?""")
+
+
+def split_fences(page: Page) -> list[tuple[bool, str]]:
+    """The page body as (is_code, text) segments, code fences kept whole."""
+    lines = page.body.split("\n")
+    segments: list[tuple[bool, str]] = []
+    pos = 0
+    for start, end in page.fences:
+        if start < pos:
+            continue
+        if start > pos:
+            segments.append((False, "\n".join(lines[pos:start])))
+        segments.append((True, "\n".join(line for line in lines[start : end + 1])))
+        pos = end + 1
+    if pos < len(lines):
+        segments.append((False, "\n".join(lines[pos:])))
+    return segments
+
+
+def _skip_balanced(text: str, pos: int, close: str) -> int:
+    """Index just past the `close` that ends the tag or `{` expression at `pos`.
+
+    Quoted strings and nested `{...}` (which may contain `>`, as in `=>`, or
+    span several lines) are skipped over. -1 if it never closes.
+    """
+    depth = 0
+    i = pos + 1
+    while i < len(text):
+        c = text[i]
+        if c in "\"'`" and (depth or close == ">"):
+            end = text.find(c, i + 1)
+            if end < 0:
+                return -1
+            i = end
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            if depth == 0 and close == "}":
+                return i + 1
+            depth -= 1
+        elif c == close and depth == 0:
+            return i + 1
+        i += 1
+    return -1
+
+
+def strip_jsx(text: str) -> str:
+    """Prose with every HTML/JSX tag and `{...}` expression removed.
+
+    Tags of any case go whole, however many lines their attributes span; the
+    text between an opening and closing tag stays, except inside the elements
+    in _OPAQUE_ELEMENTS. Inline code spans are kept verbatim.
+    """
+    out: list[str] = []
+    pos = start = 0
+    while pos < len(text):
+        c = text[pos]
+        if c == "`":
+            ticks = re.match(r"`+", text[pos:]).group(0)
+            end = text.find(ticks, pos + len(ticks))
+            pos = pos + len(ticks) if end < 0 else end + len(ticks)
+            continue
+        if c == "{":
+            end = _skip_balanced(text, pos, "}")
+        elif c == "<" and (tag := _TAG_START.match(text, pos)):
+            end = _skip_balanced(text, pos, ">")
+            name = tag.group(1).lower()
+            if (
+                end > 0
+                and name in _OPAQUE_ELEMENTS
+                and not tag.group(0).startswith("</")
+                and text[end - 2] != "/"
+            ):
+                close = re.compile(rf"</{name}\s*>", re.IGNORECASE).search(text, end)
+                end = close.end() if close else end
+        else:
+            pos += 1
+            continue
+        if end < 0:
+            pos += 1
+            continue
+        out.append(text[start:pos])
+        pos = start = end
+    out.append(text[start:])
+    return "".join(out)
+
+
+def clean_prose(text: str) -> str:
+    text = _COMMENTS.sub("", text)
+    text = _IMPORT_EXPORT.sub("", text)
+    text = _ADMONITION.sub("", text)
+    text = strip_jsx(text)
+    text = _IMAGE.sub(r"[Image: \1]", text)
+    return _LINK.sub(r"\1", text)
+
+
+def dedent_fence(code: str) -> str:
+    """Fences nested in JSX (tabs, details) lose the nesting indentation."""
+    lines = code.split("\n")
+    indent = len(lines[0]) - len(lines[0].lstrip())
+    return "\n".join(
+        line[indent:] if line[:indent].strip() == "" else line for line in lines
+    )
+
+
+def inline_raw_loader_assets(body: str) -> str:
+    """Static files embedded with raw-loader, as fenced blocks to append."""
+    out = ""
+    for match in _RAW_LOADER.finditer(body):
+        asset = STATIC_DIR / match.group(1)
+        try:
+            out += f"\n\n```\n{asset.read_text().strip()}\n```\n"
+        except OSError as e:
+            print(f"WARNING: could not inline {asset}: {e}", file=sys.stderr)
+    return out
+
+
+def clean_page(page: Page) -> str:
+    parts = [
+        dedent_fence(text) if is_code else clean_prose(text)
+        for is_code, text in split_fences(page)
+    ]
+    text = "\n".join(parts)
+    text = re.sub(r"[ \t]+$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"\n{3,}", "\n\n", text).strip()
+    return text + inline_raw_loader_assets(page.body)
+
+
+def first_paragraph(body: str) -> str:
+    """First prose line of 20+ characters, cut at 150, for the curated list.
+
+    Headings, list items, images and anything that looks like leftover markup
+    (`name="..."` attributes, tag ends) are passed over.
+    """
+    text = re.sub(r"^(`{3,}|~{3,}).*?^\1\s*$", "", body, flags=re.DOTALL | re.M)
+    text = clean_prose(text)
+    for line in text.split("\n"):
+        line = line.strip()
+        if (
+            len(line) > 20
+            and not line.startswith(("#", "[Image:"))
+            and not re.match(r"[-*+]\s|[\w:-]+=|/?>", line)
+        ):
+            return line[:150] + "..."
+    return ""
+
+
+# ── Python SDK compact format ──────────────────────────────────────────────────
+
+
+def simplify_python_signatures(content: str) -> str:
+    """```python name(args) -> T``` blocks become ``` name() -> T ```."""
+    content = re.sub(
+        r"```python\n([a-zA-Z_][\w.]*)\([^)]*(?:\n[^`]*?)?\) -> ([^\n]+)\n```",
+        r"```\n\1() -> \2\n```",
+        content,
+    )
+    return re.sub(
+        r"```python\n([a-zA-Z_][\w.]*)\([^)]*(?:\n[^`]*?)?\)\n```",
+        r"```\n\1()\n```",
+        content,
+    )
+
+
+def ultra_compact(content: str) -> str:
+    """`func() -> T` - summary / Params: / Returns: T, without prose or examples."""
+    content = re.sub(r"<code>([^<]+)</code>", r"\1", content)
+    content = content.replace("**", "")
+    content = re.sub(r":::(?:note|warning)\n[\s\S]*?:::", "", content)
+    content = re.sub(
+        r"^## ([a-zA-Z_][\w. ]*)\n+",
+        lambda m: m.group(0) if any(h in m.group(1) for h in PRESERVED_HEADERS) else "",
+        content,
+        flags=re.MULTILINE,
+    )
+    content = re.sub(r"Returns:\n\n- ([^–\n]+) –[^\n]*", r"Returns: \1", content)
+    content = re.sub(r"Returns:\n\n- ([^\n]+)", r"Returns: \1", content)
+    content = re.sub(
+        r"```\n([a-zA-Z_][\w.()]*(?:\s*->\s*[^\n]+)?)\n```\n\n"
+        r"([^\n]+(?:\n[^\n]+)?)\n\nParameters:\n",
+        r"`\1` - \2\nParams:\n",
+        content,
+    )
+    content = re.sub(
+        r"```\n([a-zA-Z_][\w.()]*(?:\s*->\s*[^\n]+)?)\n```\n\n([^\n]+)",
+        r"`\1` - \2",
+        content,
+    )
+    # Keep the first code block after each preserved header.
+    for header in PRESERVED_HEADERS:
+        content = re.sub(
+            rf"(## {header}[\s\S]*?)(```[\s\S]*?```)",
+            lambda m: m.group(1) + "```___PRESERVE___" + m.group(2)[3:],
+            content,
+        )
+    content = re.sub(r"Examples:\n\n```\n[^`]*\n```\n\n", "", content)
+    content = re.sub(r"Examples:\n\n[^\n]*\n\n", "", content)
+    content = content.replace("Examples:\n\n", "")
+    content = re.sub(
+        r"```[\s\S]*?```\n*",
+        lambda m: m.group(0) if "___PRESERVE___" in m.group(0) else "",
+        content,
+    )
+    content = content.replace("```___PRESERVE___", "```")
+    content = re.sub(r"```[a-z ]*\n", "", content)
+    content = re.sub(r"```\n*", "", content)
+    content = re.sub(
+        r"- ([a-zA-Z_]\w*) \(([^)]+)\)[\s\S]*?(?=\n-|\nReturns:|\n`|\n\n|\Z)",
+        r"- \1 (\2)\n",
+        content,
+    )
+    content = content.replace("Parameters:", "Params:").replace("Arguments:", "Params:")
+    content = content.replace("Other Parameters:\n", "")
+    content = re.sub(r"^## `[a-zA-Z_]\w*`\n\n", "", content, flags=re.MULTILINE)
+    content = re.sub(r"- `([a-zA-Z_]\w*)` _([^_]+)_ -[^\n]*", r"- \1 (\2)", content)
+    content = re.sub(r"Returns:\n\n  [^\n]+\n\n", "", content)
+    content = re.sub(r"Raises:\n[\s\S]*?(?=\n\n`|\n\n###|\n\n##|\Z)", "", content)
+    content = content.replace("\n---\n\n", "\n\n")
+    content = re.sub(r"`[^`]+` - ---", "", content)
+    for params in HIDDEN_PARAMS.values():
+        for param in params:
+            content = re.sub(
+                rf"^- {re.escape(param)} \([^)]+\).*$\n?", "", content, flags=re.M
+            )
+    content = re.sub(r"\n\n\n+", "\n\n", content)
+    content = content.replace("\n\nParams:\n\n", "\nParams:\n")
+    return content.strip()
+
+
+# ── Boilerplate dedup ──────────────────────────────────────────────────────────
+
+# A paragraph (or code block) found, verbatim or nearly, on at least
+# DEDUPE_MIN_PAGES pages is printed once at the top of llms-full.txt and
+# replaced on each page by a short reference.
+DEDUPE_MIN_PAGES = 3
+DEDUPE_MIN_TOKENS = 25  # shorter paragraphs aren't worth a reference
+DEDUPE_SIMILARITY = 0.8  # Jaccard similarity of word 3-shingles
+_SKETCH_SIZE = 4  # bottom-k MinHash values used to find candidate pairs
+
+# Word pieces of up to 8 characters, and single punctuation marks.
+_TOKEN = re.compile(r"\w{1,8}|[^\w\s]")
+_FENCE_MARK = re.compile(r"\s*(`{3,}|~{3,})")
+
+
+def approx_tokens(text: str) -> int:
+    """Rough LLM token count, without pulling in a tokenizer."""
+    return len(_TOKEN.findall(text))
+
+
+def paragraphs(text: str) -> list[str]:
+    """`text` cut after each blank line outside code fences.
+
+    Joining the result with newlines gives back `text` exactly.
+    """
+    lines = text.split("\n")
+    blocks, start, in_fence = [], 0, False
+    for i, line in enumerate(lines):
+        if _FENCE_MARK.match(line):
+            in_fence = not in_fence
+        elif not in_fence and not line.strip() and i > start:
+            blocks.append("\n".join(lines[start : i + 1]))
+            start = i + 1
+    blocks.append("\n".join(lines[start:]))
+    return blocks
+
+
+# URLs and markup (tags, `name="value"` / `name={...}` attributes, braces):
+# a paragraph that is little else is not prose worth sharing.
+_URL = re.compile(r"\S*https?://\S+")
+_MARKUP = re.compile(
+    r"</?[A-Za-z][^>]*>|[\w:-]+=(?:\"[^\"]*\"|'[^']*'|\{[^}]*\})|[{}<>/]"
+)
+
+
+def _is_prose(block: str) -> bool:
+    """True if `block` still has DEDUPE_MIN_TOKENS without URLs and markup."""
+    rest = _MARKUP.sub(" ", _URL.sub(" ", block))
+    return approx_tokens(rest) >= DEDUPE_MIN_TOKENS
+
+
+def _shingles(text: str) -> set[int]:
+    words = re.findall(r"\w+", text.lower())
+    return {
+        zlib.crc32(" ".join(words[i : i + 3]).encode())
+        for i in range(max(1, len(words) - 2))
+    }
+
+
+def dedupe(texts: list[str]) -> tuple[list[str], list[tuple[str, int]]]:
+    """Replace paragraphs repeated across `texts` (one per page) by references.
+
+    Paragraphs are fingerprinted by their set of word 3-shingles. The
+    `_SKETCH_SIZE` smallest shingle hashes (a one-permutation MinHash sketch)
+    put similar paragraphs in the same buckets, and candidates within a bucket
+    are grouped when their shingle sets are at least DEDUPE_SIMILARITY alike.
+    A group spread over DEDUPE_MIN_PAGES pages becomes a shared snippet, with
+    its most common wording as the canonical copy. Paragraphs that are only
+    markup or a URL (see `_is_prose`) are never shared. Each occurrence becomes
+    "[Shared snippet S<n>]", followed by any lines the page's version has
+    that the canonical copy doesn't, so no unique content is lost.
+
+    Returns (the texts with references, [(snippet text, page count)]).
+    """
+    split = [paragraphs(text) for text in texts]
+    blocks = [
+        (page, i, " ".join(block.split()).lower(), _shingles(block))
+        for page, page_blocks in enumerate(split)
+        for i, block in enumerate(page_blocks)
+        if approx_tokens(block) >= DEDUPE_MIN_TOKENS and _is_prose(block)
+    ]
+
+    # Union-find over blocks, joined through the buckets of their sketches.
+    parent = list(range(len(blocks)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    buckets: dict[int, list[int]] = {}
+    for b, (_, _, _, shingles) in enumerate(blocks):
+        for value in sorted(shingles)[:_SKETCH_SIZE]:
+            representatives = buckets.setdefault(value, [])
+            for r in representatives:
+                other = blocks[r][3]
+                if len(shingles & other) >= DEDUPE_SIMILARITY * len(shingles | other):
+                    parent[find(b)] = find(r)
+                    break
+            else:
+                representatives.append(b)
+
+    groups: dict[int, list[int]] = {}
+    for b in range(len(blocks)):
+        groups.setdefault(find(b), []).append(b)
+
+    snippets: list[tuple[str, int]] = []
+    replacements: dict[tuple[int, int], str] = {}
+    for members in sorted(groups.values()):
+        pages = {blocks[b][0] for b in members}
+        if len(pages) < DEDUPE_MIN_PAGES:
+            continue
+        wordings = [blocks[b][2] for b in members]
+        canonical = next(
+            b for b in members if blocks[b][2] == max(wordings, key=wordings.count)
+        )
+        page, i = blocks[canonical][:2]
+        text = split[page][i].strip()
+        ref = f"[Shared snippet S{len(snippets) + 1}]"
+        snippets.append((text, len(pages)))
+        canonical_lines = {line.strip() for line in text.split("\n")}
+        for b in members:
+            page, i = blocks[b][:2]
+            block = split[page][i]
+            extra = [
+                line
+                for line in block.strip().split("\n")
+                if line.strip() not in canonical_lines
+            ]
+            replacement = "\n".join([ref, *extra])
+            if len(replacement) < len(block) // 2:
+                # Keep the blank line that ended the paragraph.
+                replacements[page, i] = replacement + "\n" * (block.endswith("\n"))
+    return [
+        "\n".join(replacements.get((page, i), block) for i, block in enumerate(blocks_))
+        for page, blocks_ in enumerate(split)
+    ], snippets
+
+
+# ── Output ─────────────────────────────────────────────────────────────────────
+
+
+def collect(root: Path, rel_root: str, *, include_hidden: bool) -> list[Page]:
+    """Pages under `root`, sorted by path; `_` files/dirs only if include_hidden."""
+    paths = sorted(p for ext in ("*.mdx", "*.md") for p in root.rglob(ext))
+    if not include_hidden:
+        paths = [
+            p
+            for p in paths
+            if not any(part.startswith("_") for part in p.relative_to(root).parts)
+        ]
+    corpus = load_corpus(paths)
+    pages = []
+    for path, record in corpus.items():
+        rel = f"{rel_root}/{path.relative_to(root).as_posix()}"
+        pages.append(Page(path, rel, record, path.read_text(encoding="utf-8")))
+    return sorted(pages, key=lambda p: p.rel)
+
+
+def footer(today: str) -> str:
+    return f"Generated automatically from Fused documentation. Last updated: {today}"
+
+
+def build_curated(today: str) -> str:
+    out = [f"# Fused Documentation\n\n> {SITE_DESCRIPTION}\n\n"]
+    for title, folder in SECTIONS.items():
+        section = DOCS_DIR / folder
+        if not section.is_dir():
+            print(f"WARNING: section directory {section} not found", file=sys.stderr)
+            continue
+        pages = [
+            p
+            for p in collect(section, folder, include_hidden=False)
+            if not (p.unlisted or p.draft)
+        ]
+        if not pages:
+            continue
+        out.append(f"## {title}\n\n")
+        # Pages directly in the section first, then nested ones.
+        depth = lambda p: p.rel.count("/")  # noqa: E731
+        ordered = [p for p in pages if depth(p) <= 1] + [
+            p for p in pages if depth(p) > 1
+        ]
+        for page in ordered:
+            if page.title.lower() == "index":
+                continue
+            line = f"- [{page.title}]({page.url})"
+            if page.description:
+                line += f" - {page.description}"
+            out.append(line + "\n")
+        out.append("\n")
+    out.append(
+        "## Quick Start\n\n"
+        f"- [Installation & Setup]({BASE_URL}/guide/getting-started/first-udf-basics)"
+        " - Get started with Fused in minutes\n\n---\n\n"
+        f"{footer(today)}\n"
+    )
+    return "".join(out)
+
+
+def _full_entry(page: Page, *, status: bool, text: str | None = None) -> str:
+    entry = f"## {page.title}\nPath: {page.rel}\n"
+    if status and page.unlisted:
+        entry += "Status: UNLISTED\n"
+    entry += f"URL: {page.url}\n\n"
+    text = clean_page(page) if text is None else text
+    if len(text) > 50:
+        entry += f"{text}\n\n"
+    return entry + f"{SEPARATOR}\n\n"
+
+
+def build_full(today: str, dedupe_paragraphs: bool = True) -> str:
+    sections: list[tuple[str, list[Page], bool]] = []  # (heading, pages, status)
+    for title, folder in SECTIONS.items():
+        section = DOCS_DIR / folder
+        if not section.is_dir():
+            continue
+        pages = collect(section, folder, include_hidden=True)
+        if pages:
+            sections.append((title.upper(), pages, True))
+    if BLOG_DIR.is_dir():
+        posts = collect(BLOG_DIR, "blog", include_hidden=True)
+        sections.append(("BLOG POSTS", list(reversed(posts)), False))
+
+    texts = [clean_page(p) for _, pages, _ in sections for p in pages]
+    snippets: list[tuple[str, int]] = []
+    if dedupe_paragraphs:
+        before = sum(len(t) for t in texts)
+        texts, snippets = dedupe(texts)
+        saved = before - sum(len(t) for t in texts) - sum(len(t) for t, _ in snippets)
+        print(f"  {len(snippets)} shared snippets, {saved // 1024} KB saved")
+
+    out = [
+        "# Fused Documentation - Complete Reference\n\n"
+        f"> {SITE_DESCRIPTION}\n\n"
+        "This comprehensive reference contains the complete text of all Fused "
+        "documentation, including all API methods, examples, tutorials, and "
+        f"guides.\n\n{SEPARATOR}\n\n"
+    ]
+    if snippets:
+        out.append(
+            "# SHARED SNIPPETS\n\n"
+            "Paragraphs repeated across pages are printed once here; pages refer "
+            "to them as [Shared snippet S<n>], followed by any lines their own "
+            "version adds.\n\n"
+        )
+        for n, (text, count) in enumerate(snippets, start=1):
+            out.append(f"## S{n} (on {count} pages)\n\n{text}\n\n")
+        out.append(f"{SEPARATOR}\n\n")
+    texts_iter = iter(texts)
+    for heading, pages, status in sections:
+        out.append(f"# {heading}\n\n")
+        out.extend(_full_entry(p, status=status, text=next(texts_iter)) for p in pages)
+    out.append(f"\n---\n\n{footer(today)}\nTotal sections: {len(SECTIONS)}\n")
+    return "".join(out)
+
+
+def build_python_sdk(today: str) -> str:
+    out = [
+        "# Fused Python SDK Documentation\n\n"
+        "> Complete reference for the Fused Python SDK - a Python library for "
+        "creating and running User Defined Functions (UDFs) that can be executed "
+        "via HTTPS requests.\n\n## Python SDK Reference\n\n"
+    ]
+    pages = [
+        p
+        for p in collect(DOCS_DIR / "python-sdk", "python-sdk", include_hidden=True)
+        if "changelog.mdx" not in p.rel
+    ]
+    for page in pages:
+        out.append(f"### {page.title}\n\n")
+        text = ultra_compact(simplify_python_signatures(clean_page(page)))
+        if len(text) > 50:
+            out.append(f"{text}\n\n")
+        out.append("---\n\n")
+    out.append(
+        "\n---\n\nGenerated automatically from Fused Python SDK documentation. "
+        f"Last updated: {today}\nTotal pages: {len(pages)}\n"
+    )
+    return "".join(out)
+
+
+# ── Sharded full reference ─────────────────────────────────────────────────────
+
+SHARD_DIR = "llms-full"  # next to llms-full.txt: llms-full/guide-1.txt, ...
+SHARD_TOKENS = 32_000
+
+
+def split_entry(entry: str, title: str, max_tokens: int) -> list[str]:
+    """Cut a page entry that is over budget at blank lines outside code fences.
+
+    A single paragraph or fence larger than `max_tokens` is kept whole.
+    """
+    parts: list[list[str]] = [[]]
+    tokens = 0
+    for block in paragraphs(entry):
+        n = approx_tokens(block)
+        if parts[-1] and tokens + n > max_tokens:
+            parts.append([f"## {title} (continued)\n"])
+            tokens = approx_tokens(parts[-1][0])
+        parts[-1].append(block)
+        tokens += n
+    return ["\n".join(part) for part in parts]
+
+
+def _shard_header(title: str, n: int, total: int) -> str:
+    return (
+        f"# Fused Documentation - {title} ({n} of {total})\n\n"
+        f"> {SITE_DESCRIPTION}\n\n{SEPARATOR}\n\n"
+    )
+
+
+def build_shards(today: str, max_tokens: int = SHARD_TOKENS) -> dict[str, str]:
+    """llms-full.txt split by docs section into shards of at most `max_tokens`.
+
+    Returns {file name: content}, including a manifest.json that lists every
+    shard with its URL, approximate token count and pages, so an LLM client
+    can fetch only the slices it needs.
+    """
+    sections = [
+        (title, folder, collect(DOCS_DIR / folder, folder, include_hidden=True))
+        for title, folder in SECTIONS.items()
+        if (DOCS_DIR / folder).is_dir()
+    ]
+    if BLOG_DIR.is_dir():
+        posts = collect(BLOG_DIR, "blog", include_hidden=True)
+        sections.append(("Blog Posts", "blog", list(reversed(posts))))
+
+    files: dict[str, str] = {}
+    manifest_sections = []
+    for title, folder, pages in sections:
+        if not pages:
+            continue
+        budget = max_tokens - approx_tokens(_shard_header(title, 99, 99))
+        shards: list[dict] = []
+        for page in pages:
+            entry = _full_entry(page, status=folder != "blog")
+            parts = (
+                split_entry(entry, page.title, budget)
+                if approx_tokens(entry) > budget
+                else [entry]
+            )
+            for i, part in enumerate(parts, start=1):
+                tokens = approx_tokens(part)
+                if not shards or shards[-1]["tokens"] + tokens > budget:
+                    shards.append({"entries": [], "pages": [], "tokens": 0})
+                shard = shards[-1]
+                shard["entries"].append(part)
+                shard["tokens"] += tokens
+                info = {"title": page.title, "path": page.rel, "url": page.url}
+                if len(parts) > 1:
+                    info["part"] = f"{i} of {len(parts)}"
+                shard["pages"].append({**info, "tokens": tokens})
+
+        manifest_shards = []
+        for n, shard in enumerate(shards, start=1):
+            name = f"{folder}-{n}.txt"
+            content = _shard_header(title, n, len(shards)) + "".join(shard["entries"])
+            tokens = approx_tokens(content)
+            if tokens > max_tokens:
+                print(
+                    f"WARNING: {name} is ~{tokens} tokens (over {max_tokens}): "
+                    "a single block is larger than the budget",
+                    file=sys.stderr,
+                )
+            files[name] = content
+            manifest_shards.append(
+                {
+                    "file": name,
+                    "url": f"{BASE_URL}/{SHARD_DIR}/{name}",
+                    "tokens": tokens,
+                    "bytes": len(content.encode()),
+                    "pages": shard["pages"],
+                }
+            )
+        manifest_sections.append(
+            {
+                "title": title,
+                "folder": folder,
+                "tokens": sum(s["tokens"] for s in manifest_shards),
+                "shards": manifest_shards,
+            }
+        )
+
+    manifest = {
+        "title": "Fused Documentation",
+        "description": SITE_DESCRIPTION,
+        "generated": today,
+        "max_tokens": max_tokens,
+        "token_estimate": "approximate: word pieces of up to 8 characters "
+        "plus punctuation marks",
+        "tokens": sum(s["tokens"] for s in manifest_sections),
+        "sections": manifest_sections,
+    }
+    files["manifest.json"] = json.dumps(manifest, indent=2, ensure_ascii=False) + "\n"
+    return files
+
+
+OUTPUTS = {
+    "curated": ("llms.txt", build_curated),
+    "full": ("llms-full.txt", build_full),
+    "python-sdk": ("llms-python-sdk.txt", build_python_sdk),
+    "shards": (SHARD_DIR, build_shards),  # a directory: {file name: content}
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Build the llms.txt files from the MDX sources.",
+    )
+    for name in OUTPUTS:
+        parser.add_argument(
+            f"--{name}", action="store_true", help=f"Only build the {name} file."
+        )
+    parser.add_argument("--out-dir", type=Path, default=STATIC_DIR)
+    parser.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="Keep paragraphs repeated across pages in full in llms-full.txt.",
+    )
+    parser.add_argument(
+        "--shard-tokens",
+        type=int,
+        default=SHARD_TOKENS,
+        help=f"Token budget per {SHARD_DIR}/ shard (default: {SHARD_TOKENS}).",
+    )
+    args = parser.parse_args(argv)
+    selected = [n for n in OUTPUTS if getattr(args, n.replace("-", "_"))] or list(
+        OUTPUTS
+    )
+    today = datetime.date.today().isoformat()
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    for name in selected:
+        file_name, build = OUTPUTS[name]
+        started = time.monotonic()
+        options = {
+            "full": {"dedupe_paragraphs": not args.no_dedupe},
+            "shards": {"max_tokens": args.shard_tokens},
+        }
+        content = build(today, **options.get(name, {}))
+        if isinstance(content, dict):
+            target = args.out_dir / file_name
+            target.mkdir(exist_ok=True)
+            for old in target.glob("*"):
+                if old.suffix in (".txt", ".json") and old.name not in content:
+                    old.unlink()  # a shard that no longer exists
+            for shard_name, text in content.items():
+                (target / shard_name).write_text(text, encoding="utf-8")
+            size = sum(len(text.encode()) for text in content.values())
+            file_name = f"{file_name}/ ({len(content) - 1} shards)"
+        else:
+            (args.out_dir / file_name).write_text(content, encoding="utf-8")
+            size = len(content.encode())
+        print(f"{file_name}: {size // 1024} KB in {time.monotonic() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
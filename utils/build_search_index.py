@@ -0,0 +1,317 @@
+# Build an offline BM25 search index of the docs for client-side search.
+#
+# Site search is Algolia DocSearch (config.json): its crawler walks the
+# deployed site, so new pages are unsearchable until the next recrawl and
+# local previews have no search at all. This builds an equivalent index
+# straight from the MDX sources through the shared docs_corpus parse:
+#
+#   records    one per heading section, with the hierarchy the DocSearch
+#              selectors define — lvl0 the sidebar category (sidebars.ts),
+#              lvl1 the page title, lvl2-lvl6 the enclosing headings — and the
+#              section's prose as text (code blocks are left out, as the
+#              `article p, li, td` text selectors leave them out)
+#   terms      lowercased [a-z0-9_]+ words (`_` kept, per separatorsToIndex)
+#              plus the parts of snake_case words; page title and headings
+#              count HEADING_WEIGHT times
+#   BM25       per-record weighted lengths, and postings of (record, term
+#              frequency) with delta-encoded record ids
+#
+# Output, in static/search-index/ (compact JSON that gzips well):
+#
+#   meta.json          record count, average length, k1/b, shard counts and
+#                      every record's length: all that ranking needs
+#   docs-<k>.json      [path#anchor, [lvl0, lvl1, ...], snippet] for records
+#                      k * DOC_SHARD_SIZE up to the next shard
+#   postings-<k>.json  {term: [id, tf, id gap, tf, ...]} for the terms whose
+#                      32-bit FNV-1a hash % shards == k
+#
+# src/components/LocalSearch.jsx queries it in the browser, fetching only the
+# postings shards its query terms hash to and the docs shards holding the top
+# hits; `--query` runs the same scoring here.
+#
+# Usage (stdlib only):
+#   python utils/build_search_index.py
+#   python utils/build_search_index.py --query "h3 hexagons" [--top 10]
+
+import argparse
+import gzip
+import json
+import math
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from build_llms_txt import BASE_URL, BLOG_DIR, SECTIONS, Page, clean_prose, collect
+from docs_corpus import DOCS_DIR, ROOT
+
+INDEX_DIR = ROOT / "static" / "search-index"
+SIDEBARS_PATH = ROOT / "sidebars.ts"
+
+# Bump when the file format changes (LocalSearch.jsx checks it).
+INDEX_VERSION = 2
+SHARDS = 16
+DOC_SHARD_SIZE = 128  # records per docs-<k>.json
+K1 = 1.2
+B = 0.75
+HEADING_WEIGHT = 3
+SNIPPET_CHARS = 160
+STRIP_CHARS = " .,;:#"  # DocSearch's strip_chars
+
+_WORD = re.compile(r"[a-z0-9_]+")
+_CATEGORY = re.compile(
+    r'type:\s*"category",\s*label:\s*"([^"]+)"[^\[]*items:\s*\[(.*?)\]', re.DOTALL
+)
+_DOC_ID = re.compile(r'\bid:\s*"([^"]+)"|^\s*"([^"]+)",?\s*$', re.MULTILINE)
+_AUTOGENERATED = re.compile(r'dirName:\s*"([^"]+)"')
+_MARKUP = re.compile(r"[*`|>]+|^\s*(?:[-+]|\d+\.)\s+", re.MULTILINE)
+
+
+# ── Records ────────────────────────────────────────────────────────────────────
+
+
+def sidebar_categories(path: Path = SIDEBARS_PATH) -> dict[str, str]:
+    """{doc id or "dir/" prefix: label of the sidebar category listing it}."""
+    try:
+        text = path.read_text()
+    except OSError as e:
+        print(f"WARNING: could not read {path}: {e}", file=sys.stderr)
+        return {}
+    categories = {}
+    for match in _CATEGORY.finditer(text):
+        label, items = match.groups()
+        for doc_id in _DOC_ID.findall(items):
+            categories[doc_id[0] or doc_id[1]] = label
+        for dir_name in _AUTOGENERATED.findall(items):
+            categories[f"{dir_name}/"] = label
+    return categories
+
+
+def doc_id(page: Page) -> str:
+    parts = re.sub(r"\.mdx?$", "", page.rel).split("/")
+    return "/".join(parts[:-1] + [str(page.front_matter.get("id") or parts[-1])])
+
+
+def heading_text(text: str) -> str:
+    return _MARKUP.sub("", clean_prose(text)).strip(STRIP_CHARS)
+
+
+def page_records(page: Page, lvl0: str) -> list[dict]:
+    """One record per heading section of `page`, code blocks left out."""
+    lines = page.body.split("\n")
+    code = {i for start, end in page.fences for i in range(start, end + 1)}
+    headings = {h["line"]: h for h in page.headings}
+    path = page.url[len(BASE_URL) :] or "/"
+    hierarchy: list[str | None] = [lvl0, page.title] + [None] * 5  # lvl0-lvl6
+    records: list[dict] = []
+    anchor, text = "", []
+
+    def flush():
+        content = " ".join(_MARKUP.sub("", clean_prose("\n".join(text))).split())
+        records.append(
+            {
+                "url": f"{path}#{anchor}" if anchor else path,
+                "hierarchy": [h for h in hierarchy if h],
+                "text": content,
+            }
+        )
+
+    for i, line in enumerate(lines):
+        if i in code:
+            continue
+        heading = headings.get(i)
+        if heading is None:
+            text.append(line)
+            continue
+        level = heading["level"]
+        if level == 1:  # the page title itself: its text belongs to the intro
+            hierarchy[1] = heading_text(heading["text"]) or page.title
+            continue
+        flush()
+        text = []
+        hierarchy[level] = heading_text(heading["text"])
+        hierarchy[level + 1 :] = [None] * (6 - level)
+        anchor = heading["slug"]
+    flush()
+    return records
+
+
+def collect_records() -> list[dict]:
+    categories = sidebar_categories()
+    records = []
+    sources = [(title, DOCS_DIR / folder, folder) for title, folder in SECTIONS.items()]
+    sources.append(("Blog", BLOG_DIR, "blog"))
+    for title, root, rel_root in sources:
+        if not root.is_dir():
+            continue
+        for page in collect(root, rel_root, include_hidden=False):
+            if page.unlisted or page.draft:
+                continue  # not in the sitemap, so not in DocSearch either
+            page_id = doc_id(page)
+            lvl0 = categories.get(page_id) or next(
+                (
+                    label
+                    for prefix, label in categories.items()
+                    if prefix.endswith("/") and page_id.startswith(prefix)
+                ),
+                title,
+            )
+            records.extend(page_records(page, lvl0))
+    return records
+
+
+# ── Index ──────────────────────────────────────────────────────────────────────
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased words, `_` included, plus the parts of snake_case words.
+
+    Keep in sync with tokenize() in src/components/LocalSearch.jsx.
+    """
+    out = []
+    for word in _WORD.findall(text.lower()):
+        word = word.strip("_")
+        if not word:
+            continue
+        out.append(word)
+        if "_" in word:
+            out.extend(part for part in word.split("_") if part)
+    return out
+
+
+def fnv1a(term: str) -> int:
+    """32-bit FNV-1a of the UTF-8 term: picks its postings shard."""
+    h = 0x811C9DC5
+    for byte in term.encode():
+        h = ((h ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return h
+
+
+def build_index(records: list[dict], shards: int = SHARDS) -> dict[str, object]:
+    """{file name: JSON-able content} for the index of `records`."""
+    postings: dict[str, list[int]] = {}
+    last_id: dict[str, int] = {}
+    docs, lengths = [], []
+    for i, record in enumerate(records):
+        tf = Counter(tokenize(record["text"]))
+        for term in tokenize(" ".join(record["hierarchy"][1:])):
+            tf[term] += HEADING_WEIGHT
+        length = sum(tf.values())
+        text = record["text"]
+        snippet = text[:SNIPPET_CHARS] + ("…" if len(text) > SNIPPET_CHARS else "")
+        docs.append([record["url"], record["hierarchy"], snippet])
+        lengths.append(length)
+        for term, n in sorted(tf.items()):
+            postings.setdefault(term, []).extend([i - last_id.get(term, 0), n])
+            last_id[term] = i
+
+    files: dict[str, object] = {f"postings-{k}.json": {} for k in range(shards)}
+    for term in sorted(postings):
+        files[f"postings-{fnv1a(term) % shards}.json"][term] = postings[term]
+    for k in range(0, len(docs), DOC_SHARD_SIZE):
+        files[f"docs-{k // DOC_SHARD_SIZE}.json"] = docs[k : k + DOC_SHARD_SIZE]
+    files["meta.json"] = {
+        "version": INDEX_VERSION,
+        "count": len(docs),
+        "avgdl": sum(lengths) / max(1, len(lengths)),
+        "k1": K1,
+        "b": B,
+        "shards": shards,
+        "doc_shard_size": DOC_SHARD_SIZE,
+        "terms": len(postings),
+        "lengths": lengths,
+    }
+    return files
+
+
+def write_index(files: dict[str, object], out_dir: Path) -> tuple[int, int]:
+    """Write the index files; returns (bytes, gzipped bytes)."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for old in out_dir.glob("*.json"):
+        if old.name not in files:
+            old.unlink()  # from a build with more shards or an older format
+    size = gzipped = 0
+    for name, content in files.items():
+        data = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+        (out_dir / name).write_bytes(data)
+        size += len(data)
+        gzipped += len(gzip.compress(data))
+    return size, gzipped
+
+
+# ── Query ──────────────────────────────────────────────────────────────────────
+
+
+def search(query: str, index_dir: Path = INDEX_DIR, top: int = 10) -> list[tuple]:
+    """BM25 top hits for `query` from a written index: [(score, doc)].
+
+    Same scoring as LocalSearch.jsx, reading only the shards it needs.
+    """
+    meta = json.loads((index_dir / "meta.json").read_text())
+    lengths = meta["lengths"]
+    shards: dict[int, dict] = {}
+    scores: Counter = Counter()
+    for term in set(tokenize(query)):
+        k = fnv1a(term) % meta["shards"]
+        if k not in shards:
+            shards[k] = json.loads((index_dir / f"postings-{k}.json").read_text())
+        flat = shards[k].get(term)
+        if not flat:
+            continue
+        df = len(flat) // 2
+        idf = math.log(1 + (meta["count"] - df + 0.5) / (df + 0.5))
+        doc = 0
+        for gap, tf in zip(flat[::2], flat[1::2]):
+            doc += gap
+            norm = tf + meta["k1"] * (
+                1 - meta["b"] + meta["b"] * lengths[doc] / meta["avgdl"]
+            )
+            scores[doc] += idf * tf * (meta["k1"] + 1) / norm
+    size = meta["doc_shard_size"]
+    doc_shards: dict[int, list] = {}
+    hits = []
+    for doc, score in scores.most_common(top):
+        k = doc // size
+        if k not in doc_shards:
+            doc_shards[k] = json.loads((index_dir / f"docs-{k}.json").read_text())
+        hits.append((score, doc_shards[k][doc % size]))
+    return hits
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Build the offline BM25 search index from the MDX sources.",
+    )
+    parser.add_argument("--out-dir", type=Path, default=INDEX_DIR)
+    parser.add_argument("--shards", type=int, default=SHARDS)
+    parser.add_argument(
+        "--query", help="Search an already built index instead of building one."
+    )
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.query:
+        started = time.perf_counter()
+        hits = search(args.query, args.out_dir, args.top)
+        elapsed = (time.perf_counter() - started) * 1000
+        for score, (url, hierarchy, _) in hits:
+            print(f"{score:6.2f}  {' › '.join(hierarchy)}\n        {BASE_URL}{url}")
+        print(f"{len(hits)} hit(s) in {elapsed:.1f} ms")
+        return 0
+
+    started = time.monotonic()
+    records = collect_records()
+    files = build_index(records, max(1, args.shards))
+    size, gzipped = write_index(files, args.out_dir)
+    meta = files["meta.json"]
+    print(
+        f"{meta['count']} records, {meta['terms']} terms, {args.shards} shards: "
+        f"{size // 1024} KB ({gzipped // 1024} KB gzipped) in "
+        f"{time.monotonic() - started:.2f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["numpy >= 1.26"]
+# ///
+#
+# Build a local semantic-search index of the docs, with int8 vectors.
+#
+# The docs are chunked by heading exactly as the BM25 index is
+# (build_search_index.collect_records: one chunk per heading section, with its
+# DocSearch-style hierarchy), and each chunk — headings plus prose — is
+# embedded by a pluggable embedder:
+#
+#   hashing         (default) deterministic bag of words: word unigrams and
+#                   bigrams, stop words dropped, hashed with a sign into
+#                   --dim buckets, sublinear tf, L2-normalised. Needs no
+#                   model, network or GPU.
+#   module:factory  any callable returning an object with
+#                   `embed(texts) -> float32 array (n, dim)` (unit rows) and
+#                   `config() -> dict` (the factory's keyword arguments, so
+#                   the query side can rebuild the same embedder)
+#
+# Vectors are quantised to int8 with one float32 scale per vector, and
+# grouped by an IVF coarse index: spherical k-means centroids (about
+# sqrt(n) lists), with the vectors stored list by list. Files, in
+# static/semantic-index/:
+#
+#   meta.json       embedder spec and config, dimensions, list count
+#   vectors.npy     int8 (n, dim), ordered by list
+#   scales.npy      float32 (n,)
+#   centroids.npy   float32 (lists, dim)
+#   offsets.npy     int64 (lists + 1): list i is vectors[offsets[i]:offsets[i+1]]
+#   docs.json       [path#anchor, [lvl0, lvl1, ...], snippet] in vector order
+#
+# Queries memory-map the arrays, score the query against the centroids,
+# then scan only the --nprobe closest lists. --benchmark measures recall@k
+# against exact float32 search, and latency, for a range of nprobe.
+#
+# Usage:
+#   uv run utils/build_semantic_index.py
+#   uv run utils/build_semantic_index.py --query "run a UDF on a schedule"
+#   uv run utils/build_semantic_index.py --benchmark
+#   uv run utils/build_semantic_index.py --embedder my_embeddings:load
+
+import argparse
+import importlib
+import json
+import math
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+from build_search_index import SNIPPET_CHARS, collect_records, fnv1a, tokenize
+from docs_corpus import ROOT
+
+INDEX_DIR = ROOT / "static" / "semantic-index"
+
+# Bump when the file format changes.
+INDEX_VERSION = 1
+NPROBE = 8
+KMEANS_ITERATIONS = 20
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by can do for from has have how if in into is it "
+    "its of on or so that the their them then there these this to use used "
+    "using was we what when which will with you your".split()
+)
+
+
+# ── Embedders ──────────────────────────────────────────────────────────────────
+
+
+class HashingEmbedder:
+    """Signed feature hashing of word unigrams and bigrams."""
+
+    def __init__(self, dim: int = 1024) -> None:
+        self.dim = dim
+
+    def config(self) -> dict:
+        return {"dim": self.dim}
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), np.float32)
+        for row, text in enumerate(texts):
+            words = [w for w in tokenize(text) if w not in STOP_WORDS]
+            features = Counter(words)
+            features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+            for feature, n in features.items():
+                h = fnv1a(feature)
+                sign = 1.0 if h >> 31 else -1.0
+                out[row, h % self.dim] += sign * (1 + math.log(n))
+        return out / np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+
+
+EMBEDDERS = {"hashing": HashingEmbedder}
+
+
+def load_embedder(spec: str, config: dict):
+    """The embedder named `spec` (see EMBEDDERS) or at "module:factory"."""
+    if spec in EMBEDDERS:
+        return EMBEDDERS[spec](**config)
+    module, sep, attr = spec.partition(":")
+    if not sep:
+        raise ValueError(
+            f"unknown embedder {spec!r}: use one of {sorted(EMBEDDERS)} "
+            "or module:factory"
+        )
+    return getattr(importlib.import_module(module), attr)(**config)
+
+
+def chunk_text(record: dict) -> str:
+    return " › ".join(record["hierarchy"][1:]) + "\n" + record["text"]
+
+
+# ── Index ──────────────────────────────────────────────────────────────────────
+
+
+def kmeans(x: np.ndarray, k: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means on unit rows: (centroids, assignment of each row)."""
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = np.argmax(x @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        sums[empty] = x[rng.choice(len(x), int(empty.sum()))]  # reseed
+        norms[empty] = 1.0
+        centroids = sums / norms[:, None]
+    return centroids, np.argmax(x @ centroids.T, axis=1)
+
+
+def quantize(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8: x ≈ q * scale[:, None]."""
+    scale = np.maximum(np.abs(x).max(axis=1), 1e-12) / 127
+    q = np.clip(np.rint(x / scale[:, None]), -127, 127).astype(np.int8)
+    return q, scale.astype(np.float32)
+
+
+def build_index(
+    records: list[dict], embedder, spec: str, out_dir: Path, lists: int = 0
+) -> dict:
+    vectors = embedder.embed([chunk_text(r) for r in records])
+    lists = lists or max(1, round(math.sqrt(len(records))))
+    centroids, assign = kmeans(vectors, min(lists, len(records)))
+    order = np.argsort(assign, kind="stable")
+    counts = np.bincount(assign, minlength=len(centroids))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    q, scales = quantize(vectors[order])
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    np.save(out_dir / "vectors.npy", q)
+    np.save(out_dir / "scales.npy", scales)
+    np.save(out_dir / "centroids.npy", centroids.astype(np.float32))
+    np.save(out_dir / "offsets.npy", offsets)
+    docs = []
+    for i in order:
+        text = records[i]["text"]
+        snippet = text[:SNIPPET_CHARS] + ("…" if len(text) > SNIPPET_CHARS else "")
+        docs.append([records[i]["url"], records[i]["hierarchy"], snippet])
+    (out_dir / "docs.json").write_text(
+        json.dumps(docs, ensure_ascii=False, separators=(",", ":"))
+    )
+    meta = {
+        "version": INDEX_VERSION,
+        "embedder": spec,
+        "embedder_config": embedder.config(),
+        "count": len(docs),
+        "dim": int(q.shape[1]),
+        "lists": len(centroids),
+    }
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2) + "\n")
+    return meta
+
+
+class SemanticIndex:
+    """A built index, memory-mapped for top-k queries."""
+
+    def __init__(self, index_dir: Path = INDEX_DIR) -> None:
+        self.meta = json.loads((index_dir / "meta.json").read_text())
+        if self.meta["version"] != INDEX_VERSION:
+            raise ValueError(
+                f"{index_dir} has index version {self.meta['version']}, "
+                f"expected {INDEX_VERSION}: rebuild it"
+            )
+        self.embedder = load_embedder(
+            self.meta["embedder"], self.meta["embedder_config"]
+        )
+        self.vectors = np.load(index_dir / "vectors.npy", mmap_mode="r")
+        self.scales = np.load(index_dir / "scales.npy", mmap_mode="r")
+        self.centroids = np.load(index_dir / "centroids.npy", mmap_mode="r")
+        self.offsets = np.load(index_dir / "offsets.npy")
+        self.docs = json.loads((index_dir / "docs.json").read_text())
+
+    def search_vector(
+        self, q: np.ndarray, k: int = 10, nprobe: int = NPROBE
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """(row ids, scores) of the best `k` rows in the `nprobe` nearest lists."""
+        nprobe = min(nprobe, len(self.centroids))
+        probe = np.argpartition(-(self.centroids @ q), nprobe - 1)[:nprobe]
+        ids = np.concatenate(
+            [np.arange(self.offsets[i], self.offsets[i + 1]) for i in probe]
+        )
+        if not len(ids):
+            return ids, np.zeros(0, np.float32)
+        # Lists are contiguous, so each is one slice of the memory map.
+        scores = np.concatenate(
+            [
+                (self.vectors[self.offsets[i] : self.offsets[i + 1]] @ q)
+                * self.scales[self.offsets[i] : self.offsets[i + 1]]
+                for i in probe
+            ]
+        )
+        top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return ids[top], scores[top]
+
+    def search(self, query: str, k: int = 10, nprobe: int = NPROBE) -> list[tuple]:
+        """[(cosine score, [path#anchor, hierarchy, snippet])] for `query`."""
+        q = self.embedder.embed([query])[0]
+        ids, scores = self.search_vector(q, k, nprobe)
+        return [(float(s), self.docs[i]) for i, s in zip(ids, scores)]
+
+
+# ── Benchmark ──────────────────────────────────────────────────────────────────
+
+
+def benchmark(index: SemanticIndex, records: list[dict], k: int, queries: int) -> None:
+    """Recall@k against exact float32 search, and query latency, by nprobe.
+
+    Queries are the headings of an evenly spaced sample of chunks; the exact
+    top-k comes from re-embedding every chunk without quantisation.
+    """
+    exact = index.embedder.embed([chunk_text(r) for r in records])
+    step = max(1, len(records) // queries)
+    texts = [" ".join(r["hierarchy"][1:]) for r in records[::step]][:queries]
+    query_vectors = index.embedder.embed(texts)
+    # Compared by path#anchor: index rows are in list order, not record order.
+    truth = [
+        {records[i]["url"] for i in np.argsort(-(exact @ q))[:k]} for q in query_vectors
+    ]
+    print(
+        f"{index.meta['count']} chunks, {index.meta['lists']} lists, "
+        f"{len(texts)} queries, recall@{k} vs exact float32 search\n"
+    )
+    print(f"{'nprobe':>8}  {'recall':>7}  {'p50 ms':>7}  {'p95 ms':>7}")
+    for nprobe in sorted({1, 2, 4, NPROBE, 16, index.meta["lists"]}):
+        if nprobe > index.meta["lists"]:
+            continue
+        hits, latencies = 0, []
+        for text, expected in zip(texts, truth):
+            started = time.perf_counter()
+            q = index.embedder.embed([text])[0]
+            ids, _ = index.search_vector(q, k, nprobe)
+            latencies.append((time.perf_counter() - started) * 1000)
+            hits += len(expected & {index.docs[i][0] for i in ids})
+        p50, p95 = np.percentile(latencies, [50, 95])
+        recall = hits / sum(len(expected) for expected in truth)
+        label = f"{nprobe}" + (" (all)" if nprobe == index.meta["lists"] else "")
+        print(f"{label:>8}  {recall:7.3f}  {p50:7.2f}  {p95:7.2f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Build the local semantic-search index from the MDX sources.",
+    )
+    parser.add_argument("--out-dir", type=Path, default=INDEX_DIR)
+    parser.add_argument(
+        "--embedder",
+        default="hashing",
+        help="'hashing' (default) or module:factory for another embedder.",
+    )
+    parser.add_argument(
+        "--dim", type=int, default=1024, help="Dimensions of the hashing embedder."
+    )
+    parser.add_argument(
+        "--lists", type=int, default=0, help="IVF lists (default: about sqrt(n))."
+    )
+    parser.add_argument("--query", help="Search an already built index.")
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Measure recall and latency of an already built index.",
+    )
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=NPROBE)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    if args.query:
+        index = SemanticIndex(args.out_dir)
+        started = time.perf_counter()
+        hits = index.search(args.query, args.top, args.nprobe)
+        elapsed = (time.perf_counter() - started) * 1000
+        for score, (url, hierarchy, _) in hits:
+            print(f"{score:6.3f}  {' › '.join(hierarchy)}\n        {url}")
+        print(f"{len(hits)} hit(s) in {elapsed:.1f} ms")
+        return 0
+
+    started = time.monotonic()
+    records = collect_records()
+    if args.benchmark:
+        benchmark(SemanticIndex(args.out_dir), records, args.top, args.queries)
+        return 0
+
+    config = {"dim": args.dim} if args.embedder == "hashing" else {}
+    embedder = load_embedder(args.embedder, config)
+    meta = build_index(records, embedder, args.embedder, args.out_dir, args.lists)
+    size = sum(p.stat().st_size for p in args.out_dir.iterdir())
+    print(
+        f"{meta['count']} chunks, {meta['dim']} dims, {meta['lists']} lists: "
+        f"{size // 1024} KB in {time.monotonic() - started:.2f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,18 +3,47 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 # Source: https://github.com/facebookresearch/beanmachine/blob/main/website/scripts/convert_ipynb_to_mdx.py
-# pip install mdformat-myst tabulate
-
+# pip install -r requirements.txt  (mdformat, mdformat-myst, nbformat, lxml, numpy;
+# numpy encodes plot arrays)
+#
+# Usage:
+#   python utils/convert_ipynb_to_mdx.py            # convert new/changed notebooks
+#   python utils/convert_ipynb_to_mdx.py --force    # reconvert everything
+#   python utils/convert_ipynb_to_mdx.py --jobs 4   # size of the process pool
+#   python utils/convert_ipynb_to_mdx.py --execute  # re-run notebooks first (nbclient)
+
+import argparse
+import base64
+import collections
+import gzip
+import hashlib
+import io
 import json
+import mimetypes
+import os
 import re
 import shutil
-import uuid
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import mdformat  # @manual=fbsource//third-party/pypi/mdformat:mdformat
 import nbformat
-import pandas as pd
+import numpy as np
 from lxml import etree  # pyre-ignore
 from nbformat.notebooknode import NotebookNode
 
@@ -28,6 +57,75 @@ except ImportError:
 else:
     LIB_DIR = (Path(get_fbcode_dir()) / "beanmachine").resolve()
 
+# Records, per MDX output, the notebook hash, config entry and converter version it
+# was built from, so unchanged notebooks are not converted again.
+MANIFEST_PATH = (
+    Path(__file__).resolve().parent.parent / ".cache" / "doc-tools" / "notebooks.json"
+)
+# Outputs of executed cells (--execute), keyed by a hash of the repo-relative notebook
+# path and the source of the cell and every code cell before it, so the folder can be
+# shared across checkouts and CI.
+CELL_CACHE_DIR = MANIFEST_PATH.parent / "notebook-cells"
+# Any edit to this script invalidates every manifest entry.
+CONVERTER_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+class ConvertOptions(NamedTuple):
+    """Command line options that change the converted output."""
+
+    # Losslessly recompress extracted PNG outputs with Pillow (if installed).
+    optimize_images: bool = False
+    # Also write a pre-compressed sidecar next to each plot data file: "gzip", "br"
+    # or None.
+    compress_plot_data: Optional[str] = None
+    # Store numeric arrays in plot data as base64 typed arrays.
+    typed_arrays: bool = True
+    # Downsample Plotly line traces longer than this with LTTB (0 disables).
+    max_points: int = 5000
+    # DataFrame outputs longer than this are cut to their first and last rows.
+    max_table_rows: int = 40
+    # Douglas-Peucker tolerance (in degrees) for GeoJSON outputs (0 disables).
+    geojson_tolerance: float = 1e-5
+    # Execute the notebook (with nbclient) before converting it.
+    execute: bool = False
+    # Seconds a single cell may run for when executing.
+    cell_timeout: int = 600
+    # Reuse cached cell outputs when executing.
+    cell_cache: bool = True
+    # Widths of the WebP variants written for raster images in Markdown cells
+    # (empty disables).
+    image_widths: Tuple[int, ...] = (480, 960, 1440)
+
+
+# Numeric lists shorter than this stay plain JSON lists; base64 only pays off for
+# longer arrays.
+TYPED_ARRAY_MIN_LENGTH = 16
+
+
+# Map HTML (folium, leafmap) is served as its own page from the site's static folder.
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+MAP_ASSETS_URL = "/notebook-assets/maps"
+MAP_ASSETS_DIR = STATIC_DIR / MAP_ASSETS_URL.strip("/")
+# VegaLiteFigure loads the Vega-Lite runtime from here; `npm run fetch-vega`
+# vendors it (scripts/fetch-vega.js), the build does not.
+VEGA_VENDOR_DIR = STATIC_DIR / "vendor" / "vega"
+
+# MDX references to plot data files; anything else in `assets/plot_data` is stale.
+PLOT_DATA_REF = re.compile(r"\./assets/plot_data/([0-9a-f]{64}\.json)")
+# MDX references to images in an `assets/img` folder (Markdown links and `require`).
+IMG_REF = re.compile(r"assets/img/([^)\s'\"]+)")
+# Image names the converter writes itself: content-addressed outputs in the shared
+# `{tutorials_dir}/assets/img`, and WebP variants of Markdown images. Only these are
+# garbage-collected; hand-placed images are never removed.
+IMAGE_OUTPUT_NAME = re.compile(r"[0-9a-f]{64}\.\w+")
+IMAGE_VARIANT_NAME = re.compile(r".+-[0-9a-f]{12}-\d+w\.webp")
+# MDX references to map pages, which are shared by every tutorials directory.
+MAP_REF = re.compile(rf"{re.escape(MAP_ASSETS_URL)}/([0-9a-f]{{64}}\.html)")
+MAP_NAME = re.compile(r"[0-9a-f]{64}\.html")
+# Markdown images, ``![alt-text](path/to/image.png "title")``: alt, path and title.
+MARKDOWN_IMAGE = re.compile(r"""!\[([^\]]*)\]\((.*?)(?=\"|\))(\".*\")?\)""")
+
+
 NOTEBOOK_CONFIG_PATHS = [
     {
         "config": Path("docs/basics/tutorials/tutorials.json"),
@@ -44,22 +142,6 @@ NOTEBOOK_CONFIG_PATHS = [
     },
 ]
 
-# Data display priority. Below lists the priority for displaying data from cell outputs.
-# Cells can output many different items, and some will output a fallback display, e.g.
-# text/plain if text/html is not working. The below priorities help ensure the output in
-# the MDX file shows the best representation of the cell output.
-priorities = [
-    "text/markdown",
-    "image/png",  # matplotlib output.
-    "application/vnd.jupyter.widget-view+json",  # tqdm progress bars.
-    "application/vnd.bokehjs_load.v0+json",  # Bokeh loading output.
-    "application/vnd.bokehjs_exec.v0+json",  # Bokeh `show` outputs.
-    "application/vnd.plotly.v1+json",  # Plotly
-    "text/html",
-    "stream",
-    "text/plain",
-]
-
 
 def load_nb_metadata(config_path) -> Dict[str, Dict[str, str]]:
     """
@@ -94,20 +176,266 @@ def load_notebook(path: Path) -> NotebookNode:
     return nb
 
 
-def create_folders(path: Path) -> Tuple[str, Path]:
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _JsonReader:
+    """
+    Read JSON values one at a time from a text file, holding only what is pending.
+
+    The buffer grows by at least its own size whenever a value does not fit yet, so
+    decoding a large value stays linear in its size.
+    """
+
+    def __init__(self, f: io.TextIOBase, chunk_size: int) -> None:
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self) -> bool:
+        pending = self.buf[self.pos :]
+        data = "" if self.eof else self.f.read(max(self.chunk_size, len(pending)))
+        self.eof = not data
+        self.buf = pending + data
+        self.pos = 0
+        return bool(data)
+
+    def peek(self) -> str:
+        """The next non-whitespace character ("" at the end of the file)."""
+        while True:
+            self.pos = JSON_WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} in notebook JSON")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_notebook_cells(
+    path: Path, chunk_size: int = 1 << 20
+) -> Iterator[NotebookNode]:
+    """
+    Read a notebook's cells one at a time, without loading the whole notebook.
+
+    Only the cell being converted (and the not yet decoded part of the file read
+    with it) is held in memory. Cells are returned as `load_notebook` returns them:
+    `NotebookNode`s with multiline sources and outputs joined into strings.
+
+    Args:
+        path (Path): Path to a v4 Jupyter notebook.
+        chunk_size (int): Characters read from the file at a time.
+
+    Yields:
+        NotebookNode: Each cell, in order.
+    """
+    from nbformat.v4.rwbase import rejoin_lines
+
+    with path.open("r", encoding="utf-8") as f:
+        reader = _JsonReader(f, chunk_size)
+        reader.expect("{")
+        while reader.peek() != "}":
+            key = reader.value()
+            reader.expect(":")
+            if key != "cells":
+                reader.value()  # metadata, nbformat version: not needed here
+            else:
+                reader.expect("[")
+                while reader.peek() != "]":
+                    # Rejoin the split lines before from_dict walks them: only the
+                    # levels rejoin_lines uses need attribute access.
+                    cell = NotebookNode(reader.value())
+                    if "outputs" in cell:
+                        cell["outputs"] = [NotebookNode(o) for o in cell["outputs"]]
+                    rejoin_lines(NotebookNode(cells=[cell]))
+                    yield nbformat.from_dict(cell)
+                    if reader.peek() == ",":
+                        reader.pos += 1
+                reader.expect("]")
+            if reader.peek() == ",":
+                reader.pos += 1
+
+
+def cell_cache_keys(nb: NotebookNode, path: Path) -> List[Optional[str]]:
+    """
+    Cache key for each cell of a notebook.
+
+    A code cell's key hashes its source together with the source of every code cell
+    before it, so editing a cell changes its key and the key of every cell after it.
+    The notebook is identified by its path relative to the repository, so keys do not
+    depend on where the repository is checked out.
+
+    Args:
+        nb (NotebookNode): The notebook.
+        path (Path): Path to the Jupyter notebook.
+
+    Returns:
+        List[Optional[str]]: One key per cell; None for cells that are not code.
+    """
+    kernel = nb.get("metadata", {}).get("kernelspec", {}).get("name", "")
+    root = Path(__file__).resolve().parent.parent
+    resolved = path.resolve()
+    name = (
+        resolved.relative_to(root).as_posix()
+        if resolved.is_relative_to(root)
+        else resolved.as_posix()
+    )
+    digest = hashlib.sha256(f"{name}\0{kernel}".encode())
+    keys: List[Optional[str]] = []
+    for cell in nb["cells"]:
+        if cell["cell_type"] != "code":
+            keys.append(None)
+            continue
+        digest.update(b"\0" + cell["source"].encode())
+        keys.append(digest.copy().hexdigest())
+    return keys
+
+
+def execute_notebook(
+    nb: NotebookNode,
+    path: Path,
+    options: ConvertOptions = ConvertOptions(),
+    cache_dir: Path = CELL_CACHE_DIR,
+) -> Tuple[List[Tuple[int, float]], float]:
+    """
+    Execute a notebook in place, reusing cached outputs of unchanged cells.
+
+    Cells before the first cell without cached outputs take their outputs from the
+    cache; that cell and all cells after it are executed and cached. When every
+    cell is cached no kernel is started at all: that is where the cache pays off,
+    when an unchanged notebook is converted again (--force, a new converter version
+    or other options, a fresh checkout sharing the cache).
+
+    A kernel's state cannot be restored from a cache, so when anything has to run,
+    the cached cells before it are run again first. Editing a late cell therefore
+    costs about as much as a cold run; only the page's outputs for the earlier cells
+    come from the cache. The time spent on that replay is returned separately.
+
+    Args:
+        nb (NotebookNode): The notebook; its code cell outputs are replaced.
+        path (Path): Path to the Jupyter notebook (the kernel's working directory).
+        options (ConvertOptions): Conversion options (cell timeout and cache use).
+        cache_dir (Path): Folder the cell outputs are cached in.
+
+    Returns:
+        Tuple[List[Tuple[int, float]], float]: Index and run time in seconds of every
+            cell whose outputs were recomputed, in order (empty when everything came
+            from the cache), and the seconds spent replaying the cached cells before
+            them.
+    """
+    keys = cell_cache_keys(nb, path)
+    cached: Dict[int, Dict[str, Any]] = {}
+    first_miss = len(nb["cells"])
+    for i, key in enumerate(keys):
+        if key is None:
+            continue
+        try:
+            if not options.cell_cache:
+                raise OSError
+            cached[i] = json.loads((cache_dir / f"{key}.json").read_text())
+        except (OSError, ValueError):
+            first_miss = i
+            break
+
+    def restore(i: int) -> None:
+        nb["cells"][i]["outputs"] = [
+            nbformat.from_dict(o) for o in cached[i]["outputs"]
+        ]
+        nb["cells"][i]["execution_count"] = cached[i]["execution_count"]
+
+    if first_miss == len(nb["cells"]):
+        for i in cached:
+            restore(i)
+        return [], 0.0
+
+    from nbclient import NotebookClient
+
+    client = NotebookClient(
+        nb,
+        timeout=options.cell_timeout,
+        resources={"metadata": {"path": str(path.parent)}},
+    )
+    timings = []
+    replay_seconds = 0.0
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with client.setup_kernel():
+        for i, cell in enumerate(nb["cells"]):
+            if keys[i] is None:
+                continue
+            started = time.monotonic()
+            if i < first_miss:
+                # Only run for its side effects on the kernel; the page shows the
+                # cached outputs.
+                client.execute_cell(nbformat.from_dict(dict(cell)), i)
+                replay_seconds += time.monotonic() - started
+                restore(i)
+                continue
+            client.execute_cell(cell, i)
+            seconds = time.monotonic() - started
+            timings.append((i, seconds))
+            entry = {
+                "outputs": cell["outputs"],
+                "execution_count": cell.get("execution_count"),
+                "seconds": seconds,
+            }
+            cache_path = cache_dir / f"{keys[i]}.json"
+            tmp_path = cache_dir / f".{keys[i]}.{os.getpid()}.tmp"
+            tmp_path.write_text(json.dumps(entry))
+            tmp_path.replace(cache_path)
+    return timings, replay_seconds
+
+
+def output_path(path: Path, tutorials_dir: Path) -> Path:
+    """
+    Path of the MDX file a notebook is converted to.
+
+    Args:
+        path (Path): Path to the Jupyter notebook.
+        tutorials_dir (Path): Folder the tutorial folders are created in.
+
+    Returns:
+        Path: `{tutorials_dir}/{notebook_stem}/{NotebookStem}.mdx`.
+    """
+    filename = "".join([token.title() for token in path.stem.split("_")])
+    return tutorials_dir / path.stem / f"{filename}.mdx"
+
+
+def create_folders(path: Path, tutorials_dir: Path) -> Tuple[str, Path]:
     """
     Create asset folders for the tutorial.
 
     Args:
         path (Path): Path to the Jupyter notebook.
+        tutorials_dir (Path): Folder the tutorial folders are created in.
 
     Returns:
         Tuple[str, Path]: Returns a tuple with the filename to use for the MDX file
             and the path for the MDX assets folder.
     """
     tutorial_folder_name = path.stem
-    filename = "".join([token.title() for token in tutorial_folder_name.split("_")])
-    tutorial_folder = TUTORIALS_DIR.joinpath(tutorial_folder_name)
+    filename = output_path(path, tutorials_dir).stem
+    tutorial_folder = tutorials_dir.joinpath(tutorial_folder_name)
     assets_folder = tutorial_folder / "assets"
     img_folder = assets_folder / "img"
     plot_data_folder = assets_folder / "plot_data"
@@ -169,7 +497,10 @@ def create_imports() -> str:
     plot_out = "@site/src/components/Plotting.jsx"
     imports = f'import LinkButtons from "{link_btn}";\n'
     imports += f'import CellOutput from "{cell_out}";\n'
-    imports += f'import {{BokehFigure, PlotlyFigure}} from "{plot_out}";\n'
+    imports += (
+        f"import {{BokehFigure, MapFrame, PlotlyFigure, VegaLiteFigure}} "
+        f'from "{plot_out}";\n'
+    )
     return f"{imports}\n"
 
 
@@ -194,74 +525,281 @@ def create_buttons(
     return f'<LinkButtons\n  githubUrl="{github_url}"\n  colabUrl="{colab_url}"\n/>\n\n'
 
 
+def placeholder_token(text: str) -> str:
+    """
+    A short token that does not occur in `text`, for placeholders.
+
+    Args:
+        text (str): Text the placeholder is inserted into.
+
+    Returns:
+        str: Hex token.
+    """
+    token = hashlib.sha256(text.encode()).hexdigest()[:8]
+    while token in text:
+        token = hashlib.sha256(token.encode()).hexdigest()[:8]
+    return token
+
+
+def copy_if_changed(src: Path, dst: Path) -> bool:
+    """
+    Hardlink (or copy) `src` to `dst` unless `dst` already has the same content.
+
+    Args:
+        src (Path): File to copy.
+        dst (Path): Destination file.
+
+    Returns:
+        bool: True if `dst` was (re)written.
+    """
+    if dst.exists():
+        if os.path.samefile(src, dst):
+            return False
+        if dst.stat().st_size == src.stat().st_size and file_sha256(dst) == file_sha256(
+            src
+        ):
+            return False
+    tmp_path = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        # Different filesystem, or links not supported.
+        shutil.copyfile(src, tmp_path)
+    tmp_path.replace(dst)
+    return True
+
+
+def file_sha256(path: Path) -> str:
+    """
+    SHA-256 of a file's content, read in chunks.
+
+    Args:
+        path (Path): File to hash.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_image_variants(
+    img_path: Path,
+    widths: Tuple[int, ...],
+) -> List[Tuple[str, int]]:
+    """
+    Write downscaled WebP versions of an image next to it.
+
+    Variants are named `{stem}-{hash}-{width}w.webp` after the source content, so
+    they are only rendered when the image changed; variants of older versions of the
+    same image are removed.
+
+    Args:
+        img_path (Path): A raster image in the tutorial's assets folder.
+        widths (Tuple[int, ...]): Target widths; widths not smaller than the image
+            are replaced by the image's own width.
+
+    Returns:
+        List[Tuple[str, int]]: File name and width of each variant, narrowest first.
+            Empty if Pillow is not installed or the image cannot be read (or is
+            animated).
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return []
+    tag = file_sha256(img_path)[:12]
+    try:
+        with Image.open(img_path) as image:
+            if getattr(image, "n_frames", 1) > 1:
+                return []
+            width, height = image.size
+            targets = sorted({w for w in widths if w < width} | {width})
+            variants = []
+            for target in targets:
+                name = f"{img_path.stem}-{tag}-{target}w.webp"
+                variants.append((name, target))
+                variant_path = img_path.with_name(name)
+                if variant_path.exists():
+                    continue
+                size = (target, max(1, round(height * target / width)))
+                resized = (
+                    image if target == width else image.resize(size, Image.LANCZOS)
+                )
+                tmp_path = img_path.with_name(f".{name}.{os.getpid()}.tmp")
+                resized.save(tmp_path, format="WEBP", quality=82, method=6)
+                tmp_path.replace(variant_path)
+    except (OSError, ValueError):
+        return []
+    current = {name for name, _ in variants}
+    stale = re.compile(rf"{re.escape(img_path.stem)}-[0-9a-f]{{12}}-\d+w\.webp")
+    for path in img_path.parent.iterdir():
+        if stale.fullmatch(path.name) and path.name not in current:
+            path.unlink(missing_ok=True)
+    return variants
+
+
+def responsive_img(
+    new_path: str,
+    variants: List[Tuple[str, int]],
+    alt: str,
+    title: Optional[str],
+) -> str:
+    """
+    JSX `<img>` for an image with WebP width variants.
+
+    The original image stays the `src` fallback; browsers pick the smallest variant
+    from `srcSet` that covers the rendered width.
+
+    Args:
+        new_path (str): Path of the image relative to the MDX file.
+        variants (List[Tuple[str, int]]): File names and widths of the variants.
+        alt (str): Alternative text.
+        title (Optional[str]): Image title, if any.
+
+    Returns:
+        str: The JSX element on a single line.
+    """
+    folder = new_path.rsplit("/", 1)[0]
+    src_set = " + ', ' + ".join(
+        f"require('./{folder}/{name}').default + ' {width}w'"
+        for name, width in variants
+    )
+    largest = variants[-1][1]
+    attributes = [
+        f"src={{require('./{new_path}').default}}",
+        f"srcSet={{{src_set}}}",
+        f'sizes="(max-width: {largest}px) 100vw, {largest}px"',
+        f"alt={json.dumps(alt)}",
+    ]
+    if title:
+        attributes.append(f"title={json.dumps(title)}")
+    attributes.append('loading="lazy"')
+    return f"<img {' '.join(attributes)} />"
+
+
+def markdown_image_source(old_path: str, lib_dir: Path) -> Path:
+    """
+    Locate the file a local Markdown image link points to.
+
+    Args:
+        old_path (str): The image path as written in the notebook's Markdown.
+        lib_dir (Path): The location for the Bean Machine repo.
+
+    Returns:
+        Path: The path as written if it exists; otherwise the path in the library's
+            tutorials folder (which may not exist either).
+    """
+    path = Path(old_path.strip())
+    if path.exists():
+        return path
+    # Here we assume the original image exists in the same directory as the
+    # notebook, which should be in the tutorials folder of the library.
+    return (lib_dir / "tutorials" / path).resolve()
+
+
+def markdown_image_hashes(path: Path, lib_dir: Path) -> Dict[str, Optional[str]]:
+    """
+    SHA-256 of every local image the notebook's Markdown cells link to.
+
+    The converter copies these images (and renders their WebP variants), so a new
+    image under an unchanged notebook must count as a change too.
+
+    Args:
+        path (Path): Path to the Jupyter notebook.
+        lib_dir (Path): The location for the Bean Machine repo.
+
+    Returns:
+        Dict[str, Optional[str]]: Hex digest per image path as written in the
+            Markdown; None for images that do not exist.
+    """
+    hashes: Dict[str, Optional[str]] = {}
+    for cell in iter_notebook_cells(path):
+        if cell["cell_type"] != "markdown":
+            continue
+        for match in MARKDOWN_IMAGE.finditer(cell["source"]):
+            old_path = match.group(2).strip()
+            if old_path.startswith("http") or old_path in hashes:
+                continue
+            source = markdown_image_source(old_path, lib_dir)
+            hashes[old_path] = file_sha256(source) if source.is_file() else None
+    return hashes
+
+
 def handle_images_found_in_markdown(
     markdown: str,
     new_img_dir: Path,
     lib_dir: Path,
-) -> str:
+    options: ConvertOptions = ConvertOptions(),
+) -> Tuple[str, Dict[str, str]]:
     """
     Update image paths in the Markdown, and copy the image to the docs location.
 
     The pattern we search for in the Markdown is
-    ``![alt-text](path/to/image.png "title")`` with two groups:
+    ``![alt-text](path/to/image.png "title")`` with three groups:
 
-    - group 1 = path/to/image.png
-    - group 2 = "title"
+    - group 1 = alt-text
+    - group 2 = path/to/image.png
+    - group 3 = "title"
 
-    The first group (the path to the image from the original notebook) will be replaced
-    with ``assets/img/{name}`` where the name is `image.png` from the example above. The
-    original image will also be copied to the new location
-    ``{new_img_dir}/assets/img/{name}``, which can be directly read into the MDX file.
+    The path to the image from the original notebook will be replaced with
+    ``assets/img/{name}`` where the name is `image.png` from the example above. The
+    original image is hardlinked (or copied) to ``{new_img_dir}/{name}`` when its
+    content changed, which can be directly read into the MDX file.
+
+    Raster images also get downscaled WebP variants (see `write_image_variants`) and
+    are referenced with a responsive `<img srcSet>` instead. mdformat would escape
+    that JSX, so it is returned separately: the Markdown holds a placeholder word
+    for each element, to be swapped in after formatting.
 
     Args:
         markdown (str): Markdown where we look for Markdown flavored images.
         new_img_dir (Path): Path where images are copied to for display in the
             MDX file.
         lib_dir (Path): The location for the Bean Machine repo.
+        options (ConvertOptions): Conversion options (variant widths).
 
     Returns:
-        str: The original Markdown with new paths for images.
+        Tuple[str, Dict[str, str]]: The Markdown with new paths for images, and the
+            JSX for each placeholder in it.
     """
-    markdown_image_pattern = re.compile(r"""!\[[^\]]*\]\((.*?)(?=\"|\))(\".*\")?\)""")
-    searches = list(re.finditer(markdown_image_pattern, markdown))
-
-    # Return the given Markdown if no images are found.
-    if not searches:
-        return markdown
-
-    # Convert the given Markdown to a list so we can delete the old path with the new
-    # standard path.
-
-    markdown_list = list(markdown)
-    for search in searches:
+    elements: Dict[str, str] = {}
 
+    def replace(match: "re.Match[str]") -> str:
+        alt, old_path, title = match.groups()
         # Skip remote images
-        if search.groups()[0].startswith("http"):
-            continue
-        # Find the old image path and replace it with the new one.
-        old_path, _ = search.groups()
-        start = 0
-        end = 0
-        search = re.search(old_path, markdown)
-        if search is not None:
-            start, end = search.span()
-        old_path = Path(old_path)
-        name = old_path.name.strip()
+        if old_path.startswith("http"):
+            return match.group(0)
+        old_img_path = markdown_image_source(old_path, lib_dir)
+        name = Path(old_path.strip()).name
         new_path = f"assets/img/{name}"
-        del markdown_list[start:end]
-        markdown_list.insert(start, new_path)
 
         # Copy the original image to the new location.
-        if old_path.exists():
-            old_img_path = old_path
-        else:
-            # Here we assume the original image exists in the same directory as the
-            # notebook, which should be in the tutorials folder of the library.
-            old_img_path = (lib_dir / "tutorials" / old_path).resolve()
-        new_img_path = str(new_img_dir / name)
-        shutil.copy(str(old_img_path), new_img_path)
+        new_img_path = new_img_dir / name
+        copy_if_changed(old_img_path, new_img_path)
+
+        variants = []
+        if options.image_widths and new_img_path.suffix.lower() in (
+            ".png",
+            ".jpg",
+            ".jpeg",
+            ".webp",
+        ):
+            variants = write_image_variants(new_img_path, options.image_widths)
+        if not variants:
+            title_part = f" {title}" if title else ""
+            return f"![{alt}]({new_path}{title_part})"
+        placeholder = f"MDXIMAGE{len(elements)}X{placeholder_token(markdown)}"
+        elements[placeholder] = responsive_img(
+            new_path, variants, alt, title.strip('"') if title else None
+        )
+        return placeholder
 
-    return "".join(markdown_list)
+    return MARKDOWN_IMAGE.sub(replace, markdown), elements
 
 
 def transform_style_attributes(markdown: str) -> str:
@@ -309,6 +847,7 @@ def handle_markdown_cell(
     cell: NotebookNode,
     new_img_dir: Path,
     lib_dir: Path,
+    options: ConvertOptions = ConvertOptions(),
 ) -> str:
     """
     Handle the given Jupyter Markdown cell and convert it to MDX.
@@ -318,6 +857,7 @@ def handle_markdown_cell(
         new_img_dir (Path): Path where images are copied to for display in the
             Markdown cell.
         lib_dir (Path): The location for the Bean Machine library.
+        options (ConvertOptions): Conversion options.
 
     Returns:
         str: Transformed Markdown object suitable for inclusion in MDX.
@@ -325,7 +865,9 @@ def handle_markdown_cell(
     markdown = cell["source"]
 
     # Update image paths in the Markdown and copy them to the Markdown tutorials folder.
-    markdown = handle_images_found_in_markdown(markdown, new_img_dir, lib_dir)
+    markdown, images = handle_images_found_in_markdown(
+        markdown, new_img_dir, lib_dir, options
+    )
 
     # We will attempt to handle inline style attributes written in HTML by converting
     # them to something React can consume.
@@ -335,6 +877,8 @@ def handle_markdown_cell(
     # notebooks, but are not really useful in the MDX.
     markdown = re.sub("(<!--.*?-->)", "", markdown, flags=re.DOTALL)
     mdx = mdformat.text(markdown, options={"wrap": 88}, extensions={"myst"})
+    for placeholder, element in images.items():
+        mdx = mdx.replace(placeholder, element)
     return f"{mdx}\n"
 
 
@@ -384,9 +928,418 @@ def transform_bokeh_json(json_data: Dict[str, Any]) -> Dict[str, Any]:
     return json_tx
 
 
+def write_plot_data(
+    data: Any,
+    plot_data_folder: Path,
+    compress: Optional[str] = None,
+) -> str:
+    """
+    Write plot data as compact JSON to a content-addressed file.
+
+    The file is named after the SHA-256 of its contents, so reconverting an
+    unchanged notebook reproduces the same file names and nothing is rewritten.
+
+    Args:
+        data (Any): JSON serializable plot data.
+        plot_data_folder (Path): Path to the folder where plot data should be
+            stored.
+        compress (Optional[str]): Also write a `.gz` ("gzip") or `.br` ("br")
+            sidecar, for hosts that serve pre-compressed static files.
+
+    Returns:
+        str: The file name of the JSON file inside `plot_data_folder`.
+    """
+    payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+    name = f"{hashlib.sha256(payload).hexdigest()}.json"
+    file_path = plot_data_folder / name
+    if not file_path.exists():
+        file_path.write_bytes(payload)
+    if compress == "gzip":
+        sidecar = plot_data_folder / f"{name}.gz"
+        if not sidecar.exists():
+            # mtime=0 keeps the gzip header, and so the file, reproducible.
+            sidecar.write_bytes(gzip.compress(payload, compresslevel=9, mtime=0))
+    elif compress == "br":
+        sidecar = plot_data_folder / f"{name}.br"
+        if not sidecar.exists():
+            import brotli
+
+            sidecar.write_bytes(brotli.compress(payload, quality=11))
+    return name
+
+
+def remove_stale_plot_data(
+    plot_data_folder: Path,
+    referenced: Set[str],
+    compress: Optional[str] = None,
+) -> List[Path]:
+    """
+    Delete plot data files the tutorial's MDX no longer references.
+
+    Sidecars of referenced files are kept only if they are of the kind currently
+    being written.
+
+    Args:
+        plot_data_folder (Path): Path to the tutorial's plot data folder.
+        referenced (Set[str]): Plot data file names the tutorial's MDX references.
+        compress (Optional[str]): The sidecar kind in use ("gzip", "br" or None).
+
+    Returns:
+        List[Path]: The files that were removed.
+    """
+    keep = {".json"} | ({"gzip": {".gz"}, "br": {".br"}}.get(compress) or set())
+    removed = []
+    for file_path in sorted(plot_data_folder.iterdir()):
+        name = file_path.name
+        for suffix in (".gz", ".br"):
+            name = name.removesuffix(suffix)
+        if not file_path.is_file():
+            continue
+        if name not in referenced or file_path.suffix not in keep:
+            file_path.unlink()
+            removed.append(file_path)
+    return removed
+
+
+def remove_stale_assets(
+    folder: Path,
+    referenced: Set[str],
+    generated: "re.Pattern[str]",
+) -> List[Path]:
+    """
+    Delete converter-written assets (images, map pages) no MDX references any more.
+
+    Args:
+        folder (Path): An asset folder.
+        referenced (Set[str]): File names the MDX using the folder references.
+        generated (re.Pattern[str]): Names written by the converter; other files are
+            left alone.
+
+    Returns:
+        List[Path]: The files that were removed.
+    """
+    if not folder.is_dir():
+        return []
+    removed = []
+    for file_path in sorted(folder.iterdir()):
+        name = file_path.name
+        if file_path.is_file() and generated.fullmatch(name) and name not in referenced:
+            file_path.unlink()
+            removed.append(file_path)
+    return removed
+
+
+def numeric_array(value: Any) -> Optional[np.ndarray]:
+    """
+    Interpret a plot data value as a numeric array.
+
+    Args:
+        value (Any): A JSON value from a Plotly or Bokeh payload: a list of numbers, a
+            rectangular list of lists of numbers, or a typed array already encoded by
+            Plotly (`{"dtype": ..., "bdata": ...}`).
+
+    Returns:
+        Optional[np.ndarray]: The array, or None if the value is not numeric (e.g. it
+            contains strings, booleans or nulls).
+    """
+    if isinstance(value, dict) and "bdata" in value and "dtype" in value:
+        array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+        if "shape" in value:
+            shape = [int(n) for n in str(value["shape"]).split(",")]
+            array = array.reshape(shape)
+        return array
+    if not isinstance(value, list) or not value:
+        return None
+    rows = value if isinstance(value[0], list) else [value]
+    width = len(rows[0])
+    for row in rows:
+        if not isinstance(row, list) or len(row) != width:
+            return None
+        for item in row:
+            if isinstance(item, bool) or not isinstance(item, (int, float)):
+                return None
+    array = np.array(value)
+    return array if array.dtype.kind in "if" else None
+
+
+def smallest_dtype(array: np.ndarray, allowed: Tuple[str, ...]) -> Optional[np.dtype]:
+    """
+    Pick the smallest dtype from `allowed` that represents `array` exactly.
+
+    Args:
+        array (np.ndarray): Numeric array.
+        allowed (Tuple[str, ...]): Candidate numpy dtype names, smallest first.
+
+    Returns:
+        Optional[np.dtype]: The dtype, or None if no candidate is exact.
+    """
+    for name in allowed:
+        dtype = np.dtype(name)
+        if dtype.kind in "iu" and array.dtype.kind == "i":
+            info = np.iinfo(dtype)
+            if array.size == 0 or (array.min() >= info.min and array.max() <= info.max):
+                return dtype
+        elif dtype.kind == "f":
+            if np.array_equal(array.astype(dtype), array, equal_nan=True):
+                return dtype
+    return None
+
+
+# Typed arrays plotly.js accepts (it has no 64-bit integers).
+PLOTLY_DTYPES = ("i1", "u1", "i2", "u2", "i4", "u4", "f4", "f8")
+# Typed arrays BokehJS accepts.
+BOKEH_DTYPES = ("int32", "float32", "float64")
+
+
+def plotly_typed_array(array: np.ndarray) -> Optional[Dict[str, str]]:
+    """
+    Encode an array in Plotly's `{"dtype", "bdata", "shape"}` typed array form.
+
+    Args:
+        array (np.ndarray): 1D or 2D numeric array.
+
+    Returns:
+        Optional[Dict[str, str]]: The encoded array, or None if no Plotly dtype
+            represents it exactly.
+    """
+    dtype = smallest_dtype(array, PLOTLY_DTYPES)
+    if dtype is None:
+        return None
+    encoded = {
+        "dtype": dtype.str.lstrip("<|"),
+        "bdata": base64.b64encode(array.astype(dtype.newbyteorder("<"))).decode(),
+    }
+    if array.ndim == 2:
+        encoded["shape"] = f"{array.shape[0]}, {array.shape[1]}"
+    return encoded
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points, and from each of `threshold - 2` equal buckets in
+    between the point forming the largest triangle with the previously kept point and
+    the average of the next bucket. Peaks and troughs survive, unlike with plain
+    striding.
+
+    Args:
+        x (np.ndarray): Point x positions (ascending).
+        y (np.ndarray): Point y values.
+        threshold (int): Number of points to keep.
+
+    Returns:
+        np.ndarray: Sorted indices of the points to keep.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = x.astype(float)
+    y = y.astype(float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        keep[i + 1] = a
+    return keep
+
+
+def take_points(value: Any, indices: np.ndarray, length: int) -> Any:
+    """
+    Subset a per-point trace attribute, leaving anything else untouched.
+
+    Args:
+        value (Any): Trace attribute value (list, typed array, dict or scalar).
+        indices (np.ndarray): Indices of the points to keep.
+        length (int): Number of points in the trace before downsampling.
+
+    Returns:
+        Any: The attribute restricted to `indices` if it has one entry per point;
+            nested dicts (e.g. `marker`) are handled recursively.
+    """
+    if isinstance(value, dict) and "bdata" not in value:
+        return {key: take_points(val, indices, length) for key, val in value.items()}
+    array = numeric_array(value) if isinstance(value, dict) else None
+    if array is not None and array.ndim == 1 and len(array) == length:
+        return array[indices].tolist()
+    if isinstance(value, list) and len(value) == length:
+        return [value[i] for i in indices]
+    return value
+
+
+def decimate_plotly_trace(trace: Dict[str, Any], max_points: int) -> Dict[str, Any]:
+    """
+    Downsample a long Plotly line trace with LTTB.
+
+    Only `scatter`/`scattergl` traces drawn with lines and numeric `y` are touched.
+    A non-numeric `x` (dates, categories) is ranked by position. Every attribute
+    with one entry per point (`x`, `text`, `marker.color`, ...) is reduced to the
+    same points.
+
+    Args:
+        trace (Dict[str, Any]): Plotly trace.
+        max_points (int): Maximum number of points to keep.
+
+    Returns:
+        Dict[str, Any]: The (possibly) downsampled trace.
+    """
+    if trace.get("type", "scatter") not in ("scatter", "scattergl"):
+        return trace
+    if "lines" not in str(trace.get("mode", "lines")):
+        return trace
+    y = numeric_array(trace.get("y"))
+    if y is None or y.ndim != 1 or len(y) <= max_points:
+        return trace
+    n = len(y)
+    x = numeric_array(trace.get("x"))
+    if x is None or x.ndim != 1 or len(x) != n:
+        x = np.arange(n)
+    indices = lttb(x, y, max_points)
+    trace = {key: take_points(val, indices, n) for key, val in trace.items()}
+    if "x" not in trace and "x0" not in trace:
+        # Keep the original positions of an implicit x axis.
+        trace["x"] = indices.tolist()
+    return trace
+
+
+def encode_plotly_arrays(value: Any) -> Any:
+    """
+    Recursively replace long numeric lists with Plotly typed arrays.
+
+    Args:
+        value (Any): Part of a Plotly trace.
+
+    Returns:
+        Any: The value with numeric lists of at least `TYPED_ARRAY_MIN_LENGTH` items
+            base64 encoded.
+    """
+    if isinstance(value, dict):
+        if "bdata" in value:
+            return value
+        return {key: encode_plotly_arrays(val) for key, val in value.items()}
+    if isinstance(value, list) and value:
+        array = numeric_array(value)
+        if array is not None and array.size >= TYPED_ARRAY_MIN_LENGTH:
+            return plotly_typed_array(array) or value
+    if isinstance(value, list):
+        return [encode_plotly_arrays(val) for val in value]
+    return value
+
+
+def compact_plotly(data: Dict[str, Any], options: ConvertOptions) -> Dict[str, Any]:
+    """
+    Shrink a Plotly figure payload before it is written to disk.
+
+    Args:
+        data (Dict[str, Any]): Plotly figure JSON (`{"data": [...], "layout": ...}`).
+        options (ConvertOptions): Conversion options.
+
+    Returns:
+        Dict[str, Any]: The figure with long line traces downsampled and numeric
+            arrays in traces stored as typed arrays.
+    """
+    traces = data.get("data")
+    if not isinstance(traces, list):
+        return data
+    if options.max_points:
+        traces = [
+            (
+                decimate_plotly_trace(trace, options.max_points)
+                if isinstance(trace, dict)
+                else trace
+            )
+            for trace in traces
+        ]
+    if options.typed_arrays:
+        traces = [encode_plotly_arrays(trace) for trace in traces]
+    return {**data, "data": traces}
+
+
+def bokeh_typed_array(array: np.ndarray, version: str) -> Optional[Dict[str, Any]]:
+    """
+    Encode a 1D array in BokehJS' binary array form.
+
+    Bokeh 3 uses `{"type": "ndarray", "array": {"type": "bytes", "data": ...}}`,
+    Bokeh 2 `{"__ndarray__": ...}`.
+
+    Args:
+        array (np.ndarray): 1D numeric array.
+        version (str): Bokeh version the payload was produced with.
+
+    Returns:
+        Optional[Dict[str, Any]]: The encoded array, or None if no BokehJS dtype
+            represents it exactly.
+    """
+    dtype = smallest_dtype(array, BOKEH_DTYPES)
+    if dtype is None or array.ndim != 1:
+        return None
+    data = base64.b64encode(array.astype(dtype.newbyteorder("<"))).decode()
+    if version.split(".")[0].isdigit() and int(version.split(".")[0]) >= 3:
+        return {
+            "type": "ndarray",
+            "array": {"type": "bytes", "data": data},
+            "shape": [len(array)],
+            "dtype": dtype.name,
+            "order": "little",
+        }
+    return {
+        "__ndarray__": data,
+        "shape": [len(array)],
+        "dtype": dtype.name,
+        "order": "little",
+    }
+
+
+def encode_bokeh_arrays(value: Any, version: str) -> Any:
+    """
+    Recursively encode numeric ColumnDataSource columns as BokehJS typed arrays.
+
+    Args:
+        value (Any): Part of a Bokeh document JSON.
+        version (str): Bokeh version the payload was produced with.
+
+    Returns:
+        Any: The value with long numeric columns base64 encoded.
+    """
+
+    def column(values: Any) -> Any:
+        array = numeric_array(values) if isinstance(values, list) else None
+        if array is None or array.ndim != 1 or len(array) < TYPED_ARRAY_MIN_LENGTH:
+            return values
+        return bokeh_typed_array(array, version) or values
+
+    if isinstance(value, list):
+        return [encode_bokeh_arrays(val, version) for val in value]
+    if not isinstance(value, dict):
+        return value
+    if value.get("type") == "ColumnDataSource":  # Bokeh 2
+        data = value.get("attributes", {}).get("data")
+        if isinstance(data, dict):
+            data = {key: column(val) for key, val in data.items()}
+            value = {**value, "attributes": {**value["attributes"], "data": data}}
+    if value.get("name") == "ColumnDataSource":  # Bokeh 3
+        data = value.get("attributes", {}).get("data")
+        if isinstance(data, dict) and isinstance(data.get("entries"), list):
+            entries = [[key, column(val)] for key, val in data["entries"]]
+            data = {**data, "entries": entries}
+            value = {**value, "attributes": {**value["attributes"], "data": data}}
+    return {key: encode_bokeh_arrays(val, version) for key, val in value.items()}
+
+
 def handle_bokeh(
     values: List[Dict[str, Union[int, str, NotebookNode]]],
     plot_data_folder: Path,
+    options: ConvertOptions = ConvertOptions(),
 ) -> List[Tuple[int, str]]:
     """
     Convert Bokeh `show` outputs and Applications to MDX.
@@ -396,6 +1349,7 @@ def handle_bokeh(
             outputs.
         plot_data_folder (Path): Path to the folder where plot data should be
             stored.
+        options (ConvertOptions): Conversion options.
 
     Returns:
         List[Tuple[int, str]]: A list of tuples, where the first entry in the tuple is
@@ -447,30 +1401,102 @@ def handle_bokeh(
         # Shuffle the data so we can save it in a format BokehJS will be able to
         # consume later.
         js = transform_bokeh_json(json_data)
-        file_name = js["target_id"]
+        if options.typed_arrays:
+            js["doc"] = encode_bokeh_arrays(js["doc"], str(js["version"]))
         # Save the Bokeh JSON data to disk. It will be read by React when loaded in
         # Docusaurus.
-        file_path = plot_data_folder / f"{file_name}.json"
-        with file_path.open("w") as f:
-            json.dump(js, f, indent=2)
+        file_name = write_plot_data(js, plot_data_folder, options.compress_plot_data)
 
         # Add the Bokeh figure to the MDX output.
-        path_to_data = f"./assets/plot_data/{file_name}.json"
+        path_to_data = f"./assets/plot_data/{file_name}"
         output.append(
             (index, f"<BokehFigure data={{require('{path_to_data}')}} />\n\n"),
         )
     return output
 
 
+def write_image_asset(
+    img: bytes,
+    mime_type: str,
+    img_folder: Path,
+    optimize: bool = False,
+) -> str:
+    """
+    Write an image to a content-addressed file, once.
+
+    The file is named after the SHA-256 of the original bytes, so the same figure
+    produced by several cells or notebooks is stored a single time and its name only
+    changes when the figure does. Writes go through a temporary file, so concurrent
+    conversions can share the folder.
+
+    Args:
+        img (bytes): Raw image bytes.
+        mime_type (str): Image MIME type, e.g. `image/png`.
+        img_folder (Path): Folder the image is written to.
+        optimize (bool): Losslessly recompress PNGs with Pillow, keeping the smaller
+            of the two encodings.
+
+    Returns:
+        str: The file name of the image inside `img_folder`.
+    """
+    ext = {"image/jpeg": ".jpg", "image/svg+xml": ".svg"}.get(mime_type)
+    ext = ext or mimetypes.guess_extension(mime_type) or ".bin"
+    name = f"{hashlib.sha256(img).hexdigest()}{ext}"
+    file_path = img_folder / name
+    if file_path.exists():
+        return name
+    if optimize and mime_type == "image/png":
+        img = recompress_png(img)
+    img_folder.mkdir(parents=True, exist_ok=True)
+    tmp_path = img_folder / f".{name}.{os.getpid()}.tmp"
+    tmp_path.write_bytes(img)
+    tmp_path.replace(file_path)
+    return name
+
+
+def recompress_png(img: bytes) -> bytes:
+    """
+    Losslessly recompress a PNG with Pillow.
+
+    Args:
+        img (bytes): PNG bytes.
+
+    Returns:
+        bytes: The smaller of the original and the recompressed PNG. The original is
+            returned unchanged if Pillow is not installed or cannot read the image.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return img
+    try:
+        with Image.open(io.BytesIO(img)) as image:
+            out = io.BytesIO()
+            image.save(out, format="PNG", optimize=True)
+    except (OSError, ValueError):
+        return img
+    smaller = out.getvalue()
+    return smaller if len(smaller) < len(img) else img
+
+
 def handle_image(
     values: List[Dict[str, Union[int, str, NotebookNode]]],
+    img_folder: Path,
+    options: ConvertOptions = ConvertOptions(),
 ) -> List[Tuple[int, str]]:
     """
-    Convert embedded images to string MDX can consume.
+    Write embedded images to asset files and reference them from the MDX.
+
+    Inlining images as `data:` URIs bloats the MDX, slows down the MDX compiler and
+    keeps browsers from caching them, so every image is written to `img_folder` (see
+    `write_image_asset`) and linked by path instead.
 
     Args:
-        values (List[Dict[str, Union[int, str, NotebookNode]]]): Bokeh tagged cell
+        values (List[Dict[str, Union[int, str, NotebookNode]]]): Image tagged cell
             outputs.
+        img_folder (Path): Folder shared by all tutorials in a tutorials directory
+            (`{tutorials_dir}/assets/img`), one level above the MDX file.
+        options (ConvertOptions): Conversion options.
 
     Returns:
         List[Tuple[int, str]]: A list of tuples, where the first entry in the tuple is
@@ -480,9 +1506,14 @@ def handle_image(
     output = []
     for value in values:
         index = value["index"]
-        mime_type = value["mime_type"]
-        img = value["data"]
-        output.append((index, f"![](data:image/{mime_type};base64,{img})\n\n"))
+        mime_type = str(value["mime_type"])
+        data = value["data"]
+        if mime_type == "image/svg+xml":
+            img = minify_svg(str(data)).encode()
+        else:
+            img = base64.b64decode(str(data))
+        name = write_image_asset(img, mime_type, img_folder, options.optimize_images)
+        output.append((index, f"![](../assets/img/{name})\n\n"))
     return output
 
 
@@ -510,19 +1541,429 @@ def handle_markdown(
     return output
 
 
-def handle_pandas(
-    values: List[Dict[str, Union[int, str, NotebookNode]]],
-) -> List[Tuple[int, str]]:
-    """
-    Handle how to display pandas DataFrames.
+class Table(NamedTuple):
+    """A DataFrame output reduced to what is rendered in the MDX."""
 
-    There is a scoped style tag in the DataFrame output that uses the class name
+    columns: List[str]
+    head: List[List[str]]
+    tail: List[List[str]]
+    n_rows: int
+    # The index is rendered as the first column unless it is a plain 0..n-1 range.
+    has_index: bool
+
+
+def table_from_dataresource(resource: Dict[str, Any], max_rows: int) -> Table:
+    """
+    Read a table from an `application/vnd.dataresource+json` output.
+
+    This is pandas' Table Schema repr (`pd.options.display.html.table_schema`),
+    which is already structured, so nothing needs parsing.
+
+    Args:
+        resource (Dict[str, Any]): The Table Schema JSON.
+        max_rows (int): Maximum number of rows to keep.
+
+    Returns:
+        Table: The table.
+    """
+    fields = [str(field["name"]) for field in resource["schema"]["fields"]]
+    index_fields = list(resource["schema"].get("primaryKey") or [])
+    rows = resource.get("data") or []
+    n_rows = len(rows)
+    head_n = (max_rows + 1) // 2 if n_rows > max_rows else n_rows
+    tail_n = max_rows // 2 if n_rows > max_rows else 0
+    has_index = bool(index_fields) and not (
+        index_fields == ["index"]
+        and [row.get("index") for row in rows] == list(range(n_rows))
+    )
+    columns = [field for field in fields if has_index or field not in index_fields]
+
+    def cells(row: Dict[str, Any]) -> List[str]:
+        return ["" if row.get(c) is None else str(row.get(c)) for c in columns]
+
+    return Table(
+        columns=["" if c in index_fields and c == "index" else c for c in columns],
+        head=[cells(row) for row in rows[:head_n]],
+        tail=[cells(row) for row in rows[n_rows - tail_n :]] if tail_n else [],
+        n_rows=n_rows,
+        has_index=has_index,
+    )
+
+
+def table_from_html(html: str, max_rows: int) -> Optional[Table]:
+    """
+    Stream the first `<table>` out of a DataFrame's HTML repr.
+
+    Rows are parsed one at a time with lxml's pull parser and dropped as soon as
+    they have been read, keeping only the first and last `max_rows // 2` of them,
+    so memory does not grow with the size of the table.
+
+    Args:
+        html (str): The `text/html` output.
+        max_rows (int): Maximum number of rows to keep.
+
+    Returns:
+        Optional[Table]: The table, or None if the HTML holds no table.
+    """
+    parser = etree.HTMLPullParser(events=("end",), tag=("tr", "table"))
+    header: List[List[str]] = []
+    head: List[List[str]] = []
+    tail: collections.deque = collections.deque(maxlen=max_rows // 2)
+    range_index = True
+    head_n = (max_rows + 1) // 2
+    n_rows = 0
+    has_index = False
+    found = False
+    chunk_size = 1 << 16
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start : start + chunk_size])
+        for _, element in parser.read_events():
+            if element.tag == "table":
+                found = True
+                break
+            cells = ["".join(cell.itertext()).strip() for cell in element]
+            in_header = element.getparent() is not None and (
+                element.getparent().tag == "thead"
+            )
+            if in_header:
+                header.append(cells)
+            else:
+                if len(element) and element[0].tag == "th":
+                    has_index = True
+                range_index = range_index and bool(cells) and cells[0] == str(n_rows)
+                if len(head) < head_n:
+                    head.append(cells)
+                else:
+                    tail.append(cells)
+                n_rows += 1
+            # Drop the row (and anything before it) from the tree.
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        if found:
+            break
+    else:
+        parser.close()
+    if not header and not head:
+        return None
+    if n_rows <= max_rows:
+        head, tail = head + list(tail), collections.deque()
+    # A plain RangeIndex adds nothing; drop it like `to_markdown(index=False)` did.
+    keep_index = has_index and not range_index
+    columns = header[0] if header else []
+    if has_index and not keep_index:
+        columns = columns[1:]
+        head = [row[1:] for row in head]
+        tail = collections.deque(row[1:] for row in tail)
+    return Table(
+        columns=["" if c.startswith("Unnamed") else c for c in columns],
+        head=head,
+        tail=list(tail),
+        n_rows=n_rows,
+        has_index=keep_index,
+    )
+
+
+def escape_table_cell(text: str) -> str:
+    """
+    Escape text for a Markdown pipe table cell in MDX.
+
+    Args:
+        text (str): Cell text.
+
+    Returns:
+        str: Single line text with `|` and the MDX-special `{`, `}`, `<` escaped.
+    """
+    text = " ".join(text.split())
+    for char in ("\\", "|", "{", "}", "<"):
+        text = text.replace(char, "\\" + char)
+    return text
+
+
+def render_table(table: Table) -> str:
+    """
+    Render a table as a Markdown pipe table.
+
+    Args:
+        table (Table): The table.
+
+    Returns:
+        str: The pipe table, with a `...` row and a row count note when rows were
+            left out.
+    """
+    width = max([len(table.columns)] + [len(row) for row in table.head + table.tail])
+    if width == 0:
+        return ""
+
+    def line(cells: List[str]) -> str:
+        cells = [escape_table_cell(cell) for cell in cells]
+        cells += [""] * (width - len(cells))
+        return "| " + " | ".join(cells) + " |"
+
+    lines = [line(table.columns), "|" + "---|" * width]
+    lines.extend(line(row) for row in table.head)
+    shown = len(table.head) + len(table.tail)
+    if table.n_rows > shown:
+        lines.append(line(["..."] * width))
+        lines.extend(line(row) for row in table.tail)
+        lines.append("")
+        lines.append(
+            f"_{table.n_rows} rows × {len(table.columns) - table.has_index} columns "
+            f"(showing the first {len(table.head)} and last {len(table.tail)})._"
+        )
+    return "\n".join(lines)
+
+
+def handle_pandas(
+    values: List[Dict[str, Union[int, str, NotebookNode]]],
+    options: ConvertOptions = ConvertOptions(),
+) -> List[Tuple[int, str]]:
+    """
+    Handle how to display pandas DataFrames.
+
+    There is a scoped style tag in the DataFrame output that uses the class name
     `dataframe` to style the output. We will use this token to determine if a pandas
     DataFrame is being displayed.
 
+    The table is read from the cheapest representation available: the Table Schema
+    JSON (`application/vnd.dataresource+json`) if the notebook saved one, otherwise
+    the HTML, streamed with lxml. If the HTML holds no usable table the `text/plain`
+    repr is shown instead. Long tables are cut to their first and last rows.
+
     Args:
-        values (List[Dict[str, Union[int, str, NotebookNode]]]): Bokeh tagged cell
+        values (List[Dict[str, Union[int, str, NotebookNode]]]): DataFrame tagged
+            cell outputs, with the output's full mimebundle under `bundle`.
+        options (ConvertOptions): Conversion options.
+
+    Returns:
+        List[Tuple[int, str]]: A list of tuples, where the first entry in the tuple is
+            the index where the output occurred from the cell, and the second entry of
+            the tuple is the MDX formatted string.
+    """
+    output = []
+    max_rows = max(2, options.max_table_rows)
+    for value in values:
+        index = int(value["index"])
+        bundle = value.get("bundle") or {}
+        resource = bundle.get("application/vnd.dataresource+json")
+        table = None
+        if isinstance(resource, dict) and "schema" in resource:
+            table = table_from_dataresource(resource, max_rows)
+        if table is None:
+            table = table_from_html(str(value["data"]), max_rows)
+        if table is None and "text/plain" in bundle:
+            output.extend(
+                handle_plain([{"index": index, "data": bundle["text/plain"]}])
+            )
+            continue
+        if table is not None:
+            output.append((index, f"\n{render_table(table)}\n\n"))
+    return output
+
+
+def minify_svg(svg: str) -> str:
+    """
+    Shrink an SVG without visibly changing it.
+
+    Drops comments, `<metadata>` and whitespace between tags, and rounds numbers in
+    attribute values (path data, transforms) to 3 decimals, which is far below a
+    pixel at any sensible size.
+
+    Args:
+        svg (str): SVG document.
+
+    Returns:
+        str: The minified SVG.
+    """
+    svg = re.sub(r"<!--.*?-->", "", svg, flags=re.DOTALL)
+    svg = re.sub(r"<metadata>.*?</metadata>", "", svg, flags=re.DOTALL)
+    svg = re.sub(r">\s+<", "><", svg.strip())
+
+    def round_numbers(match: "re.Match[str]") -> str:
+        return re.sub(r"(\d+\.\d{3})\d+", r"\1", match.group(0))
+
+    return re.sub(r'="[^"]*"', round_numbers, svg)
+
+
+def simplify_line(points: List[List[float]], tolerance: float) -> List[List[float]]:
+    """
+    Douglas-Peucker simplification of a coordinate list.
+
+    Args:
+        points (List[List[float]]): `[x, y, ...]` positions.
+        tolerance (float): Maximum distance a dropped point may be from the line.
+
+    Returns:
+        List[List[float]]: The simplified positions; first and last are always kept.
+    """
+    if tolerance <= 0 or len(points) < 3:
+        return points
+    xy = np.array([p[:2] for p in points], dtype=float)
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = xy[first], xy[last]
+        segment = end - start
+        rel = xy[first + 1 : last] - start
+        norm = np.hypot(*segment)
+        if norm == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(segment[0] * rel[:, 1] - segment[1] * rel[:, 0]) / norm
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            keep[first + 1 + i] = True
+            stack.extend([(first, first + 1 + i), (first + 1 + i, last)])
+    return [p for p, k in zip(points, keep) if k]
+
+
+def simplify_geometry(geometry: Any, tolerance: float, precision: int = 6) -> Any:
+    """
+    Simplify and round a GeoJSON geometry.
+
+    Coordinates are rounded to `precision` decimals (about 10 cm at 6), repeated
+    points are dropped and lines/rings are simplified with Douglas-Peucker. Rings
+    keep at least 4 positions and lines at least 2.
+
+    Args:
+        geometry (Any): GeoJSON geometry object.
+        tolerance (float): Douglas-Peucker tolerance in coordinate units.
+        precision (int): Number of decimals to keep.
+
+    Returns:
+        Any: The simplified geometry.
+    """
+    if not isinstance(geometry, dict):
+        return geometry
+    kind = geometry.get("type")
+    if kind == "GeometryCollection":
+        return {
+            **geometry,
+            "geometries": [
+                simplify_geometry(g, tolerance, precision)
+                for g in geometry.get("geometries", [])
+            ],
+        }
+
+    def position(p: List[float]) -> List[float]:
+        return [round(float(c), precision) for c in p]
+
+    def line(coords: List[List[float]], minimum: int) -> List[List[float]]:
+        rounded = [position(p) for p in coords]
+        deduped = [p for i, p in enumerate(rounded) if i == 0 or p != rounded[i - 1]]
+        simplified = simplify_line(deduped, tolerance)
+        return simplified if len(simplified) >= minimum else deduped
+
+    coords = geometry.get("coordinates")
+    if kind == "Point":
+        coords = position(coords)
+    elif kind == "MultiPoint":
+        coords = [position(p) for p in coords]
+    elif kind == "LineString":
+        coords = line(coords, 2)
+    elif kind in ("MultiLineString", "Polygon"):
+        coords = [line(part, 2 if kind == "MultiLineString" else 4) for part in coords]
+    elif kind == "MultiPolygon":
+        coords = [[line(ring, 4) for ring in polygon] for polygon in coords]
+    return {**geometry, "coordinates": coords}
+
+
+def geojson_figure(geojson: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    """
+    Build a Plotly map figure that draws a (simplified) GeoJSON object.
+
+    The GeoJSON is drawn as MapLibre layers of a `scattermap` trace, so the
+    existing `PlotlyFigure` component can render it.
+
+    Args:
+        geojson (Dict[str, Any]): GeoJSON Feature, FeatureCollection or geometry.
+        tolerance (float): Douglas-Peucker tolerance in degrees.
+
+    Returns:
+        Dict[str, Any]: Plotly figure JSON.
+    """
+    if geojson.get("type") == "FeatureCollection":
+        features = geojson.get("features", [])
+    elif geojson.get("type") == "Feature":
+        features = [geojson]
+    else:
+        features = [{"type": "Feature", "properties": {}, "geometry": geojson}]
+    features = [
+        {**f, "geometry": simplify_geometry(f.get("geometry"), tolerance)}
+        for f in features
+    ]
+    collection = {"type": "FeatureCollection", "features": features}
+
+    kinds: Set[str] = set()
+    positions: List[List[float]] = []
+
+    def walk(value: Any) -> None:
+        if isinstance(value, dict):
+            if value.get("type") == "GeometryCollection":
+                for geometry in value.get("geometries", []):
+                    walk(geometry)
+                return
+            kinds.add(str(value.get("type", "")).replace("Multi", ""))
+            walk(value.get("coordinates"))
+        elif isinstance(value, list) and value and isinstance(value[0], (int, float)):
+            positions.append(value)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    for feature in features:
+        walk(feature.get("geometry"))
+    layers = [
+        {"source": collection, "type": layer_type, "below": "traces"}
+        for kind, layer_type in (
+            ("Polygon", "fill"),
+            ("Polygon", "line"),
+            ("LineString", "line"),
+            ("Point", "circle"),
+        )
+        if kind in kinds
+    ]
+    center, zoom = {"lon": 0.0, "lat": 0.0}, 1.0
+    if positions:
+        xy = np.array([p[:2] for p in positions], dtype=float)
+        (west, south), (east, north) = xy.min(axis=0), xy.max(axis=0)
+        center = {"lon": (west + east) / 2, "lat": (south + north) / 2}
+        extent = max(east - west, north - south, 1e-6)
+        zoom = float(np.clip(np.log2(360 / extent) - 0.5, 0, 18))
+    return {
+        "data": [
+            {"type": "scattermap", "lon": [], "lat": [], "mode": "markers"},
+        ],
+        "layout": {
+            "map": {
+                "style": "carto-positron",
+                "center": center,
+                "zoom": round(zoom, 2),
+                "layers": layers,
+            },
+            "margin": {"l": 0, "r": 0, "t": 0, "b": 0},
+        },
+    }
+
+
+def handle_geojson(
+    values: List[Dict[str, Union[int, str, NotebookNode]]],
+    plot_data_folder: Path,
+    options: ConvertOptions = ConvertOptions(),
+) -> List[Tuple[int, str]]:
+    """
+    Convert `application/geo+json` outputs to an interactive map.
+
+    Args:
+        values (List[Dict[str, Union[int, str, NotebookNode]]]): GeoJSON tagged cell
             outputs.
+        plot_data_folder (Path): Path to the folder where plot data should be
+            stored.
+        options (ConvertOptions): Conversion options.
 
     Returns:
         List[Tuple[int, str]]: A list of tuples, where the first entry in the tuple is
@@ -532,21 +1973,96 @@ def handle_pandas(
     output = []
     for value in values:
         index = int(value["index"])
-        data = str(value["data"])
-        df = pd.read_html(data, flavor="lxml")
-        # NOTE: The return is a list of dataframes and we only care about the first
-        #       one.
-        md_df = df[0]
-        for column in md_df.columns:
-            if column.startswith("Unnamed"):
-                md_df.rename(columns={column: ""}, inplace=True)
-        # Remove the index if it is just a range, and output to markdown.
-        mdx = ""
-        if isinstance(md_df.index, pd.RangeIndex):
-            mdx = md_df.to_markdown(index=False)
-        elif not isinstance(md_df.index, pd.RangeIndex):
-            mdx = md_df.to_markdown()
-        output.append((index, f"\n{mdx}\n\n"))
+        data = value["data"]
+        geojson = json.loads(data) if isinstance(data, str) else dict(data)
+        figure = geojson_figure(geojson, options.geojson_tolerance)
+        file_name = write_plot_data(
+            figure, plot_data_folder, options.compress_plot_data
+        )
+        path_to_data = f"./assets/plot_data/{file_name}"
+        output.append(
+            (index, f"<PlotlyFigure data={{require('{path_to_data}')}} />\n\n"),
+        )
+    return output
+
+
+def handle_vegalite(
+    values: List[Dict[str, Union[int, str, NotebookNode]]],
+    plot_data_folder: Path,
+    options: ConvertOptions = ConvertOptions(),
+) -> List[Tuple[int, str]]:
+    """
+    Convert Vega-Lite (Altair) outputs to MDX.
+
+    Args:
+        values (List[Dict[str, Union[int, str, NotebookNode]]]): Vega-Lite tagged
+            cell outputs.
+        plot_data_folder (Path): Path to the folder where plot data should be
+            stored.
+        options (ConvertOptions): Conversion options.
+
+    Returns:
+        List[Tuple[int, str]]: A list of tuples, where the first entry in the tuple is
+            the index where the output occurred from the cell, and the second entry of
+            the tuple is the MDX formatted string.
+    """
+    output = []
+    if values and not any(VEGA_VENDOR_DIR.glob("vega-embed@*.min.js")):
+        print(
+            "WARNING: Vega-Lite output, but the runtime is not vendored; run "
+            "`npm run fetch-vega` before building the site."
+        )
+    for value in values:
+        index = int(value["index"])
+        file_name = write_plot_data(
+            value["data"], plot_data_folder, options.compress_plot_data
+        )
+        path_to_data = f"./assets/plot_data/{file_name}"
+        output.append(
+            (index, f"<VegaLiteFigure spec={{require('{path_to_data}')}} />\n\n"),
+        )
+    return output
+
+
+def handle_map_html(
+    values: List[Dict[str, Union[int, str, NotebookNode]]],
+    map_folder: Path,
+) -> List[Tuple[int, str]]:
+    """
+    Convert folium / leafmap HTML map outputs to a lazily loaded frame.
+
+    These outputs inline the whole map page (often megabytes of escaped HTML in an
+    `<iframe srcdoc>`). The page is written once to the site's static folder,
+    named by content hash, and the MDX only references it.
+
+    Args:
+        values (List[Dict[str, Union[int, str, NotebookNode]]]): Map tagged cell
+            outputs.
+        map_folder (Path): Folder under `static/` the map pages are written to.
+
+    Returns:
+        List[Tuple[int, str]]: A list of tuples, where the first entry in the tuple is
+            the index where the output occurred from the cell, and the second entry of
+            the tuple is the MDX formatted string.
+    """
+    output = []
+    for value in values:
+        index = int(value["index"])
+        html = str(value["data"])
+        doc = etree.HTML(html)  # pyre-ignore
+        frames = doc.xpath("//iframe[@srcdoc]") if doc is not None else []
+        page = frames[0].get("srcdoc") if frames else html
+        # Leading indentation and blank lines are most of the generated page.
+        page = "\n".join(line.strip() for line in page.splitlines() if line.strip())
+        payload = page.encode()
+        name = f"{hashlib.sha256(payload).hexdigest()}.html"
+        file_path = map_folder / name
+        if not file_path.exists():
+            map_folder.mkdir(parents=True, exist_ok=True)
+            tmp_path = map_folder / f".{name}.{os.getpid()}.tmp"
+            tmp_path.write_bytes(payload)
+            tmp_path.replace(file_path)
+        output.append((index, f'<MapFrame src="{MAP_ASSETS_URL}/{name}" />\n\n'))
     return output
 
 
@@ -582,15 +2098,17 @@ def handle_plain(
 def handle_plotly(
     values: List[Dict[str, Union[int, str, NotebookNode]]],
     plot_data_folder: Path,
+    options: ConvertOptions = ConvertOptions(),
 ) -> List[Tuple[int, str]]:
     """
     Convert Plotly outputs to MDX.
 
     Args:
-        values (List[Dict[str, Union[int, str, NotebookNode]]]): Bokeh tagged cell
+        values (List[Dict[str, Union[int, str, NotebookNode]]]): Plotly tagged cell
             outputs.
         plot_data_folder (Path): Path to the folder where plot data should be
             stored.
+        options (ConvertOptions): Conversion options.
 
     Returns:
         List[Tuple[int, str]]: A list of tuples, where the first entry in the tuple is
@@ -600,15 +2118,12 @@ def handle_plotly(
     output = []
     for value in values:
         index = value["index"]
-        data = value["data"]
-        file_name = str(uuid.uuid4())
-        file_path = plot_data_folder / f"{file_name}.json"
-        path_to_data = f"./assets/plot_data/{file_name}.json"
+        data = compact_plotly(dict(value["data"]), options)
+        file_name = write_plot_data(data, plot_data_folder, options.compress_plot_data)
+        path_to_data = f"./assets/plot_data/{file_name}"
         output.append(
             (index, f"<PlotlyFigure data={{require('{path_to_data}')}} />\n\n"),
         )
-        with file_path.open("w") as f:
-            json.dump(data, f, indent=2)
     return output
 
 
@@ -642,264 +2157,238 @@ CELL_OUTPUTS_TO_PROCESS = Dict[
 ]
 
 
-def aggregate_mdx(
-    cell_outputs_to_process: CELL_OUTPUTS_TO_PROCESS,
-    plot_data_folder: Path,
-) -> str:
-    """
-    Aggregate the `cell_outputs_to_process` into MDX.
+class OutputContext(NamedTuple):
+    """Where a notebook's output handlers write their assets, and how."""
 
-    Args:
-        cell_outputs_to_process (CELL_OUTPUTS_TO_PROCESS): A dictionary of cell outputs
-            that need further processing.
-        plot_data_folder (Path): Path to where plot data should be stored for the
-            tutorial.
+    plot_data_folder: Path
+    img_folder: Path
+    options: ConvertOptions = ConvertOptions()
+    map_folder: Path = MAP_ASSETS_DIR
 
-    Returns:
-        str: MDX formatted string.
-    """
-    processed_mdx = []
-    for key, values in cell_outputs_to_process.items():
-        if not values:
-            continue
-        if key == "bokeh":
-            processed_mdx.extend(handle_bokeh(values, plot_data_folder))
-        if key == "image":
-            processed_mdx.extend(handle_image(values))
-        if key == "markdown":
-            processed_mdx.extend(handle_markdown(values))
-        if key == "pandas":
-            processed_mdx.extend(handle_pandas(values))
-        if key == "plain":
-            processed_mdx.extend(handle_plain(values))
-        if key == "plotly":
-            processed_mdx.extend(handle_plotly(values, plot_data_folder))
-        if key == "tqdm":
-            processed_mdx.extend(handle_tqdm(values))
 
-    # Ensure the same ordering of the MDX happens as was found in the original cell
-    # output.
-    processed_mdx = sorted(processed_mdx, key=lambda item: item[0])
-    mdx = "\n".join([item[1] for item in processed_mdx])
-    return mdx
+class MimeHandler(NamedTuple):
+    """How cell outputs of one mimetype are bucketed for conversion."""
 
+    # Key into BUCKET_HANDLERS.
+    bucket: str
+    # Returns the value to put in the bucket, SKIP to drop the output silently, or
+    # None to let the next-ranked mimetype of the output handle it instead.
+    select: Callable[[NotebookNode, Any], Any]
 
-def prioritize_dtypes(
-    cell_outputs: List[NotebookNode],
-) -> Tuple[List[List[str]], List[bool]]:
-    """
-    Prioritize cell output data types.
 
-    Args:
-        cell_outputs (List[NotebookNode]): A list of cell outputs.
+# Sentinel `MimeHandler.select` result: the output is handled, but renders nothing.
+SKIP = object()
 
-    Returns:
-        Tuple[List[List[str]], List[bool]]: Return two items in the tuple; the first is
-            a list of prioritized data types and the second is a list boolean values
-            associated with the cell output having Plotly information in it or not.
-    """
-    cell_output_dtypes = [
-        (
-            list(cell_output["data"].keys())
-            if "data" in cell_output
-            else [cell_output["output_type"]]
-        )
-        for cell_output in cell_outputs
-    ]
-    prioritized_cell_output_dtypes = [
-        sorted(
-            set(dtypes).intersection(set(priorities)),
-            key=lambda dtype: priorities.index(dtype),
-        )
-        for dtypes in cell_output_dtypes
-    ]
-    prioritized_cell_output_dtypes = [
-        [str(item) for item in items] for items in prioritized_cell_output_dtypes
-    ]
-    plotly_flags = [
-        any(["plotly" in output for output in outputs])
-        for outputs in cell_output_dtypes
-    ]
-    return prioritized_cell_output_dtypes, plotly_flags
 
+def _select_data(cell_output: NotebookNode, data: Any) -> Any:
+    return data
 
-def aggregate_bokeh(
-    prioritized_data_dtype: str,
-    cell_output: NotebookNode,
-    data: NotebookNode,
-    cell_outputs_to_process: CELL_OUTPUTS_TO_PROCESS,
-    i: int,
-) -> None:
-    """
-    Aggregate Bokeh cell outputs.
 
-    Args:
-        prioritized_data_dtype (str): The prioritized cell output data type.
-        cell_output (NotebookNode): The actual cell output from the notebook.
-        data (NotebookNode): The data of the cell output.
-        cell_outputs_to_process (CELL_OUTPUTS_TO_PROCESS): Dictionary containing
-            aggregated cell output objects.
-        i (int): Index for the cell output in the list of cell output objects.
+def _select_skip(cell_output: NotebookNode, data: Any) -> Any:
+    return SKIP
 
-    Returns:
-        None: Does not return anything, instead adds values to the
-            cell_outputs_to_process if applicable.
-    """
-    if prioritized_data_dtype == "application/vnd.bokehjs_load.v0+json":
-        pass
-    # Bokeh `show` outputs.
-    if prioritized_data_dtype == "application/vnd.bokehjs_exec.v0+json":
-        data = cell_output["data"]["application/javascript"]
-        cell_outputs_to_process["bokeh"].append({"index": i, "data": data})
-    # Bokeh applications.
-    if prioritized_data_dtype == "text/html" and "Bokeh Application" in data:
-        cell_outputs_to_process["bokeh"].append({"index": i, "data": data})
 
+def _select_bokeh_exec(cell_output: NotebookNode, data: Any) -> Any:
+    return cell_output["data"].get("application/javascript")
 
-def aggregate_images_and_plotly(
-    prioritized_data_dtype: str,
-    cell_output: NotebookNode,
-    data: NotebookNode,
-    plotly_flags: List[bool],
-    cell_outputs_to_process: CELL_OUTPUTS_TO_PROCESS,
-    i: int,
+
+def _select_widget(cell_output: NotebookNode, data: Any) -> Any:
+    return cell_output["data"].get("text/plain")
+
+
+def _html_bucket(data: Any) -> Optional[str]:
+    html = str(data)
+    if "Bokeh Application" in html:
+        return "bokeh"
+    if "dataframe" in html:
+        return "pandas"
+    if "folium" in html or "leaflet" in html.lower():
+        return "map_html"
+    return None
+
+
+# Output mimetypes in priority order (a cell output carries several
+# representations of the same object; the first one listed here that accepts it is
+# rendered). Registered with `register_mime_handler`.
+MIME_HANDLERS: Dict[str, MimeHandler] = {}
+# Mimetype -> position in MIME_HANDLERS.
+MIME_RANK: Dict[str, int] = {}
+
+
+def register_mime_handler(
+    mime_type: str,
+    bucket: str,
+    select: Callable[[NotebookNode, Any], Any] = _select_data,
 ) -> None:
     """
-    Aggregates images or Plotly cell outputs into an appropriate bucket.
+    Register (or replace) how outputs of a mimetype are converted.
+
+    New mimetypes rank below everything registered before them; replacing one keeps
+    its rank.
+
+    Args:
+        mime_type (str): Output mimetype, or `stream` for stdout/stderr outputs.
+        bucket (str): Key into BUCKET_HANDLERS.
+        select (Callable[[NotebookNode, Any], Any]): Picks the value to convert; see
+            `MimeHandler.select`.
+    """
+    MIME_HANDLERS[mime_type] = MimeHandler(bucket, select)
+    MIME_RANK.setdefault(mime_type, len(MIME_RANK))
+
+
+def _select_html(cell_output: NotebookNode, data: Any) -> Any:
+    return data if _html_bucket(data) else None
+
+
+for _mime_type, _bucket, _select in [
+    ("text/markdown", "markdown", _select_data),
+    ("application/vnd.plotly.v1+json", "plotly", _select_data),
+    ("application/vnd.vegalite.v5+json", "vegalite", _select_data),
+    ("application/vnd.vegalite.v4+json", "vegalite", _select_data),
+    ("application/vnd.vegalite.v3+json", "vegalite", _select_data),
+    ("application/geo+json", "geojson", _select_data),
+    ("image/png", "image", _select_data),  # matplotlib output.
+    ("image/jpeg", "image", _select_data),
+    ("image/svg+xml", "image", _select_data),
+    ("application/vnd.jupyter.widget-view+json", "tqdm", _select_widget),
+    ("application/vnd.bokehjs_load.v0+json", "bokeh", _select_skip),
+    ("application/vnd.bokehjs_exec.v0+json", "bokeh", _select_bokeh_exec),
+    ("text/html", "html", _select_html),
+    ("stream", "plain", _select_data),
+    ("text/plain", "plain", _select_data),
+]:
+    register_mime_handler(_mime_type, _bucket, _select)
+
+
+# Bucket -> function converting all of a cell's outputs in that bucket to
+# `(output index, MDX)` pairs.
+BUCKET_HANDLERS: Dict[
+    str,
+    Callable[
+        [List[Dict[str, Union[int, str, NotebookNode]]], OutputContext],
+        List[Tuple[int, str]],
+    ],
+] = {
+    "bokeh": lambda v, ctx: handle_bokeh(v, ctx.plot_data_folder, ctx.options),
+    "geojson": lambda v, ctx: handle_geojson(v, ctx.plot_data_folder, ctx.options),
+    "html": lambda v, ctx: handle_html(v, ctx),
+    "image": lambda v, ctx: handle_image(v, ctx.img_folder, ctx.options),
+    "map_html": lambda v, ctx: handle_map_html(v, ctx.map_folder),
+    "markdown": lambda v, ctx: handle_markdown(v),
+    "pandas": lambda v, ctx: handle_pandas(v, ctx.options),
+    "plain": lambda v, ctx: handle_plain(v),
+    "plotly": lambda v, ctx: handle_plotly(v, ctx.plot_data_folder, ctx.options),
+    "tqdm": lambda v, ctx: handle_tqdm(v),
+    "vegalite": lambda v, ctx: handle_vegalite(v, ctx.plot_data_folder, ctx.options),
+}
+
+
+def handle_html(
+    values: List[Dict[str, Union[int, str, NotebookNode]]],
+    context: OutputContext,
+) -> List[Tuple[int, str]]:
+    """
+    Convert `text/html` outputs with the handler for what they contain.
+
+    An HTML output is a DataFrame, a Bokeh Application or a map depending on its
+    content (see `_html_bucket`), so it is handed on to that bucket's handler.
 
     Args:
-        prioritized_data_dtype (str): The prioritized cell output data type.
-        cell_output (NotebookNode): The actual cell output from the notebook.
-        data (NotebookNode): The data of the cell output.
-        plotly_flags (List[bool]): True if a Plotly plot was found in the cell outputs
-            else False.
-        cell_outputs_to_process (CELL_OUTPUTS_TO_PROCESS): Dictionary containing
-            aggregated cell output objects.
-        i (int): Index for the cell output in the list of cell output objects.
+        values (List[Dict[str, Union[int, str, NotebookNode]]]): HTML tagged cell
+            outputs.
+        context (OutputContext): Asset folders and conversion options.
 
     Returns:
-        None: Does not return anything, instead adds values to the
-            cell_outputs_to_process if applicable.
+        List[Tuple[int, str]]: A list of tuples, where the first entry in the tuple is
+            the index where the output occurred from the cell, and the second entry of
+            the tuple is the MDX formatted string.
     """
-    if prioritized_data_dtype.startswith("image"):
-        if not plotly_flags[i]:
-            cell_outputs_to_process["image"].append(
-                {"index": i, "data": data, "mime_type": prioritized_data_dtype},
-            )
-        # Plotly outputs a static image, but we can use the JSON in the cell
-        # output to create interactive plots using a React component.
-        if plotly_flags[i]:
-            data = cell_output["data"]["application/vnd.plotly.v1+json"]
-            cell_outputs_to_process["plotly"].append({"index": i, "data": data})
+    buckets: CELL_OUTPUTS_TO_PROCESS = collections.defaultdict(list)
+    for value in values:
+        buckets[str(_html_bucket(value["data"]))].append(value)
+    output = []
+    for bucket, bucket_values in buckets.items():
+        output.extend(BUCKET_HANDLERS[bucket](bucket_values, context))
+    return output
 
 
-def aggregate_plain_output(
-    prioritized_data_dtype: str,
-    cell_output: NotebookNode,
-    data: NotebookNode,
+def aggregate_mdx(
     cell_outputs_to_process: CELL_OUTPUTS_TO_PROCESS,
-    i: int,
-) -> None:
+    context: OutputContext,
+) -> str:
     """
-    Aggregate plain text cell outputs together.
+    Aggregate the `cell_outputs_to_process` into MDX.
 
     Args:
-        prioritized_data_dtype (str): The prioritized cell output data type.
-        cell_output (NotebookNode): The actual cell output from the notebook.
-        data (NotebookNode): The data of the cell output.
-        cell_outputs_to_process (CELL_OUTPUTS_TO_PROCESS): Dictionary containing
-            aggregated cell output objects.
-        i (int): Index for the cell output in the list of cell output objects.
+        cell_outputs_to_process (CELL_OUTPUTS_TO_PROCESS): A dictionary of cell outputs
+            that need further processing.
+        context (OutputContext): Asset folders and conversion options.
 
     Returns:
-        None: Does not return anything, instead adds values to the
-            cell_outputs_to_process if applicable.
+        str: MDX formatted string.
     """
-    # Ignore error outputs.
-    if "name" in cell_output and cell_output["name"] == "stderr":
-        pass
-    # Ignore matplotlib legend text output.
-    if prioritized_data_dtype == "text/plain" and "matplotlib" in data:
-        pass
-    cell_outputs_to_process["plain"].append({"index": i, "data": data})
+    processed_mdx = []
+    for key, values in cell_outputs_to_process.items():
+        if values:
+            processed_mdx.extend(BUCKET_HANDLERS[key](values, context))
+
+    # Ensure the same ordering of the MDX happens as was found in the original cell
+    # output.
+    processed_mdx = sorted(processed_mdx, key=lambda item: item[0])
+    mdx = "\n".join([item[1] for item in processed_mdx])
+    return mdx
 
 
 def aggregate_output_types(cell_outputs: List[NotebookNode]) -> CELL_OUTPUTS_TO_PROCESS:
     """
     Aggregate cell outputs into a dictionary for further processing.
 
+    Each output is dispatched once: its mimetypes are tried in MIME_RANK order and
+    the first registered handler that accepts the output buckets it. Outputs with no
+    registered mimetype (e.g. errors) are left out.
+
     Args:
         cell_outputs (List[NotebookNode]): List of cell outputs.
 
     Returns:
         CELL_OUTPUTS_TO_PROCESS: Dictionary containing aggregated cell output objects.
     """
-    # We will use the below cell output data types for prioritizing the output shown in
-    # the MDX file.
-    prioritized_cell_output_dtypes, plotly_flags = prioritize_dtypes(cell_outputs)
-
-    cell_outputs_to_process = {
-        "bokeh": [],
-        "image": [],
-        "markdown": [],
-        "pandas": [],
-        "plain": [],
-        "plotly": [],
-        "tqdm": [],
-    }
+    cell_outputs_to_process: CELL_OUTPUTS_TO_PROCESS = collections.defaultdict(list)
     for i, cell_output in enumerate(cell_outputs):
-        prioritized_data_dtype = prioritized_cell_output_dtypes[i][0]
-
-        # If there is no `data` key in the cell_output, then it may be an error that
-        # needs to be handled. Even if it is not an error, the data is stored in a
-        # different key if no `data` key is found.
-        data = (
-            cell_output["data"][prioritized_data_dtype]
-            if "data" in cell_output
-            else cell_output["text"]
+        bundle = cell_output.get("data")
+        # Outputs without a `data` bundle (stdout/stderr streams) are keyed by their
+        # output type and keep their content under `text`.
+        mime_types = (
+            list(bundle) if bundle is not None else [cell_output["output_type"]]
         )
-        bokeh_check = "bokeh" in prioritized_data_dtype or (
-            prioritized_data_dtype == "text/html" and "Bokeh Application" in data
+        ranked = sorted(
+            (m for m in mime_types if m in MIME_RANK), key=MIME_RANK.__getitem__
         )
-        if bokeh_check:
-            aggregate_bokeh(
-                prioritized_data_dtype,
-                cell_output,
-                data,
-                cell_outputs_to_process,
-                i,
-            )
-        image_check = prioritized_data_dtype.startswith("image")
-        if image_check:
-            aggregate_images_and_plotly(
-                prioritized_data_dtype,
-                cell_output,
-                data,
-                plotly_flags,
-                cell_outputs_to_process,
-                i,
-            )
-        plain_check = prioritized_data_dtype in ["text/plain", "stream"]
-        if plain_check:
-            aggregate_plain_output(
-                prioritized_data_dtype,
-                cell_output,
-                data,
-                cell_outputs_to_process,
-                i,
-            )
-        if prioritized_data_dtype == "text/markdown":
-            cell_outputs_to_process["markdown"].append({"index": i, "data": data})
-        if "dataframe" in data:
-            cell_outputs_to_process["pandas"].append({"index": i, "data": data})
-        if prioritized_data_dtype == "application/vnd.jupyter.widget-view+json":
-            data = cell_output["data"]["text/plain"]
-            cell_outputs_to_process["tqdm"].append({"index": i, "data": data})
-
+        for mime_type in ranked:
+            data = bundle[mime_type] if bundle is not None else cell_output.get("text")
+            handler = MIME_HANDLERS[mime_type]
+            selected = handler.select(cell_output, data)
+            if selected is None:
+                continue
+            if selected is not SKIP:
+                cell_outputs_to_process[handler.bucket].append(
+                    {
+                        "index": i,
+                        "data": selected,
+                        "mime_type": mime_type,
+                        "bundle": bundle or {},
+                    },
+                )
+            break
     return cell_outputs_to_process
 
 
-def handle_cell_outputs(cell: NotebookNode, plot_data_folder: Path) -> str:
+def handle_cell_outputs(
+    cell: NotebookNode,
+    plot_data_folder: Path,
+    img_folder: Path,
+    options: ConvertOptions = ConvertOptions(),
+) -> str:
     """
     Handle cell outputs and convert to MDX.
 
@@ -907,6 +2396,8 @@ def handle_cell_outputs(cell: NotebookNode, plot_data_folder: Path) -> str:
         cell (NotebookNode): The cell where the outputs need converting.
         plot_data_folder (Path): Path to the folder where plot data should be
             stored.
+        img_folder (Path): Path to the shared folder image outputs are written to.
+        options (ConvertOptions): Conversion options.
 
     Returns:
         str: MDX formatted cell output.
@@ -924,11 +2415,17 @@ def handle_cell_outputs(cell: NotebookNode, plot_data_folder: Path) -> str:
     cell_outputs_to_process = aggregate_output_types(cell_outputs)
 
     # Now we process all aggregated cell outputs into a single output for the type.
-    md = aggregate_mdx(cell_outputs_to_process, plot_data_folder)
+    context = OutputContext(plot_data_folder, img_folder, options)
+    md = aggregate_mdx(cell_outputs_to_process, context)
     return md
 
 
-def handle_code_cell(cell: NotebookNode, plot_data_folder: Path) -> str:
+def handle_code_cell(
+    cell: NotebookNode,
+    plot_data_folder: Path,
+    img_folder: Path,
+    options: ConvertOptions = ConvertOptions(),
+) -> str:
     """
     Handle code cells in Jupyter notebooks and convert them to MDX.
 
@@ -936,69 +2433,438 @@ def handle_code_cell(cell: NotebookNode, plot_data_folder: Path) -> str:
         cell (NotebookNode): A Jupyter notebook cell that contains code.
         plot_data_folder (Path): Path to the folder where plot data should be
             stored.
+        img_folder (Path): Path to the shared folder image outputs are written to.
+        options (ConvertOptions): Conversion options.
 
     Returns:
         str: MDX formatted code cell.
     """
     cell_input_mdx = handle_cell_input(cell, "python")
-    cell_output_mdx = handle_cell_outputs(cell, plot_data_folder)
+    cell_output_mdx = handle_cell_outputs(cell, plot_data_folder, img_folder, options)
     return cell_input_mdx + cell_output_mdx
 
 
-def transform_notebook(path: Path, nb_metadata) -> str:
+def iter_mdx_chunks(
+    path: Path,
+    nb_metadata,
+    tutorials_dir: Path,
+    options: ConvertOptions = ConvertOptions(),
+) -> Iterator[str]:
     """
-    Transform a notebook located at the given path into MDX.
+    Convert a notebook into MDX one cell at a time.
 
     Args:
         path (Path): Path to the Jupyter notebook tutorial.
+        nb_metadata (Dict[str, Dict[str, str]]): Metadata from the config file.
+        tutorials_dir (Path): Folder the tutorial folders are created in.
+        options (ConvertOptions): Conversion options.
 
-    Returns:
-        str: MDX formatted string.
+    Yields:
+        str: The MDX for the header (frontmatter, imports, buttons), then for each
+            cell in turn.
     """
-    filename, assets_folder = create_folders(path)
+    _, assets_folder = create_folders(path, tutorials_dir)
     img_folder = assets_folder / "img"
     plot_data_folder = assets_folder / "plot_data"
-    save_folder = assets_folder.joinpath("..").resolve()
-    nb = load_notebook(path)
-    mdx = ""
-    mdx += create_frontmatter(path, nb_metadata)
-    mdx += create_imports()
-    mdx += create_buttons(nb_metadata, path.stem)
-    for cell in nb["cells"]:
+    # Image outputs are shared across the tutorials so repeated figures are stored
+    # once.
+    shared_img_folder = tutorials_dir / "assets" / "img"
+    cells: Iterable[NotebookNode]
+    if not options.execute:
+        cells = iter_notebook_cells(path)
+    else:
+        # nbclient runs the notebook as a whole, so it is loaded as a whole.
+        nb = load_notebook(path)
+        cells = nb["cells"]
+        started = time.monotonic()
+        timings, replay_seconds = execute_notebook(nb, path, options)
+        if replay_seconds:
+            print(
+                f"{path.stem}: replayed the cached cells before cell {timings[0][0]} "
+                f"in {replay_seconds:.1f}s to rebuild the kernel state"
+            )
+        for i, seconds in timings:
+            print(f"{path.stem}: cell {i} ran in {seconds:.1f}s")
+        print(
+            f"{path.stem}: executed {len(timings)} cell(s) in "
+            f"{time.monotonic() - started:.1f}s",
+        )
+    yield create_frontmatter(path, nb_metadata)
+    yield create_imports()
+    yield create_buttons(nb_metadata, path.stem)
+    for cell in cells:
         cell_type = cell["cell_type"]
 
         # Handle a Markdown cell.
         if cell_type == "markdown":
-            mdx += handle_markdown_cell(cell, img_folder, LIB_DIR)
+            yield handle_markdown_cell(cell, img_folder, LIB_DIR, options)
 
         # Handle a code cell.
         if cell_type == "code":
-            mdx += handle_code_cell(cell, plot_data_folder)
+            yield handle_code_cell(cell, plot_data_folder, shared_img_folder, options)
+            # The outputs are in the MDX (or its assets) now; let them go.
+            cell["outputs"] = []
 
-    # Write the MDX file to disk.
-    save_path = save_folder / f"{filename}.mdx"
-    with save_path.open("w") as f:
-        f.write(mdx)
 
-    # Return the string for debugging purposes.
-    return mdx
+def transform_notebook(
+    path: Path,
+    nb_metadata,
+    tutorials_dir: Path,
+    options: ConvertOptions = ConvertOptions(),
+) -> Path:
+    """
+    Transform a notebook located at the given path into MDX.
 
+    The notebook is read one cell at a time (see `iter_notebook_cells`), and the MDX
+    is streamed to a temporary file next to the final one as each cell is
+    converted, then renamed into place once the whole notebook converted. Memory is
+    bounded by the largest cell rather than the notebook, except with `--execute`,
+    where nbclient needs the whole notebook loaded; a failed conversion leaves the
+    previous MDX untouched.
 
-if __name__ == "__main__":
+    Args:
+        path (Path): Path to the Jupyter notebook tutorial.
+        nb_metadata (Dict[str, Dict[str, str]]): Metadata from the config file.
+        tutorials_dir (Path): Folder the tutorial folders are created in.
+        options (ConvertOptions): Conversion options.
+
+    Returns:
+        Path: Path to the written MDX file.
+    """
+    save_path = output_path(path, tutorials_dir)
+    plot_data_folder = save_path.parent / "assets" / "plot_data"
+    referenced: Set[str] = set()
+    images: Set[str] = set()
+    create_folders(path, tutorials_dir)
+    tmp_path = save_path.with_name(f".{save_path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("w") as f:
+            for chunk in iter_mdx_chunks(path, nb_metadata, tutorials_dir, options):
+                referenced.update(PLOT_DATA_REF.findall(chunk))
+                images.update(IMG_REF.findall(chunk))
+                f.write(chunk)
+        tmp_path.replace(save_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    # Plot data files are content addressed, so figures that changed or went away
+    # leave files behind that nothing references any more. The same goes for the
+    # WebP variants of Markdown images; the shared image outputs are collected in
+    # `main`, once every tutorial using them is converted.
+    remove_stale_plot_data(plot_data_folder, referenced, options.compress_plot_data)
+    remove_stale_assets(save_path.parent / "assets" / "img", images, IMAGE_VARIANT_NAME)
+    return save_path
+
+
+def remove_stale_shared_images(tutorials_dir: Path) -> List[Path]:
+    """
+    Delete image outputs in `{tutorials_dir}/assets/img` that no tutorial references.
+
+    The folder is shared by every tutorial in `tutorials_dir`, so references are
+    collected from all of their MDX files, including the ones that were not
+    reconverted.
+
+    Args:
+        tutorials_dir (Path): Folder the tutorial folders are created in.
+
+    Returns:
+        List[Path]: The files that were removed.
+    """
+    referenced: Set[str] = set()
+    for mdx_path in tutorials_dir.rglob("*.mdx"):
+        referenced.update(IMG_REF.findall(mdx_path.read_text()))
+    return remove_stale_assets(
+        tutorials_dir / "assets" / "img", referenced, IMAGE_OUTPUT_NAME
+    )
+
+
+def remove_stale_maps(
+    tutorials_dirs: List[Path],
+    map_folder: Path = MAP_ASSETS_DIR,
+) -> List[Path]:
+    """
+    Delete map pages in `map_folder` that no tutorial references.
+
+    Map pages are content addressed and shared by every tutorials directory, so
+    references are collected from the MDX files of all of them.
+
+    Args:
+        tutorials_dirs (List[Path]): Every folder tutorial folders are created in.
+        map_folder (Path): Folder under `static/` the map pages are written to.
+
+    Returns:
+        List[Path]: The files that were removed.
+    """
+    referenced: Set[str] = set()
+    for tutorials_dir in tutorials_dirs:
+        for mdx_path in tutorials_dir.rglob("*.mdx"):
+            referenced.update(MAP_REF.findall(mdx_path.read_text()))
+    return remove_stale_assets(map_folder, referenced, MAP_NAME)
+
+
+def load_manifest(manifest_path: Path = MANIFEST_PATH) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the conversion manifest.
+
+    Args:
+        manifest_path (Path): Path to the manifest `.json` file.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Manifest entries keyed by MDX output path. Empty if
+            there is no (readable) manifest yet.
+    """
+    try:
+        return json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(
+    manifest: Dict[str, Dict[str, Any]],
+    manifest_path: Path = MANIFEST_PATH,
+) -> None:
+    """
+    Write the conversion manifest.
+
+    Args:
+        manifest (Dict[str, Dict[str, Any]]): Manifest entries keyed by MDX output
+            path.
+        manifest_path (Path): Path to the manifest `.json` file.
+    """
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    # A unique temp file, so concurrent runs never write through the same one.
+    fd, tmp_path = tempfile.mkstemp(
+        dir=manifest_path.parent, prefix=f".{manifest_path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def manifest_entry(
+    path: Path,
+    config_entry: Dict[str, str],
+    options: ConvertOptions = ConvertOptions(),
+) -> Dict[str, Any]:
+    """
+    Build the manifest entry describing what an output is converted from.
+
+    Args:
+        path (Path): Path to the Jupyter notebook.
+        config_entry (Dict[str, str]): The notebook's entry in its config file.
+        options (ConvertOptions): Conversion options.
+
+    Returns:
+        Dict[str, Any]: Notebook path and hash, hashes of the images its Markdown
+            links to, config entry, converter version and options, in their JSON
+            form (tuples become lists), so the entry compares equal to its copy
+            loaded back from the manifest.
+    """
+    entry = {
+        "notebook": str(path),
+        "notebook_sha256": hashlib.sha256(path.read_bytes()).hexdigest(),
+        "images": markdown_image_hashes(path, LIB_DIR),
+        "config": config_entry,
+        "converter": CONVERTER_VERSION,
+        "options": options._asdict(),
+    }
+    return json.loads(json.dumps(entry))
+
+
+def convert_notebook(
+    path: Path,
+    nb_metadata: Dict[str, Dict[str, str]],
+    tutorials_dir: Path,
+    options: ConvertOptions = ConvertOptions(),
+) -> Tuple[Path, str]:
+    """
+    Convert one notebook; the unit of work handed to the process pool.
+
+    Args:
+        path (Path): Path to the Jupyter notebook.
+        nb_metadata (Dict[str, Dict[str, str]]): Metadata from the config file.
+        tutorials_dir (Path): Folder the tutorial folders are created in.
+        options (ConvertOptions): Conversion options.
+
+    Returns:
+        Tuple[Path, str]: The notebook path and an error message ("" on success).
+    """
+    try:
+        transform_notebook(path, nb_metadata, tutorials_dir, options)
+    except Exception as e:  # noqa: BLE001 -- one broken notebook must not stop the rest
+        return path, f"{type(e).__name__}: {e}"
+    return path, ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Convert the tutorial notebooks listed in NOTEBOOK_CONFIG_PATHS "
+        "to MDX.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Convert every notebook, even if the manifest says it is up to date.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of notebooks converted in parallel (default: CPU count).",
+    )
+    parser.add_argument(
+        "--optimize-images",
+        action="store_true",
+        help="Losslessly recompress extracted PNG outputs (needs Pillow).",
+    )
+    parser.add_argument(
+        "--compress-plot-data",
+        choices=("gzip", "br"),
+        default=None,
+        help="Also write a pre-compressed sidecar (.gz or .br) for each plot data "
+        "file ('br' needs the brotli package).",
+    )
+    parser.add_argument(
+        "--max-table-rows",
+        type=int,
+        default=ConvertOptions().max_table_rows,
+        help="Show only the first and last rows of longer DataFrame outputs "
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--geojson-tolerance",
+        type=float,
+        default=ConvertOptions().geojson_tolerance,
+        help="Douglas-Peucker tolerance in degrees for GeoJSON outputs "
+        "(default: %(default)s, 0 disables).",
+    )
+    parser.add_argument(
+        "--no-typed-arrays",
+        action="store_true",
+        help="Keep numeric plot data as plain JSON lists.",
+    )
+    parser.add_argument(
+        "--max-points",
+        type=int,
+        default=ConvertOptions().max_points,
+        help="Downsample Plotly line traces longer than this with LTTB "
+        "(default: %(default)s, 0 disables).",
+    )
+    parser.add_argument(
+        "--image-widths",
+        type=lambda value: tuple(int(w) for w in value.split(",") if w.strip()),
+        default=ConvertOptions().image_widths,
+        help="Comma separated widths of the WebP variants written for images in "
+        "Markdown cells (default: 480,960,1440; empty disables; needs Pillow).",
+    )
+    parser.add_argument(
+        "--execute",
+        action="store_true",
+        help="Run each notebook before converting it (needs nbclient and a "
+        "kernel). Cell outputs are cached: a notebook whose cells are all "
+        "unchanged does not run at all; otherwise the cells before the first "
+        "changed one are replayed to rebuild the kernel state.",
+    )
+    parser.add_argument(
+        "--cell-timeout",
+        type=int,
+        default=ConvertOptions().cell_timeout,
+        help="Seconds a cell may run for with --execute (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--no-cell-cache",
+        action="store_true",
+        help="With --execute, recompute every cell instead of using cached outputs.",
+    )
+    args = parser.parse_args()
+    if args.execute:
+        try:
+            import nbclient  # noqa: F401
+        except ImportError:
+            parser.error("--execute needs the nbclient and ipykernel packages")
+    if args.compress_plot_data == "br":
+        try:
+            import brotli  # noqa: F401
+        except ImportError:
+            parser.error("--compress-plot-data=br needs the brotli package")
+    options = ConvertOptions(
+        optimize_images=args.optimize_images,
+        compress_plot_data=args.compress_plot_data,
+        typed_arrays=not args.no_typed_arrays,
+        max_points=args.max_points,
+        max_table_rows=args.max_table_rows,
+        geojson_tolerance=args.geojson_tolerance,
+        execute=args.execute,
+        cell_timeout=args.cell_timeout,
+        cell_cache=not args.no_cell_cache,
+        image_widths=args.image_widths,
+    )
 
     print("--------------------------------------------")
     print("Converting tutorial notebooks into mdx files")
     print("--------------------------------------------")
 
-    # Loop through each directory that contains notebooks
+    manifest = load_manifest(MANIFEST_PATH)
+    jobs = []  # (path, nb_metadata, tutorials_dir, options, output key, entry)
+    skipped = []
+    tutorials_dirs = []
     for notebook_config_path in NOTEBOOK_CONFIG_PATHS:
-        TUTORIALS_DIR = notebook_config_path["tutorials_dir"]
+        tutorials_dir = notebook_config_path["tutorials_dir"]
         config_path = notebook_config_path["config"]
+        if not config_path.exists():
+            print(f"WARNING: config not found, skipping: {config_path}")
+            continue
+        tutorials_dirs.append(tutorials_dir)
         nb_metadata = load_nb_metadata(config_path=config_path)
 
-        # Loop through each notebook in the directory
         for _, value in nb_metadata.items():
             path = (LIB_DIR / value["nb_path"]).resolve()
+            mdx_path = output_path(path, tutorials_dir)
+            entry = manifest_entry(path, value, options)
+            key = str(mdx_path)
+            if not args.force and mdx_path.exists() and manifest.get(key) == entry:
+                skipped.append(path)
+                continue
+            jobs.append((path, nb_metadata, tutorials_dir, options, key, entry))
+
+    failed = []
+    converted = 0
+    entries = {job[0]: job[4:] for job in jobs}
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [pool.submit(convert_notebook, *job[:4]) for job in jobs]
+        for future in as_completed(futures):
+            path, error = future.result()
+            if error:
+                print(f"{path.stem}: FAILED ({error})")
+                failed.append(path)
+                continue
             print(f"{path.stem}")
-            mdx = transform_notebook(path=path, nb_metadata=nb_metadata)
+            key, entry = entries[path]
+            manifest[key] = entry
+            converted += 1
+    if jobs:
+        save_manifest(manifest, MANIFEST_PATH)
+    # Image outputs are content addressed, so changed figures leave their old files
+    # behind. A failed conversion keeps its previous MDX, and with it the images that
+    # MDX still references.
+    removed = sum(len(remove_stale_shared_images(d)) for d in tutorials_dirs)
+    # Map pages are shared by all tutorials directories, including those whose
+    # config is missing this run: their MDX still references its maps.
+    removed += len(
+        remove_stale_maps([Path(c["tutorials_dir"]) for c in NOTEBOOK_CONFIG_PATHS])
+    )
+
     print("")
+    print(
+        f"Converted {converted}, skipped {len(skipped)} unchanged, "
+        f"failed {len(failed)} notebook(s); removed {removed} stale asset(s)."
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,211 @@
+# Decide whether a Tier 2 doc block needs external context (and say why).
+#
+# conftest.py auto-skips blocks that need data files/URLs, cloud storage, a
+# database, the network, or a live Fused catalog/account call. This module is
+# the single source of truth for that decision:
+#
+#   - Each block is tokenised once with `tokenize`. "code" rules only look at
+#     real code (string literals and comments are blanked out), so a comment
+#     like `# see https://...` or a `print("read_csv")` no longer skips a
+#     block. "literal" rules (URL schemes, mount paths) only look inside
+#     string literals, which is where those actually live.
+#   - Every match records the rule name, the block-relative line and the
+#     matched text, so `pytest --markdown-docs --explain-skips` can say exactly
+#     why each block was skipped.
+#   - Results are cached by a hash of the block source plus a fingerprint of
+#     the rules, so unchanged blocks are never re-scanned across runs.
+#
+# A block that doesn't tokenise (rare: docs with deliberately partial code)
+# falls back to matching every rule against the raw text, as before.
+
+import hashlib
+import io
+import re
+import tokenize
+from typing import NamedTuple
+
+
+class Rule(NamedTuple):
+    name: str
+    # "code": matched against the block with strings/comments blanked out.
+    # "literal": matched against the text of each string literal.
+    kind: str
+    pattern: re.Pattern
+    # Fixture mode (utils/doc_fixtures.py) can satisfy this with local data.
+    servable: bool
+
+
+class Match(NamedTuple):
+    rule: str
+    servable: bool
+    line: int  # 1-based, relative to the first non-blank line of the block
+    text: str
+
+
+def _rule(name: str, kind: str, pattern: str, servable: bool = False) -> Rule:
+    return Rule(name, kind, re.compile(pattern), servable)
+
+
+RULES: tuple[Rule, ...] = (
+    # Context we can never fake locally.
+    _rule("catalog-run", "code", r"""\bfused\.run\(\s*['"]"""),
+    _rule(
+        "fused-remote",
+        "code",
+        r"\bfused\.(?:load|submit|ingest|get|list|delete|upload|download)\b",
+    ),
+    _rule("fused-api", "code", r"\bfused\.api\.|\brun_remote\b"),
+    _rule(
+        "credentials",
+        "code",
+        r"access_token|NotebookCredentials|fused\._auth|AUTHORIZATION",
+    ),
+    _rule("local-file", "code", r"\bopen\("),
+    _rule("mount-path", "literal", r"/mnt/|/mount/"),
+    _rule("object-store-client", "code", r"fsspec|s3fs|gcsfs|boto3"),
+    _rule("async-http", "code", r"httpx|aiohttp"),
+    _rule(
+        "database",
+        "code",
+        r"duckdb|\.sql\(|psycopg|sqlalchemy|snowflake|bigquery|\.connect\(",
+    ),
+    # SQL embedded in a string (DuckDB & co.) reading files/URLs.
+    _rule("sql-read", "literal", r"\bread_(?:parquet|csv|json)\w*\("),
+    _rule("browser-runtime", "code", r"micropip|pyodide|\bawait\b|\bjs\."),
+    _rule("session", "code", r"\blogout\b|fused\.secrets|secrets\.set\b"),
+    # Reading a file or URL: fixture mode can serve these.
+    _rule(
+        "remote-url",
+        "literal",
+        r"s3://|gs://|gcs://|az://|abfs://|ftp://|https?://",
+        True,
+    ),
+    _rule(
+        "data-read",
+        "code",
+        r"read_parquet|read_csv|read_json|read_feather|read_excel|read_file"
+        r"|\b(?:gpd|geopandas|pd|pandas|xr|xarray)\.(?:read_|open)",
+        True,
+    ),
+    _rule("raster-read", "code", r"rioxarray|rasterio\.open|open_dataset", True),
+    _rule(
+        "http-request",
+        "code",
+        r"requests\.(?:get|post|put|delete|head)|urlopen|urllib",
+        True,
+    ),
+)
+
+# Changes whenever a rule is added, renamed or edited, so cached results from
+# an older rule set are never reused.
+RULES_FINGERPRINT = hashlib.sha256(
+    repr([(r.name, r.kind, r.pattern.pattern, r.servable) for r in RULES]).encode()
+).hexdigest()[:16]
+
+_FSTRING_MIDDLE = getattr(tokenize, "FSTRING_MIDDLE", None)  # Python 3.12+
+_FSTRING_EDGES = {
+    getattr(tokenize, "FSTRING_START", None),
+    getattr(tokenize, "FSTRING_END", None),
+} - {None}
+
+
+def _split(source: str) -> tuple[str, list[tuple[int, str]]] | None:
+    """Split a block into (code view, [(line, literal text), ...]).
+
+    The code view keeps the original layout but replaces every string literal
+    with `""` (padded with its newlines, so line numbers still line up) and
+    drops comments. Returns None when the block doesn't tokenise.
+    """
+    lines = source.splitlines(keepends=True)
+    offsets = [0]
+    for ln in lines:
+        offsets.append(offsets[-1] + len(ln))
+
+    def pos(row: int, col: int) -> int:
+        return offsets[row - 1] + col if row - 1 < len(offsets) else len(source)
+
+    view: list[str] = []
+    literals: list[tuple[int, str]] = []
+    cursor = 0
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+            start, end = pos(*tok.start), pos(*tok.end)
+            if start < cursor:
+                continue
+            view.append(source[cursor:start])
+            if tok.type == tokenize.STRING or tok.type == _FSTRING_MIDDLE:
+                literals.append((tok.start[0], tok.string))
+                view.append('""' if tok.type == tokenize.STRING else "")
+                view.append("\n" * tok.string.count("\n"))
+            elif tok.type in _FSTRING_EDGES:
+                view.append('"')
+            elif tok.type != tokenize.COMMENT:
+                view.append(tok.string)
+            cursor = end
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return None
+    view.append(source[cursor:])
+    return "".join(view), literals
+
+
+def _line_of(text: str, index: int) -> int:
+    return text.count("\n", 0, index) + 1
+
+
+def _scan(source: str) -> list[Match]:
+    split = _split(source)
+    matches: list[Match] = []
+    for rule in RULES:
+        if split is None:
+            m = rule.pattern.search(source)
+            found = m and (_line_of(source, m.start()), m.group(0))
+        elif rule.kind == "code":
+            m = rule.pattern.search(split[0])
+            found = m and (_line_of(split[0], m.start()), m.group(0))
+        else:
+            found = next(
+                (
+                    (line + _line_of(lit, m.start()) - 1, lit.strip())
+                    for line, lit in split[1]
+                    if (m := rule.pattern.search(lit))
+                ),
+                None,
+            )
+        if found:
+            matches.append(Match(rule.name, rule.servable, found[0], found[1][:80]))
+    return matches
+
+
+def block_key(code: str) -> str:
+    """Cache key for a block: independent of where it sits in its file."""
+    return hashlib.sha256(code.lstrip("\n").encode()).hexdigest()[:24]
+
+
+class Classifier:
+    """Classify doc blocks, memoising results by block hash.
+
+    `cache` is a plain JSON-serialisable dict so callers can persist it (the
+    conftest stores it in pytest's cache dir between runs).
+    """
+
+    def __init__(self, cache: dict | None = None) -> None:
+        if not cache or cache.get("rules") != RULES_FINGERPRINT:
+            cache = {"rules": RULES_FINGERPRINT, "blocks": {}}
+        self.cache = cache
+        self.dirty = False
+
+    def classify(self, code: str) -> list[Match]:
+        """Every rule the block matches; line numbers are relative to the
+        block's first non-blank line (add `leading_lines(code)` for the
+        position within the padded pytest-markdown-docs source)."""
+        key = block_key(code)
+        hit = self.cache["blocks"].get(key)
+        if hit is None:
+            hit = [list(m) for m in _scan(code.lstrip("\n"))]
+            self.cache["blocks"][key] = hit
+            self.dirty = True
+        return [Match(*m) for m in hit]
+
+
+def leading_lines(code: str) -> int:
+    return len(code) - len(code.lstrip("\n"))
@@ -0,0 +1,127 @@
+# Tier 2 fixture mode: run data-reading doc blocks against tiny local data.
+#
+# Blocks that read `s3://...`, `https://...` etc. are normally auto-skipped by
+# conftest.py. With fixture mode on (`--doc-fixtures`, or
+# `uv run utils/run_doc_execution.py --fixtures`), every remote URL listed in
+# utils/fixtures/manifest.json is rewritten before the block runs:
+#
+#   - object-store URLs (s3://, gs://, ...) become the local path of the
+#     checked-in sample file, so pandas/geopandas read it straight from disk;
+#   - http(s):// URLs point at an in-process HTTP server that serves the same
+#     directory (with Range support, so parquet-over-HTTP readers work too).
+#
+# A block is only un-skipped when *every* URL it contains is in the manifest;
+# anything else stays skipped exactly as before. To cover a new example, drop
+# a small sample file into utils/fixtures/ and add its URL to the manifest.
+
+import json
+import re
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+MANIFEST = FIXTURES_DIR / "manifest.json"
+
+# Any remote URL a block might read from. Stops at quotes, whitespace and
+# closing brackets so f-string/format fragments don't leak into the match.
+_URL_RE = re.compile(r"""\b(?:s3|gs|gcs|az|abfs|ftp|https?)://[^\s'"`)\]}]+""")
+_HTTP_SCHEMES = ("http://", "https://")
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    """Static file handler with single-range `Range:` support.
+
+    fsspec's HTTP filesystem (used by pandas/pyarrow for parquet over HTTP)
+    issues ranged GETs; the stdlib handler ignores `Range` and always sends the
+    whole file, which those readers reject.
+    """
+
+    def send_head(self):
+        m = _RANGE_RE.match(self.headers.get("Range", ""))
+        path = Path(self.translate_path(self.path))
+        if not m or not path.is_file():
+            return super().send_head()
+        size = path.stat().st_size
+        start, end = m.groups()
+        if start:
+            first, last = int(start), min(int(end or size - 1), size - 1)
+        else:  # suffix range: the last N bytes
+            first, last = max(size - int(end or 0), 0), size - 1
+        if first > last:
+            self.send_error(416, "Requested Range Not Satisfiable")
+            return None
+        f = path.open("rb")
+        f.seek(first)
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(str(path)))
+        self.send_header("Content-Range", f"bytes {first}-{last}/{size}")
+        self.send_header("Content-Length", str(last - first + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        self._remaining = last - first + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        remaining = getattr(self, "_remaining", None)
+        if remaining is None:
+            return super().copyfile(source, outputfile)
+        self._remaining = None
+        outputfile.write(source.read(remaining))
+
+    def log_message(self, format, *args):
+        pass  # keep pytest output clean
+
+
+class FixtureServer:
+    """In-process HTTP server + URL rewriter over utils/fixtures/."""
+
+    def __init__(self, fixtures_dir: Path = FIXTURES_DIR) -> None:
+        self.fixtures_dir = fixtures_dir
+        manifest = fixtures_dir / "manifest.json"
+        self.manifest: dict[str, str] = json.loads(manifest.read_text())
+        self.base_url = ""
+        self._httpd: ThreadingHTTPServer | None = None
+
+    def start(self) -> "FixtureServer":
+        handler = partial(_FixtureHandler, directory=str(self.fixtures_dir))
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._httpd.daemon_threads = True
+        host, port = self._httpd.server_address[:2]
+        self.base_url = f"http://{host}:{port}"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def local_target(self, url: str) -> str | None:
+        """Where `url` points in fixture mode, or None if it isn't mapped."""
+        name = self.manifest.get(url)
+        if name is None:
+            return None
+        if url.startswith(_HTTP_SCHEMES):
+            return f"{self.base_url}/{name}"
+        return str(self.fixtures_dir / name)
+
+    def rewrite(self, code: str) -> str | None:
+        """Return `code` with every remote URL redirected to a fixture.
+
+        Returns None when the block has no URLs at all (nothing to serve — it
+        reads something we can't see) or when any URL is not in the manifest.
+        """
+        urls = set(_URL_RE.findall(code))
+        if not urls:
+            return None
+        targets = {u: self.local_target(u) for u in urls}
+        if any(t is None for t in targets.values()):
+            return None
+        # Longest first so a URL that prefixes another can't clobber it.
+        for url in sorted(targets, key=len, reverse=True):
+            code = code.replace(url, targets[url])
+        return code
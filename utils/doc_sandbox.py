@@ -0,0 +1,265 @@
+# Tier 2 sandbox: execute doc blocks in a resource-limited worker process.
+#
+# By default pytest-markdown-docs exec()s every block inside the pytest
+# process, so a block that allocates a huge array or spins forever takes the
+# whole run down with it. With `--doc-sandbox` (or
+# `uv run utils/run_doc_execution.py --sandbox`) conftest.py hands each block to
+# a worker subprocess instead:
+#
+#   - the worker runs under `resource` limits — address space, CPU seconds per
+#     block and open files — so runaway blocks get a MemoryError / CPU-limit
+#     error instead of OOM-killing CI;
+#   - the parent enforces a wall-clock timeout and kills a worker that stops
+#     answering (e.g. blocked in C code or on a socket);
+#   - the worker's HOME is a throwaway copy, so even an un-neutralised
+#     `fused.api.logout()` can only delete the copy of ~/.fused/credentials.
+#
+# Workers are reused across blocks (`--doc-sandbox-scope=session`, the
+# default), replaced at each new doc file (`file`) or per block (`block`). A
+# worker that crashed, timed out or hit a limit is always replaced before the
+# next block.
+# Requests and results travel as JSON lines over a dedicated pipe pair; the
+# block's own stdout/stderr go straight to the inherited fds, so pytest's
+# capture shows them on failure.
+#
+# POSIX only (uses `resource` and fd passing).
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+from typing import NamedTuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODES = ("session", "file", "block")
+
+
+class Limits(NamedTuple):
+    memory_mb: int = 4096  # RLIMIT_AS
+    cpu_seconds: int = 60  # RLIMIT_CPU, per block
+    open_files: int = 256  # RLIMIT_NOFILE
+    timeout: float = 120.0  # wall clock, per block (enforced by the parent)
+
+
+class Result(NamedTuple):
+    ok: bool
+    error: str  # formatted traceback ("" when ok)
+    seconds: float
+    fatal: bool  # the worker is gone or must not be reused
+
+
+class SandboxError(Exception):
+    """A block failed inside the sandbox; str() is the worker's report."""
+
+
+class CPULimitExceeded(Exception):
+    """Raised inside the worker when a block uses up its CPU-seconds budget."""
+
+
+class _Worker:
+    def __init__(self, limits: Limits, home: Path) -> None:
+        req_r, self._req_w = os.pipe()
+        self._res_r, res_w = os.pipe()
+        env = dict(os.environ, HOME=str(home), PYTHONDONTWRITEBYTECODE="1")
+        self.proc = subprocess.Popen(
+            [
+                sys.executable,
+                str(Path(__file__).resolve()),
+                "--worker",
+                str(req_r),
+                str(res_w),
+                json.dumps(limits._asdict()),
+            ],
+            cwd=ROOT,
+            env=env,
+            pass_fds=(req_r, res_w),
+            stdin=subprocess.DEVNULL,
+        )
+        os.close(req_r)
+        os.close(res_w)
+        self._requests = os.fdopen(self._req_w, "w", buffering=1)
+        self._results = os.fdopen(self._res_r, "r")
+
+    def run(self, source: str, filename: str, timeout: float) -> Result:
+        import selectors
+
+        started = time.monotonic()
+        try:
+            self._requests.write(
+                json.dumps({"source": source, "filename": filename}) + "\n"
+            )
+        except (BrokenPipeError, OSError):
+            return Result(False, self._died(), 0.0, True)
+        with selectors.DefaultSelector() as sel:
+            sel.register(self._results, selectors.EVENT_READ)
+            if not sel.select(timeout):
+                self.kill()
+                return Result(
+                    False,
+                    f"Timed out after {timeout:g}s (sandbox wall-clock limit)",
+                    time.monotonic() - started,
+                    True,
+                )
+        line = self._results.readline()
+        if not line:
+            return Result(False, self._died(), time.monotonic() - started, True)
+        reply = json.loads(line)
+        return Result(reply["ok"], reply["error"], reply["seconds"], reply["fatal"])
+
+    def _died(self) -> str:
+        code = self.proc.wait(timeout=10)
+        if code < 0:
+            import signal
+
+            name = signal.Signals(-code).name
+            hint = {
+                "SIGXCPU": "CPU-time limit exceeded",
+                "SIGKILL": "killed (CPU hard limit or out of memory)",
+            }.get(name, "crashed")
+            return f"Sandbox worker {hint} ({name})"
+        return f"Sandbox worker exited unexpectedly (exit code {code})"
+
+    def kill(self) -> None:
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.wait()
+
+    def close(self) -> None:
+        for f in (self._requests, self._results):
+            try:
+                f.close()
+            except OSError:
+                pass
+        if self.proc.poll() is None:
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.kill()
+
+
+class SandboxPool:
+    """Hands blocks to a (recyclable) worker process and collects results."""
+
+    def __init__(self, mode: str = "session", limits: Limits = Limits()) -> None:
+        if mode not in MODES:
+            raise ValueError(f"sandbox mode must be one of {MODES}, got {mode!r}")
+        self.mode = mode
+        self.limits = limits
+        self._home = Path(tempfile.mkdtemp(prefix="doc-sandbox-home-"))
+        credentials = Path.home() / ".fused"
+        if credentials.is_dir():
+            shutil.copytree(credentials, self._home / ".fused")
+        self._worker: _Worker | None = None
+        self._file: str | None = None
+
+    def run(self, source: str, filename: str) -> Result:
+        if self._worker is not None and (
+            self.mode == "block" or (self.mode == "file" and filename != self._file)
+        ):
+            self._retire()
+        if self._worker is None:
+            self._worker = _Worker(self.limits, self._home)
+        self._file = filename
+        result = self._worker.run(source, filename, self.limits.timeout)
+        if result.fatal:
+            self._retire()
+        return result
+
+    def _retire(self) -> None:
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
+
+    def close(self) -> None:
+        self._retire()
+        shutil.rmtree(self._home, ignore_errors=True)
+
+
+# ── Worker side ────────────────────────────────────────────────────────────────
+
+
+def _format_error(exc: BaseException, filename: str, source: str) -> str:
+    """Traceback trimmed to the block's own frames, like pytest-markdown-docs."""
+    lines = source.splitlines()
+    frames = [
+        f for f in traceback.extract_tb(exc.__traceback__) if f.filename == filename
+    ]
+    out = ["Traceback (most recent call last):"]
+    for f in frames or traceback.extract_tb(exc.__traceback__)[-1:]:
+        text = f.line or (lines[f.lineno - 1] if 0 < f.lineno <= len(lines) else "")
+        out.append(f'  File "{f.filename}", line {f.lineno}, in {f.name}')
+        out.append(f"    {text.strip()}")
+    out.extend(traceback.format_exception_only(type(exc), exc))
+    return "\n".join(line.rstrip("\n") for line in out)
+
+
+def _worker_main(req_fd: int, res_fd: int, limits: Limits) -> None:
+    import resource
+    import signal
+
+    # Same globals the in-process runner gets (fused with local engine,
+    # mocked secrets, neutralised logout). Imported before the limits go on so
+    # the address-space cap only has to cover what blocks allocate.
+    sys.path.insert(0, str(ROOT))
+    import conftest
+
+    base_globals = conftest.pytest_markdown_docs_globals()
+
+    mem = limits.memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (mem, mem))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (limits.open_files, limits.open_files))
+
+    def on_sigxcpu(signum, frame):
+        raise CPULimitExceeded(
+            f"CPU-time limit of {limits.cpu_seconds}s exceeded (sandbox)"
+        )
+
+    signal.signal(signal.SIGXCPU, on_sigxcpu)
+
+    requests = os.fdopen(req_fd, "r")
+    results = os.fdopen(res_fd, "w", buffering=1)
+    for line in requests:
+        msg = json.loads(line)
+        source, filename = msg["source"], msg["filename"]
+        # Per-block CPU budget on top of what the worker has already used;
+        # the hard limit (+5s) SIGKILLs a block stuck in C code.
+        used = resource.getrusage(resource.RUSAGE_SELF)
+        spent = int(used.ru_utime + used.ru_stime) + 1
+        soft = spent + limits.cpu_seconds
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 5))
+
+        started = time.monotonic()
+        ok, error, fatal = True, "", False
+        try:
+            code = compile(source, filename, "exec", dont_inherit=True)
+            exec(code, {"__name__": "fence", **base_globals})
+        except (MemoryError, CPULimitExceeded) as e:
+            ok, error, fatal = False, _format_error(e, filename, source), True
+        except BaseException as e:  # noqa: BLE001 — report SystemExit etc. too
+            ok, error = False, _format_error(e, filename, source)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        reply = {
+            "ok": ok,
+            "error": error,
+            "seconds": time.monotonic() - started,
+            "fatal": fatal,
+        }
+        results.write(json.dumps(reply) + "\n")
+        if fatal:
+            break
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--worker":
+        limits = Limits(**json.loads(sys.argv[4]))
+        _worker_main(int(sys.argv[2]), int(sys.argv[3]), limits)
+    else:
+        print("doc_sandbox.py is started by conftest.py (--doc-sandbox).")
+        raise SystemExit(2)
@@ -0,0 +1,268 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["fused", "griffe ~= 2.3"]
+# ///
+#
+# Symbol-impact selection for Tier 2: after a fused upgrade, only re-run the
+# doc blocks that touch an API that actually changed.
+#
+# Two halves:
+#   - block_symbols(): AST analysis of one doc block → the fused symbols it
+#     references (`fused.udf`, `fused.h3.cell_to_parent`, `Udf.map`, ...).
+#     Aliased imports (`from fused import h3 as fh3`) are resolved, and names
+#     bound to a UDF (`@fused.udf` functions, `fused.load(...)` results) map
+#     their attribute access onto `Udf.<attr>`.
+#   - api_snapshot(): a griffe walk of the installed fused package → a hash per
+#     public symbol (signature + source). Diffing two snapshots gives the set
+#     of changed symbols.
+#
+# `uv run utils/run_doc_execution.py --impacted` ties them together: it diffs
+# the installed fused against the snapshot saved by the last green impacted
+# run, runs only the blocks whose symbols changed — plus every block of a doc
+# file that is new or edited since that run (doc_hashes()) — and saves the new
+# snapshot once they pass. Without a saved snapshot it runs everything. A plain
+# run (no --impacted) is always the full suite.
+#
+# Only direct changes to a public symbol are detected: its fingerprint covers
+# its own signature and source, not the private helpers or other functions it
+# calls. A behaviour change that lives entirely in such a callee changes no
+# fingerprint, so the blocks that would catch it are not selected. Run the full
+# suite (no --impacted) after upgrades that touch fused internals.
+#
+# Usage:
+#   uv run utils/doc_symbol_index.py        # list symbols changed since snapshot
+
+import ast
+import hashlib
+import json
+import sys
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DOCS_DIR = ROOT / "docs"
+SNAPSHOT_PATH = ROOT / ".cache" / "doc-tools" / "fused-api-snapshot.json"
+
+# Decorators / calls whose result is a UDF object.
+_UDF_FACTORIES = {"fused.udf", "fused.load", "fused.cache"}
+UDF_CLASS = "Udf"
+
+
+class _SymbolVisitor(ast.NodeVisitor):
+    def __init__(self) -> None:
+        self.aliases: dict[str, str] = {}  # local name -> dotted fused path
+        self.udf_names: set[str] = set()
+        self.symbols: set[str] = set()
+
+    # ── name binding ──
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for a in node.names:
+            if a.name == "fused" or a.name.startswith("fused."):
+                if a.asname:
+                    self.aliases[a.asname] = a.name
+                else:
+                    self.aliases["fused"] = "fused"
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        mod = node.module or ""
+        if node.level == 0 and (mod == "fused" or mod.startswith("fused.")):
+            for a in node.names:
+                path = f"{mod}.{a.name}"
+                self.aliases[a.asname or a.name] = path
+                self.symbols.add(path)
+
+    def _decorated(self, node) -> None:
+        for dec in node.decorator_list:
+            target = dec.func if isinstance(dec, ast.Call) else dec
+            if self._resolve(target) in _UDF_FACTORIES:
+                self.udf_names.add(node.name)
+        self.generic_visit(node)
+
+    visit_FunctionDef = _decorated
+    visit_AsyncFunctionDef = _decorated
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        value = node.value
+        is_call = isinstance(value, ast.Call)
+        if is_call and self._resolve(value.func) in _UDF_FACTORIES:
+            for t in node.targets:
+                if isinstance(t, ast.Name):
+                    self.udf_names.add(t.id)
+        self.generic_visit(node)
+
+    # ── references ──
+
+    def _resolve(self, node: ast.AST) -> str | None:
+        """Dotted fused path for a Name/Attribute chain, if it is one."""
+        parts: list[str] = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        if node.id in self.udf_names:
+            base = UDF_CLASS
+        elif node.id in self.aliases:
+            base = self.aliases[node.id]
+        else:
+            return None
+        return ".".join([base, *reversed(parts)])
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        path = self._resolve(node)
+        if path is not None:
+            self.symbols.add(path)
+            return  # the whole chain is recorded; don't re-add its prefixes
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if node.id in self.aliases and self.aliases[node.id] != "fused":
+            self.symbols.add(self.aliases[node.id])
+        elif node.id in self.udf_names and isinstance(node.ctx, ast.Load):
+            self.symbols.add(f"{UDF_CLASS}.__call__")
+
+
+def block_symbols(code: str) -> set[str]:
+    """Fused symbols referenced by a doc block (empty if it doesn't parse).
+
+    `fused` is assumed to be in scope even without an import — conftest.py
+    injects it into every block.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # e.g. invalid escapes in doc code
+            tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return set()
+    visitor = _SymbolVisitor()
+    visitor.aliases["fused"] = "fused"
+    # Two passes: UDF names bound later in the block (or in a nested scope)
+    # are still known when their attributes are visited.
+    visitor.visit(tree)
+    visitor.symbols.clear()
+    visitor.visit(tree)
+    return visitor.symbols
+
+
+def is_impacted(symbols: set[str], changed: set[str]) -> bool:
+    """True if any referenced symbol is, contains, or lives in a changed one.
+
+    `Udf.map` matches a change to `fused.models.Udf.map` (the class is
+    referenced by short name), and a reference to a module such as `fused.h3`
+    matches a change anywhere under it.
+    """
+    for sym in symbols:
+        for c in changed:
+            if sym == c or sym.startswith(c + ".") or c.startswith(sym + "."):
+                return True
+            if sym.startswith(UDF_CLASS + ".") and (
+                c.endswith("." + sym) or c.endswith("." + UDF_CLASS)
+            ):
+                return True
+    return False
+
+
+# ── API snapshot (griffe) ──────────────────────────────────────────────────────
+
+
+def _fingerprint(obj) -> str:
+    """Hash of the symbol's own signature and source (not its callees')."""
+    parts = [obj.kind.value]
+    for attr in ("parameters", "returns", "value", "bases"):
+        v = getattr(obj, attr, None)
+        if v is not None:
+            parts.append(str(v))
+    try:
+        parts.append(obj.source)
+    except Exception:  # noqa: BLE001 — builtins / compiled members have none
+        pass
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+
+def api_snapshot() -> dict:
+    """{"version": ..., "symbols": {public dotted path: fingerprint}}."""
+    import fused
+    import griffe
+
+    root = griffe.load("fused", docstring_parser="google")
+    symbols: dict[str, str] = {}
+    seen: set[str] = set()
+
+    def walk(obj, public_path: str) -> None:
+        try:
+            target = obj.final_target if obj.is_alias else obj
+            kind = target.kind.value
+        except Exception:  # noqa: BLE001 — unresolvable alias (external pkg)
+            return
+        if not target.path.startswith("fused"):
+            return
+        if kind in ("module", "class"):
+            symbols[public_path] = kind
+            if target.path in seen:
+                return
+            seen.add(target.path)
+            for name, member in target.members.items():
+                if not name.startswith("_") or name == "__call__":
+                    walk(member, f"{public_path}.{name}")
+        else:
+            symbols[public_path] = _fingerprint(target)
+
+    walk(root, "fused")
+    return {"version": fused.__version__, "symbols": symbols}
+
+
+def changed_symbols(old: dict, new: dict) -> set[str]:
+    a, b = old.get("symbols", {}), new.get("symbols", {})
+    return {k for k in a.keys() | b.keys() if a.get(k) != b.get(k)}
+
+
+def doc_hashes(docs_dir: Path = DOCS_DIR) -> dict[str, str]:
+    """{repo-relative doc path: content hash}, stored in the snapshot."""
+    return {
+        p.relative_to(ROOT).as_posix(): hashlib.sha256(p.read_bytes()).hexdigest()[:16]
+        for p in sorted(docs_dir.rglob("*.md*"))
+        if p.suffix in {".md", ".mdx"}
+    }
+
+
+def changed_docs(old: dict, new: dict) -> set[str]:
+    """Doc files that are new or edited since `old` was saved."""
+    a, b = old.get("docs", {}), new.get("docs", {})
+    return {k for k in b if a.get(k) != b[k]}
+
+
+def load_snapshot(path: Path = SNAPSHOT_PATH) -> dict | None:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def save_snapshot(snapshot: dict, path: Path = SNAPSHOT_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(snapshot, sort_keys=True))
+
+
+def main() -> int:
+    old = load_snapshot()
+    new = api_snapshot()
+    if old is None:
+        print(
+            f"No saved snapshot at {SNAPSHOT_PATH.relative_to(ROOT)}; saving one "
+            f"for fused v{new['version']}."
+        )
+        save_snapshot(new)
+        return 0
+    changed = sorted(changed_symbols(old, new))
+    print(
+        f"fused v{old['version']} → v{new['version']}: "
+        f"{len(changed)} changed symbol(s)"
+    )
+    for name in changed:
+        print(f"  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+# Shared, cached parse of the docs/ MDX corpus.
+#
+# Every docs tool used to re-read and re-scan the same files with its own
+# regexes. This module parses each .mdx/.md file once into a plain-dict record:
+#
+#   front_matter  {key: value} from the leading `---` block
+#   body_line     1-based line where the body (after front matter) starts
+#   headings      [{level, text, slug, line}]  — outside code fences only;
+#                 slugs follow Docusaurus (`{#custom-id}` wins, duplicates
+#                 get -1, -2, ...)
+#   fences        [{info, lang, indent, line, code}]  — `line` is the opening
+#                 fence line; `code` is the raw body, same as Tier 1 extracts
+#   links         [{text, url, line}]  — Markdown links and JSX href/to attrs
+#   imports       [{source, names, line}]  — MDX `import ... from "..."`
+#   components    sorted JSX component names used (<Tabs>, <LinkButtons>, ...)
+#
+# Records are kept in .cache/doc-tools/docs-corpus.json. A file is re-parsed
+# only when its mtime/size changed *and* its content hash differs, so a fresh
+# checkout (new mtimes, same content) still hits the cache.
+#
+# Usage (stdlib only, so any uv script can import it):
+#   from docs_corpus import load_corpus
+#   corpus = load_corpus()                  # {Path: record} for all of docs/
+#   corpus = load_corpus([Path("docs/faq.mdx")])
+
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DOCS_DIR = ROOT / "docs"
+CACHE_PATH = ROOT / ".cache" / "doc-tools" / "docs-corpus.json"
+
+# Bump when the record format or parsing rules change.
+CORPUS_VERSION = 1
+
+_FENCE_OPEN = re.compile(r"^(?P<indent>[ \t]*)(?P<marker>`{3,}|~{3,})(?P<info>[^\n]*)$")
+_HEADING = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t]*#*[ \t]*$")
+_CUSTOM_ID = re.compile(r"\s*\{#([^}]+)\}\s*$")
+_LINK = re.compile(r"(?<!!)\[([^\]\n]*)\]\(([^)\s]+)(?:\s+\"[^\"]*\")?\)")
+_JSX_LINK = re.compile(r"""\b(?:href|to)=["']([^"']+)["']""")
+_IMPORT = re.compile(
+    r"""^import\s+(?:(?P<names>.+?)\s+from\s+)?["'](?P<source>[^"']+)["'];?\s*$"""
+)
+_COMPONENT = re.compile(r"<([A-Z][\w.]*)")
+_INLINE_CODE = re.compile(r"`[^`\n]*`")
+
+
+# ── Parsing ────────────────────────────────────────────────────────────────────
+
+
+def _scalar(value: str):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    if re.fullmatch(r"-?\d+", value):
+        return int(value)
+    if value.startswith("[") and value.endswith("]"):
+        return [_scalar(v) for v in value[1:-1].split(",") if v.strip()]
+    return value
+
+
+def parse_front_matter(lines: list[str]) -> tuple[dict, int]:
+    """Parse a leading `---` block of simple `key: value` pairs.
+
+    Handles the subset the docs use: scalars, inline `[a, b]` lists, `- item`
+    lists and folded/literal (`>` / `|`) or indented continuation values.
+    Returns (front_matter, index of the first body line).
+    """
+    if not lines or lines[0].strip() != "---":
+        return {}, 0
+    try:
+        end = next(i for i in range(1, len(lines)) if lines[i].strip() == "---")
+    except StopIteration:
+        return {}, 0
+    data: dict = {}
+    key = None
+    for raw in lines[1:end]:
+        if not raw.strip() or raw.lstrip().startswith("#"):
+            continue
+        m = re.match(r"^([A-Za-z_][\w-]*):(.*)$", raw)
+        if m and not raw[0].isspace():
+            key, value = m.group(1), m.group(2).strip()
+            data[key] = "" if value in (">", "|", ">-", "|-") else _scalar(value)
+        elif key is not None:
+            item = raw.strip()
+            if item.startswith("- "):
+                prev = data.get(key)
+                data[key] = (prev if isinstance(prev, list) else []) + [
+                    _scalar(item[2:])
+                ]
+            else:
+                prev = data.get(key)
+                data[key] = f"{prev} {item}".strip() if prev else item
+    return data, end + 1
+
+
+def slugify(text: str) -> str:
+    """Docusaurus/github-slugger style anchor for a heading's text."""
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)  # links -> label
+    text = re.sub(r"<[^>]+>", "", text)  # inline JSX/HTML tags
+    text = text.lower().replace("`", "")
+    text = re.sub(r"[^\w\- ]", "", text)
+    return text.replace(" ", "-")
+
+
+def parse(text: str) -> dict:
+    """Parse one MDX/Markdown document into a corpus record."""
+    lines = text.split("\n")
+    front_matter, body_start = parse_front_matter(lines)
+    record: dict = {
+        "front_matter": front_matter,
+        "body_line": body_start + 1,
+        "headings": [],
+        "fences": [],
+        "links": [],
+        "imports": [],
+        "components": [],
+    }
+    components: set[str] = set()
+    slug_counts: dict[str, int] = {}
+    i = body_start
+    while i < len(lines):
+        line = lines[i]
+        lineno = i + 1
+        fence = _FENCE_OPEN.match(line)
+        if fence:
+            # Close on the first later line that starts with the same indent +
+            # marker — exactly how Tier 1 has always paired python fences.
+            close = fence.group("indent") + fence.group("marker")
+            j = i + 1
+            while j < len(lines) and not lines[j].startswith(close):
+                j += 1
+            info = fence.group("info").strip()
+            code = "\n".join(lines[i + 1 : j])
+            record["fences"].append(
+                {
+                    "info": info,
+                    "lang": re.match(r"[^\s{]*", info).group(0),
+                    "indent": fence.group("indent"),
+                    "line": lineno,
+                    "code": code + "\n" if j > i + 1 else "",
+                }
+            )
+            i = j + 1
+            continue
+
+        heading = _HEADING.match(line)
+        if heading:
+            title = heading.group(2)
+            custom = _CUSTOM_ID.search(title)
+            if custom:
+                title = title[: custom.start()]
+                slug = custom.group(1)
+            else:
+                base = slugify(title)
+                n = slug_counts.get(base, 0)
+                slug = base if n == 0 else f"{base}-{n}"
+                slug_counts[base] = n + 1
+            record["headings"].append(
+                {
+                    "level": len(heading.group(1)),
+                    "text": title.strip(),
+                    "slug": slug,
+                    "line": lineno,
+                }
+            )
+
+        imp = _IMPORT.match(line)
+        if imp:
+            names = imp.group("names") or ""
+            record["imports"].append(
+                {
+                    "source": imp.group("source"),
+                    "names": [n for n in re.split(r"[\s,{}]+", names) if n],
+                    "line": lineno,
+                }
+            )
+            i += 1
+            continue
+
+        prose = _INLINE_CODE.sub("", line)
+        for m in _LINK.finditer(prose):
+            record["links"].append(
+                {"text": m.group(1), "url": m.group(2), "line": lineno}
+            )
+        for m in _JSX_LINK.finditer(prose):
+            record["links"].append({"text": "", "url": m.group(1), "line": lineno})
+        components.update(_COMPONENT.findall(prose))
+        i += 1
+
+    record["components"] = sorted(components)
+    return record
+
+
+# ── Cache ──────────────────────────────────────────────────────────────────────
+
+
+def discover(root: Path = DOCS_DIR) -> list[Path]:
+    """All .mdx/.md files under `root`, sorted."""
+    return sorted(p for ext in ("*.mdx", "*.md") for p in root.rglob(ext))
+
+
+def _key(path: Path) -> str:
+    resolved = path.resolve()
+    return (
+        resolved.relative_to(ROOT).as_posix()
+        if resolved.is_relative_to(ROOT)
+        else resolved.as_posix()
+    )
+
+
+def _load_cache(path: Path) -> dict:
+    try:
+        cache = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CORPUS_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def load_corpus(
+    paths: Iterable[Path] | None = None,
+    *,
+    cache_path: Path | None = CACHE_PATH,
+) -> dict[Path, dict]:
+    """Return {path: record} for `paths` (default: every file under docs/).
+
+    Unreadable files are reported on stderr and left out. Pass
+    `cache_path=None` to parse from scratch without touching the cache.
+    """
+    files = discover() if paths is None else list(paths)
+    cached = _load_cache(cache_path) if cache_path else {}
+    dirty = False
+    out: dict[Path, dict] = {}
+    for path in files:
+        key = _key(path)
+        try:
+            st = path.stat()
+        except OSError as e:
+            print(f"WARNING: cannot stat {key}: {e}", file=sys.stderr)
+            continue
+        entry = cached.get(key)
+        if entry and (entry["mtime_ns"], entry["size"]) == (st.st_mtime_ns, st.st_size):
+            out[path] = entry["record"]
+            continue
+        try:
+            data = path.read_bytes()
+            text = data.decode("utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"WARNING: could not read {key}: {e}", file=sys.stderr)
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry["sha256"] == digest:
+            record = entry["record"]
+        else:
+            record = parse(text)
+        cached[key] = {
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha256": digest,
+            "record": record,
+        }
+        dirty = True
+        out[path] = record
+    if cache_path and dirty:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # A unique temp file: several hook processes may save at once.
+        fd, tmp = tempfile.mkstemp(
+            dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": CORPUS_VERSION, "files": cached}, f)
+            os.replace(tmp, cache_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return out
+
+
+def load_record(path: Path) -> dict:
+    """Record for a single file (raises OSError if it can't be read)."""
+    record = load_corpus([path]).get(path)
+    if record is None:
+        raise OSError(f"could not read {path}")
+    return record
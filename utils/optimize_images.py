@@ -0,0 +1,416 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["pillow >= 11.3"]
+# ///
+#
+# Shrink the screenshots and figures under static/ and blog/.
+#
+# For every PNG, JPEG and GIF:
+#
+#   - PNG and JPEG are recompressed in place. PNGs are re-encoded losslessly
+#     with maximum deflate effort (and stored as a palette image when they use
+#     at most 256 colours), keeping their colour (gAMA, cHRM, sRGB, ICC),
+#     resolution, EXIF and text/XMP chunks. JPEGs are decoded and re-encoded
+#     with their own quantisation tables (`quality="keep"`), optimised Huffman
+#     tables and progressive scan, keeping EXIF, ICC, DPI, XMP and comments;
+#     that is close to the original but not bit-exact. The original is kept
+#     whenever the result is not smaller.
+#   - `<name>.webp` and `<name>.avif` siblings are written next to the file
+#     (e.g. `shot.png.webp`), each only if it is smaller than the original.
+#     WebP is lossless for PNG/GIF and quality 85 for JPEG; AVIF is quality 60
+#     (near-lossless for screenshots). Animated GIFs get an animated WebP only.
+#   - Downscaled WebP variants `<name>-<width>w.webp` (e.g. `shot.png-480w.webp`,
+#     so `shot.png` and `shot.jpg` do not share variants) for every width in
+#     --widths narrower than the image, for use in `srcset`.
+#
+# Processed files are recorded in .cache/doc-tools/images.json with the hash
+# of the (optimised) file and the outputs written for it, so a rerun only
+# touches new or changed images. A before/after byte report is printed at the
+# end.
+#
+# Usage:
+#   uv run utils/optimize_images.py                 # static/ and blog/
+#   uv run utils/optimize_images.py --dry-run       # report only, write nothing
+#   uv run utils/optimize_images.py static/img -j 8 --no-avif
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import struct
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DIRS = (ROOT / "static", ROOT / "blog")
+MANIFEST_PATH = ROOT / ".cache" / "doc-tools" / "images.json"
+
+# Bump when the encoder settings or output names change, so every image is
+# processed again.
+PIPELINE_VERSION = 2
+
+SOURCE_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif"}
+DEFAULT_WIDTHS = (480, 960)
+_VARIANT = re.compile(r"-\d+w\.webp$")
+
+
+class Settings(NamedTuple):
+    widths: tuple[int, ...] = DEFAULT_WIDTHS
+    avif: bool = True
+    dry_run: bool = False
+
+
+class Result(NamedTuple):
+    key: str  # path relative to ROOT
+    before: int  # bytes of the source before optimising
+    after: int  # bytes of the source after optimising
+    outputs: dict[str, int]  # sibling/variant path -> bytes
+    sha256: str  # of the optimised source
+    error: str = ""
+
+
+# ── Encoding ───────────────────────────────────────────────────────────────────
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _encode(image, **params) -> bytes:
+    out = io.BytesIO()
+    image.save(out, **params)
+    return out.getvalue()
+
+
+# Ancillary PNG chunks copied verbatim into a re-encoded PNG. Pillow writes the
+# ICC profile, resolution and EXIF itself (see `recompress`); chunks whose
+# meaning depends on the bit depth or colour type (sBIT, bKGD, ...) are dropped.
+_PNG_KEPT_CHUNKS = {b"gAMA", b"cHRM", b"sRGB", b"cICP", b"tIME"}
+_PNG_TEXT_CHUNKS = {b"tEXt", b"zTXt", b"iTXt"}
+
+
+def _png_chunks(data: bytes):
+    """(type, payload) of every chunk of a PNG file."""
+    pos = 8  # signature
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos : pos + 8])
+        yield kind, data[pos + 8 : pos + 8 + length]
+        pos += 12 + length
+
+
+def _png_metadata(data: bytes, info: dict) -> dict:
+    """`save()` params that carry a PNG's colour and metadata chunks over."""
+    from PIL.PngImagePlugin import PngInfo
+
+    pnginfo = PngInfo()
+    for kind, payload in _png_chunks(data):
+        if kind in _PNG_KEPT_CHUNKS or kind in _PNG_TEXT_CHUNKS:
+            pnginfo.add(kind, payload)
+    params = {"pnginfo": pnginfo}
+    for key in ("icc_profile", "dpi", "exif"):
+        if info.get(key):
+            params[key] = info[key]
+    return params
+
+
+def recompress(data: bytes, suffix: str) -> bytes:
+    """Smaller re-encode of a PNG/JPEG with its metadata; else the input.
+
+    PNG re-encodes are lossless; JPEG ones decode and re-encode with the same
+    quantisation tables.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        if suffix == ".png":
+            meta = _png_metadata(data, image.info)
+            candidates = [_encode(image, format="PNG", optimize=True, **meta)]
+            if image.mode in ("RGB", "RGBA") and image.getcolors(256) is not None:
+                # Exactly representable as a palette image: same pixels, 1/3 to
+                # 1/4 of the raw size before deflate.
+                palette = image.quantize(
+                    colors=256,
+                    method=(
+                        Image.Quantize.FASTOCTREE
+                        if image.mode == "RGBA"
+                        else Image.Quantize.MEDIANCUT
+                    ),
+                    dither=Image.Dither.NONE,
+                )
+                if palette.convert(image.mode).tobytes() == image.tobytes():
+                    candidates.append(
+                        _encode(palette, format="PNG", optimize=True, **meta)
+                    )
+        elif suffix in (".jpg", ".jpeg"):
+            params = {"format": "JPEG", "quality": "keep", "optimize": True}
+            params["progressive"] = True
+            for key in ("exif", "icc_profile", "dpi", "xmp", "comment"):
+                if image.info.get(key):
+                    params[key] = image.info[key]
+            candidates = [_encode(image, **params)]
+        else:
+            return data
+    best = min(candidates, key=len)
+    return best if len(best) < len(data) else data
+
+
+def siblings(data: bytes, suffix: str, settings: Settings) -> dict[str, bytes]:
+    """Modern-format siblings and width variants, keyed by output suffix.
+
+    Keys are `.webp` / `.avif` for the full-size siblings and `-<w>w.webp` for
+    the variants. Full-size siblings that are not smaller than `data` are left
+    out.
+    """
+    from PIL import Image
+
+    out: dict[str, bytes] = {}
+    with Image.open(io.BytesIO(data)) as image:
+        animated = getattr(image, "n_frames", 1) > 1
+        lossless = suffix != ".jpg" and suffix != ".jpeg"
+        if animated:
+            webp = _encode(image, format="WEBP", save_all=True, lossless=True, method=6)
+        else:
+            webp = _encode(
+                image, format="WEBP", lossless=lossless, quality=85, method=6
+            )
+        if len(webp) < len(data):
+            out[".webp"] = webp
+        if settings.avif and not animated:
+            avif = _encode(image, format="AVIF", quality=60, speed=6)
+            if len(avif) < len(data):
+                out[".avif"] = avif
+        if animated:
+            return out
+        if image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        width, height = image.size
+        for target in settings.widths:
+            if target >= width:
+                continue
+            size = (target, max(1, round(height * target / width)))
+            resized = image.resize(size, Image.Resampling.LANCZOS)
+            out[f"-{target}w.webp"] = _encode(
+                resized, format="WEBP", quality=82, method=6
+            )
+    return out
+
+
+def output_path(path: Path, key: str) -> Path:
+    # The source's own suffix stays in the name: `shot.png` and `shot.jpg` in one
+    # folder must not overwrite each other's outputs.
+    return path.with_name(f"{path.name}{key}")
+
+
+def _write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def process(path: Path, settings: Settings) -> Result:
+    key = path.relative_to(ROOT).as_posix()
+    try:
+        data = path.read_bytes()
+        suffix = path.suffix.lower()
+        optimised = recompress(data, suffix)
+        outputs = siblings(optimised, suffix, settings)
+        if not settings.dry_run:
+            if optimised is not data:
+                _write(path, optimised)
+            for out_key, out_data in outputs.items():
+                _write(output_path(path, out_key), out_data)
+    except Exception as e:  # noqa: BLE001 — one bad image must not stop the run
+        return Result(key, 0, 0, {}, "", f"{type(e).__name__}: {e}")
+    return Result(
+        key,
+        len(data),
+        len(optimised),
+        {
+            output_path(path, k).relative_to(ROOT).as_posix(): len(v)
+            for k, v in outputs.items()
+        },
+        _sha256(optimised),
+    )
+
+
+# ── Manifest ───────────────────────────────────────────────────────────────────
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict:
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != PIPELINE_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+
+def save_manifest(files: dict, path: Path = MANIFEST_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A unique temp file, so concurrent runs never write through the same one.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": PIPELINE_VERSION, "files": files}, f, sort_keys=True)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def is_current(path: Path, entry: dict | None, settings: Settings) -> bool:
+    """True if `path` is unchanged since it was processed with these settings."""
+    if not entry or entry.get("settings") != _settings_key(settings):
+        return False
+    if not all((ROOT / out).exists() for out in entry["outputs"]):
+        return False
+    st = path.stat()
+    if (entry["mtime_ns"], entry["size"]) == (st.st_mtime_ns, st.st_size):
+        return True
+    # Touched but not changed (fresh checkout, copy): compare content.
+    return entry["size"] == st.st_size and entry["sha256"] == _sha256(path.read_bytes())
+
+
+def _settings_key(settings: Settings) -> dict:
+    return {"widths": list(settings.widths), "avif": settings.avif}
+
+
+# ── Discovery and report ───────────────────────────────────────────────────────
+
+
+def discover(roots: list[Path]) -> list[Path]:
+    """Source images under `roots` (this tool's outputs are never sources).
+
+    Paths are resolved; images that resolve outside the repository (through a
+    symlink, or given on the command line) are skipped with a warning, since
+    the manifest is keyed by repository-relative path.
+    """
+    found = set()
+    for root in roots:
+        candidates = [root] if root.is_file() else root.rglob("*")
+        for path in candidates:
+            if (
+                path.suffix.lower() in SOURCE_SUFFIXES
+                and path.is_file()
+                and not path.name.startswith(".")
+            ):
+                resolved = path.resolve()
+                if not resolved.is_relative_to(ROOT):
+                    print(f"WARNING: skipping {path}: outside {ROOT}", file=sys.stderr)
+                    continue
+                found.add(resolved)
+    return sorted(found)
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1e6:,.1f} MB"
+
+
+def report(results: list[Result], skipped: int) -> None:
+    done = [r for r in results if not r.error]
+    before = sum(r.before for r in done)
+    after = sum(r.after for r in done)
+    by_kind: dict[str, int] = {}
+    for r in done:
+        for out, size in r.outputs.items():
+            kind = "variants" if _VARIANT.search(out) else out[-4:]
+            by_kind[kind] = by_kind.get(kind, 0) + size
+    saved = before - after
+    pct = 100 * saved / before if before else 0.0
+    print(f"Processed {len(done)} image(s), {skipped} unchanged since last run.")
+    if not done:
+        return
+    print(f"  originals      {_mb(before)} → {_mb(after)} (-{_mb(saved)}, -{pct:.1f}%)")
+    for kind, label in (("webp", "WebP siblings"), ("avif", "AVIF siblings")):
+        if kind in by_kind:
+            share = 100 * by_kind[kind] / after if after else 0.0
+            print(f"  {label:<14} {_mb(by_kind[kind])} ({share:.0f}% of originals)")
+    if "variants" in by_kind:
+        print(f"  {'width variants':<14} {_mb(by_kind['variants'])}")
+    top = sorted(done, key=lambda r: r.before - r.after, reverse=True)[:5]
+    if top and top[0].before > top[0].after:
+        print("  largest savings:")
+        for r in top:
+            if r.before > r.after:
+                print(f"    {r.key}: {_mb(r.before)} → {_mb(r.after)}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Recompress images under static/ and blog/ and write WebP/AVIF "
+        "siblings and size variants.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="Files or folders to process (default: static/ and blog/).",
+    )
+    parser.add_argument(
+        "--widths",
+        type=lambda v: tuple(sorted(int(w) for w in v.split(",") if w.strip())),
+        default=DEFAULT_WIDTHS,
+        help="Comma separated widths of the WebP size variants (default: 480,960).",
+    )
+    parser.add_argument("--no-avif", action="store_true", help="Skip AVIF siblings.")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what would be saved without writing anything.",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Ignore the manifest and redo all."
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--manifest", type=Path, default=MANIFEST_PATH)
+    args = parser.parse_args(argv)
+
+    settings = Settings(args.widths, not args.no_avif, args.dry_run)
+    if settings.avif:
+        from PIL import features
+
+        if not features.check("avif"):
+            parser.error("this Pillow has no AVIF support; pass --no-avif")
+
+    roots = list(args.paths) or list(DEFAULT_DIRS)
+    manifest = {} if args.force else load_manifest(args.manifest)
+    todo, skipped = [], 0
+    for path in discover(roots):
+        key = path.relative_to(ROOT).as_posix()
+        if is_current(path, manifest.get(key), settings):
+            skipped += 1
+        else:
+            todo.append(path)
+
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        results = list(pool.map(process, todo, [settings] * len(todo), chunksize=4))
+
+    if not settings.dry_run:
+        for r in results:
+            if r.error:
+                continue
+            st = (ROOT / r.key).stat()
+            manifest[r.key] = {
+                "sha256": r.sha256,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "outputs": sorted(r.outputs),
+                "settings": _settings_key(settings),
+            }
+        if results:
+            save_manifest(manifest, args.manifest)
+    report(results, skipped)
+    for r in results:
+        if r.error:
+            print(f"  FAILED {r.key}: {r.error}", file=sys.stderr)
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 # /// script
 # requires-python = ">=3.11"
-# dependencies = ["pytest", "pytest-markdown-docs", "fused[all]"]
+# dependencies = ["pytest", "pytest-markdown-docs", "fused[all]", "griffe ~= 2.3"]
 # ///
 #
 # Tier 2: execute the runnable Python blocks in the docs via
@@ -18,10 +18,25 @@
 #
 # Skip a single block explicitly by putting "# doctest: skip" on its first line
 # (same convention as Tier 1).
+#
+# Pass --fixtures to also run blocks that only read data, against the tiny
+# sample files in utils/fixtures/ (see utils/doc_fixtures.py), and
+# --explain-skips to list why each auto-skipped block was skipped. --sandbox
+# runs blocks in a resource-limited subprocess (see utils/doc_sandbox.py).
+# --impacted only runs blocks that reference a fused symbol that changed since
+# the last green --impacted run, plus every block of a doc file that is new or
+# edited since then (see utils/doc_symbol_index.py). Only direct changes to
+# public symbols count: a change confined to a private helper or callee selects
+# nothing, so run the full suite after upgrades that touch fused internals. An
+# --impacted run scoped to some doc files only marks those files as green.
 
+import json
 import sys
+import tempfile
 from pathlib import Path
 
+from docs_corpus import load_corpus
+
 ROOT = Path(__file__).resolve().parent.parent
 DOCS_DIR = ROOT / "docs"
 CREDENTIALS = Path.home() / ".fused" / "credentials"
@@ -51,11 +66,43 @@ def _select(argv: list[str]) -> list[Path]:
         if rel in IGNORE_FILES or rel.startswith(IGNORE_PREFIXES):
             continue
         out.append(p)
-    return out
+    # A changed file with no python fences has nothing to execute; dropping it
+    # here saves starting pytest (and importing fused) at all.
+    corpus = load_corpus(out)
+    return [
+        p
+        for p in out
+        if any(f["lang"] == "python" for f in corpus.get(p, {}).get("fences", ()))
+    ]
+
+
+def _green_snapshot(
+    baseline: dict | None, current: dict, hashes: dict[str, str], targets: list[Path]
+) -> dict:
+    """The snapshot to save after a green --impacted run over `targets`.
+
+    A run over all of docs/ saves `current` with every doc hash. A run scoped
+    to some files only vouches for those: they take their current hash, every
+    other doc keeps the baseline's (or none, so it runs in full next time), and
+    the baseline's fused version and symbols are kept, so blocks elsewhere that
+    use a changed symbol are still selected by the next run.
+    """
+    if targets == [DOCS_DIR]:
+        return current | {"docs": hashes}
+    ran = {
+        p.resolve().relative_to(ROOT).as_posix()
+        for p in targets
+        if p.resolve().is_relative_to(ROOT)
+    } & hashes.keys()
+    if baseline is None:
+        return current | {"docs": {k: hashes[k] for k in ran}}
+    docs = {k: v for k, v in baseline.get("docs", {}).items() if k not in ran}
+    return baseline | {"docs": docs | {k: hashes[k] for k in ran}}
 
 
 def main(argv: list[str]) -> int:
-    targets = _select(argv)
+    fixtures = "--fixtures" in argv
+    targets = _select([a for a in argv if not a.startswith("--")])
     if not targets:
         print("Tier 2: no changed runnable docs to execute.")
         return 0
@@ -72,6 +119,12 @@ def main(argv: list[str]) -> int:
     import pytest
 
     args = ["--markdown-docs", "-q", "--tb=short"]
+    if fixtures:
+        args.append("--doc-fixtures")
+    if "--explain-skips" in argv:
+        args.append("--explain-skips")
+    if "--sandbox" in argv:
+        args.append("--doc-sandbox")
     if targets == [DOCS_DIR]:
         args += [
             "--ignore=docs/python-sdk/api-reference",
@@ -80,10 +133,41 @@ def main(argv: list[str]) -> int:
         ]
     args += [str(t) for t in targets]
 
+    snapshot = None
+    if "--impacted" in argv:
+        from doc_symbol_index import (
+            api_snapshot,
+            changed_docs,
+            changed_symbols,
+            doc_hashes,
+            load_snapshot,
+        )
+
+        baseline, current, hashes = load_snapshot(), api_snapshot(), doc_hashes()
+        snapshot = _green_snapshot(baseline, current, hashes, targets)
+        if baseline is None:
+            print("Tier 2: no saved fused API snapshot — running every block.")
+        else:
+            changed = changed_symbols(baseline, current)
+            edited = changed_docs(baseline, {"docs": hashes})
+            print(
+                f"Tier 2: fused v{baseline['version']} → v{current['version']}, "
+                f"{len(changed)} changed symbol(s), {len(edited)} new or edited "
+                "doc file(s); running affected blocks only."
+            )
+            with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+                json.dump({"symbols": sorted(changed), "files": sorted(edited)}, f)
+            args.append(f"--doc-impacted={f.name}")
+
     code = int(pytest.main(args))
     # Exit code 5 = "no tests collected" (a changed file had no runnable
     # blocks) — that's a pass, not a failure.
-    return 0 if code == 5 else code
+    code = 0 if code == 5 else code
+    if snapshot is not None and code == 0:
+        from doc_symbol_index import save_snapshot
+
+        save_snapshot(snapshot)
+    return code
 
 
 if __name__ == "__main__":
@@ -21,6 +21,7 @@ from pathlib import Path
 import griffe
 import fused
 import fused.api as _fused_api
+from docs_corpus import load_record
 
 ROOT = Path(__file__).parent / ".."
 
@@ -183,6 +184,7 @@ def check_in_package(mod_obj, name: str, context: str) -> bool:
 
 
 _missing_mdx_reported: set[Path] = set()
+_mdx_headings: dict[Path, set[tuple[int, str]]] = {}
 
 
 def check_in_mdx(mdx_path: Path, heading: str, context: str, level: int = 2) -> bool:
@@ -197,9 +199,14 @@ def check_in_mdx(mdx_path: Path, heading: str, context: str, level: int = 2) ->
             )
             _missing_mdx_reported.add(mdx_path)
         return False
-    content = mdx_path.read_text(encoding="utf-8")
+    if mdx_path not in _mdx_headings:
+        _mdx_headings[mdx_path] = {
+            (h["level"], h["text"].strip("`"))
+            for h in load_record(mdx_path)["headings"]
+        }
+    headings = _mdx_headings[mdx_path]
     marker = f"{'#' * level} {heading}"
-    if marker not in content:
+    if (level, heading) not in headings:
         failures.append(
             f"[NOT IN DOCS] {context}"
             f" — heading '{marker}' missing in {mdx_path.name}"
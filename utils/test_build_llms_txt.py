@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Check that build_llms_txt.py strips JSX from page text.
+
+Builds a Page from a small MDX file whose markup spans several lines (a
+YouTube `<iframe>` with a `style={{...}}` block, a self-closing `<img>`, a
+multi-line `{...}` expression) and checks that none of it reaches the cleaned
+text or the curated description, while prose, tab contents, inline code and
+code fences come through unchanged. Then checks that dedupe never turns a
+paragraph that is only markup or only a URL into a shared snippet.
+
+Usage:
+    python utils/test_build_llms_txt.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from build_llms_txt import DEDUPE_MIN_PAGES, Page, clean_page, dedupe
+from docs_corpus import load_corpus
+
+PAGE = """\
+---
+title: Tokens & endpoints
+---
+
+import Tabs from '@theme/Tabs';
+
+<iframe
+    style={{
+        width: "100%",
+        aspectRatio: "16/9",
+    }}
+    src="https://www.youtube.com/embed/4R6b52KliTw"
+    title="YouTube video player"
+    allowFullScreen
+></iframe>
+
+<img
+  src="/img/caching.png"
+  alt="Efficient Caching diagram"
+  style={{maxWidth: 600}}
+/>
+
+Share a UDF through a token to call it from anywhere over HTTPS.
+
+<Tabs>
+  <TabItem value="python" label="Python">
+Call `fused.run("fc_<token>")` with `{"x": 1}` as parameters.
+  </TabItem>
+</Tabs>
+
+{items.map((item) => (
+  <li key={item}>{item}</li>
+))}
+
+```jsx
+<iframe src="https://example.com" style={{border: 0}} />
+```
+"""
+
+LEAKS = ("<iframe", "<img", "style=", "src=", "allowFullScreen", "/>", "<Tab", "map(")
+
+# Repeated on every page: only the prose paragraph may become a shared snippet.
+MARKUP = (
+    '<iframe style={{width: "100%", aspectRatio: "16/9", height: "auto"}}\n'
+    '    src="https://www.youtube.com/embed/_WBYBMIraIE" title="YouTube video player"\n'
+    '    frameBorder="0" allow="accelerometer; autoplay; clipboard-write" allowFullScreen>'
+)
+URL = (
+    "https://github.com/fusedio/udfs/tree/main/public/Overture_Maps_Example/"
+    "overture_maps_example_with_a_long_path_and_query?ref=docs&utm_source=llms"
+)
+PROSE = (
+    "Map Builder is deprecated and hidden by default. You can re-enable it under "
+    "Workbench Preferences, Deprecated features, Enable map view. For new work, "
+    "use the Fused Map widget instead."
+)
+
+
+def check_dedupe() -> list[str]:
+    texts = [
+        f"# Page {n}\n\n{MARKUP}\n\n{URL}\n\n{PROSE}\n\nPage {n} text."
+        for n in range(DEDUPE_MIN_PAGES + 1)
+    ]
+    _, snippets = dedupe(texts)
+    if [text for text, _ in snippets] != [PROSE]:
+        return [f"shared snippets are {[text[:40] for text, _ in snippets]}"]
+    return []
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tokens-endpoints.mdx"
+        path.write_text(PAGE)
+        record = load_corpus([path], cache_path=None)[path]
+        page = Page(path, "guide/tokens-endpoints.mdx", record, PAGE)
+        text = clean_page(page)
+        description = page.description
+
+    prose, _, fence = text.partition("```jsx")
+    errors = [f"leaked {leak!r} into the page text" for leak in LEAKS if leak in prose]
+    for kept in (
+        "Share a UDF through a token",
+        'Call `fused.run("fc_<token>")` with `{"x": 1}` as parameters.',
+    ):
+        if kept not in prose:
+            errors.append(f"lost {kept!r} from the page text")
+    if '<iframe src="https://example.com" style={{border: 0}} />' not in fence:
+        errors.append("changed the code fence")
+    if not description.startswith("Share a UDF through a token"):
+        errors.append(f"description is {description!r}")
+    errors += check_dedupe()
+
+    if errors:
+        print("FAILED:")
+        for error in errors:
+            print(f"  {error}")
+        print(f"\nCleaned text:\n{text}")
+        return 1
+    print(
+        "PASSED — multi-line JSX stripped from page text and description, "
+        "no markup or URL-only shared snippets"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,11 +15,12 @@
 #   uv run utils/test_doc_snippets.py docs/guide/foo.mdx   # specific files
 
 import ast
-import re
 import sys
 import textwrap
 from pathlib import Path
 
+from docs_corpus import load_corpus
+
 ROOT = Path(__file__).resolve().parent.parent
 DOCS_DIR = ROOT / "docs"
 
@@ -32,16 +33,6 @@ SKIP_FILES = frozenset([
     ROOT / "docs" / "python-sdk" / "top-level-functions.mdx",
 ])
 
-# Match ```python ... ``` fences at any indentation level (column 0, inside
-# <Tabs>, blockquotes, etc.). The `indent` group captures leading whitespace
-# on the opening fence and is backreferenced on the closing fence so indented
-# fences are paired correctly. The fence info line may carry extras like
-# showLineNumbers, title="...", or {1-3}.
-_FENCE_RE = re.compile(
-    r"^(?P<indent>[ \t]*)```python[^\n]*\n(.*?)^(?P=indent)```",
-    re.MULTILINE | re.DOTALL,
-)
-
 
 def _is_excluded(path: Path) -> bool:
     resolved = path.resolve()
@@ -64,24 +55,23 @@ def _collect(paths: list[Path]) -> list[Path]:
     return [f for f in out if not _is_excluded(f)]
 
 
-def _extract_blocks(source: str) -> list[tuple[int, str]]:
+def _extract_blocks(record: dict) -> list[tuple[int, str]]:
     """Return (opening_fence_line, code) for each Python block.
 
     opening_fence_line is the 1-based line number of the ```python line itself
     (not the first line of the code body). _check_file computes the error line
     as opening_fence_line + e.lineno, which is only correct because of this.
+    Fences at any indentation (inside <Tabs>, blockquotes, ...) are included;
+    see utils/docs_corpus.py for how they're paired.
     """
-    return [
-        (source[: m.start()].count("\n") + 1, m.group(2))
-        for m in _FENCE_RE.finditer(source)
-    ]
+    return [(f["line"], f["code"]) for f in record["fences"] if f["lang"] == "python"]
 
 
-def _check_file(path: Path, source: str) -> tuple[list[str], int, int]:
+def _check_file(path: Path, record: dict) -> tuple[list[str], int, int]:
     """Return (errors, blocks_checked, blocks_skipped) for one file."""
     errors: list[str] = []
     checked = skipped = 0
-    for fence_line, code in _extract_blocks(source):
+    for fence_line, code in _extract_blocks(record):
         lines = [ln for ln in code.splitlines() if ln.strip()]
         first = lines[0] if lines else ""
         if first.lstrip().startswith("#") and "doctest: skip" in first:
@@ -123,14 +113,13 @@ def main(argv: list[str]) -> int:
     total_checked = 0
     total_skipped = 0
 
+    corpus = load_corpus(sorted(files))
     for f in sorted(files):
-        try:
-            source = f.read_text(encoding="utf-8")
-        except (OSError, UnicodeDecodeError) as e:
-            print(f"ERROR: could not read {f.relative_to(ROOT)}: {e}", file=sys.stderr)
-            all_errors.append(str(e))
+        record = corpus.get(f)
+        if record is None:  # load_corpus already reported why
+            all_errors.append(f"could not read {f.relative_to(ROOT)}")
             continue
-        errors, checked, skipped = _check_file(f, source)
+        errors, checked, skipped = _check_file(f, record)
         if checked + skipped > 0:
             files_with_blocks += 1
         total_checked += checked